@@ -0,0 +1,172 @@
+# ================================================================
+# Gerador de super-modelos sintéticos (benchmarks)
+# Projeto: Quase Sem Querer
+#
+# Formas:
+# - cadeia: profundidade máxima (cada soma depende da anterior)
+# - larga:  somas de muitas folhas, agregadas em dois níveis
+# - dag:    grafo acíclico aleatório com compartilhamento de nós
+#
+# Todos os nós são alcançáveis a partir da raiz (o verificador trata
+# operações órfãs como erro). Os contextos gerados preenchem todas as
+# folhas, no formato de super-contexto, com os mesmos módulos.
+# ================================================================
+
+from __future__ import annotations
+
+import random
+from typing import Any, Dict, List, Tuple
+
+
+FORMAS = ("cadeia", "larga", "dag")
+
+# nós por módulo do super-modelo gerado
+NOS_POR_MODULO = 500
+
+ORIGEM = "sintetico"
+
+
+def gerar(forma: str, total_nos: int, *, semente: int = 0) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """(super_modelo, super_contexto) com aproximadamente `total_nos` nós."""
+    if forma not in FORMAS:
+        raise ValueError(f"Forma desconhecida: '{forma}'. Use uma entre {FORMAS}.")
+    if total_nos < 4:
+        raise ValueError("Modelos sintéticos exigem ao menos 4 nós.")
+
+    rnd = random.Random(semente)
+    nos = {"cadeia": _cadeia, "larga": _larga, "dag": _dag}[forma](total_nos, rnd)
+    return _super_modelo(nos), _super_contexto(nos, rnd)
+
+
+def gerar_contexto(modelo: Dict[str, Any], *, semente: int = 0) -> Dict[str, Any]:
+    """Contexto achatado que preenche todas as folhas de um modelo achatado."""
+    rnd = random.Random(semente)
+    return {
+        no["id"]: _valor_folha(no["id"], rnd)
+        for no in modelo["nos"]
+        if no["tipo"] in ("constante", "referencia")
+    }
+
+
+# ----------------------------------------------------------------
+# Formas
+# ----------------------------------------------------------------
+
+def _folha(no_id: str) -> Dict[str, Any]:
+    return {"id": no_id, "tipo": "referencia", "dependencias": []}
+
+
+def _operacao(no_id: str, tipo: str, deps: List[str]) -> Dict[str, Any]:
+    return {
+        "id": no_id,
+        "tipo": tipo,
+        "dependencias": deps,
+        "metadados_juridicos": {"descricao": f"Subtotal sintético {no_id}"},
+    }
+
+
+def _cadeia(total: int, rnd: random.Random) -> List[Dict[str, Any]]:
+    # folha_i alimenta soma_i = soma_{i-1} + folha_i
+    nos = [_folha("folha_0"), _folha("folha_1"), _operacao("soma_1", "soma", ["folha_0", "folha_1"])]
+    i = 1
+    while len(nos) + 2 <= total:
+        i += 1
+        nos.append(_folha(f"folha_{i}"))
+        nos.append(_operacao(f"soma_{i}", "soma", [f"soma_{i - 1}", f"folha_{i}"]))
+    nos.append(_operacao("raiz", "soma", [f"soma_{i}", "folha_0"]))
+    return nos
+
+
+def _larga(total: int, rnd: random.Random) -> List[Dict[str, Any]]:
+    # grupos de folhas somados; a raiz soma os grupos
+    tamanho_grupo = max(2, int(total ** 0.5))
+    folhas = total - total // tamanho_grupo - 2
+    nos: List[Dict[str, Any]] = []
+    grupos = []
+    grupo: List[str] = []
+    for i in range(max(folhas, 4)):
+        nos.append(_folha(f"folha_{i}"))
+        grupo.append(f"folha_{i}")
+        if len(grupo) == tamanho_grupo:
+            grupos.append(grupo)
+            grupo = []
+    if len(grupo) == 1 and grupos:
+        grupos[-1].append(grupo[0])
+    elif grupo:
+        grupos.append(grupo)
+    if len(grupos[-1]) < 2:
+        grupos[-1].append("folha_0")
+
+    ids_grupos = []
+    for g, deps in enumerate(grupos):
+        ids_grupos.append(f"grupo_{g}")
+        nos.append(_operacao(f"grupo_{g}", "soma", deps))
+    if len(ids_grupos) < 2:
+        ids_grupos.append("folha_0")
+    nos.append(_operacao("raiz", "soma", ids_grupos))
+    return nos
+
+
+def _dag(total: int, rnd: random.Random) -> List[Dict[str, Any]]:
+    # ~1/3 folhas; cada operação usa dois nós anteriores (com compartilhamento)
+    folhas = max(2, total // 3)
+    nos: List[Dict[str, Any]] = [_folha(f"folha_{i}") for i in range(folhas)]
+    ids = [no["id"] for no in nos]
+    ids_folhas = list(ids)
+    usados = set()
+
+    for i in range(total - folhas - 1):
+        a = ids[rnd.randrange(len(ids))]
+        if rnd.random() < 0.3:
+            # multiplicação por uma folha (percentual): valores não explodem
+            tipo, b = "multiplicacao", ids_folhas[rnd.randrange(len(ids_folhas))]
+        else:
+            tipo, b = "soma", ids[max(0, len(ids) - 1 - rnd.randrange(min(len(ids), 50)))]
+        no_id = f"no_{i}"
+        nos.append(_operacao(no_id, tipo, [a, b]))
+        usados.update((a, b))
+        ids.append(no_id)
+
+    sumidouros = [no_id for no_id in ids if no_id not in usados]
+    if len(sumidouros) < 2:
+        sumidouros.append(ids[0])
+    nos.append(_operacao("raiz", "soma", sumidouros))
+    return nos
+
+
+# ----------------------------------------------------------------
+# Empacotamento
+# ----------------------------------------------------------------
+
+def _modulos(nos: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    return {
+        f"modulo_{i // NOS_POR_MODULO:04d}": nos[i:i + NOS_POR_MODULO]
+        for i in range(0, len(nos), NOS_POR_MODULO)
+    }
+
+
+def _super_modelo(nos: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return {
+        "tipo": "super_modelo",
+        "modulos": {nome: {"nos": bloco} for nome, bloco in _modulos(nos).items()},
+        "raiz": "raiz",
+    }
+
+
+def _super_contexto(nos: List[Dict[str, Any]], rnd: random.Random) -> Dict[str, Any]:
+    return {
+        "tipo": "super_contexto",
+        "modulos": {
+            nome: {
+                no["id"]: _valor_folha(no["id"], rnd)
+                for no in bloco
+                if no["tipo"] == "referencia"
+            }
+            for nome, bloco in _modulos(nos).items()
+        },
+    }
+
+
+def _valor_folha(no_id: str, rnd: random.Random) -> Dict[str, Any]:
+    valor = rnd.uniform(0.01, 0.5) if "percentual" in no_id else rnd.uniform(0.5, 1.5)
+    return {"valor": round(valor, 4), "origem": ORIGEM, "referencia_documental": None}
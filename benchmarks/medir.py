@@ -0,0 +1,257 @@
+# ================================================================
+# Benchmarks do motor normativo
+# Projeto: Quase Sem Querer
+#
+# Mede, por caso (modelos reais e sintéticos), tempo e pico de memória
+# de cada fase do fluxo:
+#   carregar_modelo -> validar_modelo -> executar -> salvar_execucao
+#   -> render_memoria_calculo
+#
+# Uso (a partir da raiz do repositório):
+#   python benchmarks/medir.py executar [--tamanhos 100 1000 10000]
+#                                       [--saida atual.json]
+#   python benchmarks/medir.py comparar benchmarks/base.json atual.json
+#
+# O tempo é o menor entre `--repeticoes` rodadas; a memória é medida
+# em rodada separada, com tracemalloc. `comparar` termina com código
+# 1 se alguma fase regrediu além da tolerância. A base foi gravada em
+# uma máquina específica: regrave-a (--saida benchmarks/base.json)
+# antes de comparar em outra máquina.
+# ================================================================
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+RAIZ_REPOSITORIO = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ_REPOSITORIO / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from gerador_sintetico import FORMAS, gerar, gerar_contexto  # noqa: E402
+
+from quase_sem_querer.carregadores.carregador_contexto import _carregar_super_contexto  # noqa: E402
+from quase_sem_querer.carregadores.carregador_modelo import DIR_MODELOS, carregar_modelo  # noqa: E402
+from quase_sem_querer.motor.armazenamento_execucoes import ArmazemSQLite  # noqa: E402
+from quase_sem_querer.motor.interpretador import InterpretadorArvoreNormativa  # noqa: E402
+from quase_sem_querer.motor.persistencia_execucao import PersistidorExecucao  # noqa: E402
+from quase_sem_querer.motor.verificador import VerificadorEstatico  # noqa: E402
+from quase_sem_querer.relatorios.memoria_calculo import render_memoria_calculo  # noqa: E402
+
+
+MODELOS_REAIS = ("in_05_2017.json", "caderno_tecnico_rj.json")
+TAMANHOS_PADRAO = (100, 1_000, 10_000)
+FASES = ("carregar_modelo", "validar_modelo", "executar", "salvar_execucao", "render_memoria_calculo")
+
+TOLERANCIA_PADRAO = 0.25
+# diferenças absolutas abaixo disto são ruído de medição
+MINIMO_TEMPO_S = 0.002
+MINIMO_MEMORIA_KB = 256
+
+
+# ----------------------------------------------------------------
+# Medição
+# ----------------------------------------------------------------
+
+def medir_caso(
+    caminho_modelo: Path,
+    contexto: Dict[str, Any],
+    *,
+    repeticoes: int,
+) -> Dict[str, Dict[str, float]]:
+    """Tempo (s) e pico de memória (KB) de cada fase para um modelo."""
+    diretorio = Path(tempfile.mkdtemp(prefix="qsk_bench_"))
+    estado: Dict[str, Any] = {}
+
+    def carregar():
+        estado["modelo"] = carregar_modelo(caminho_modelo.name, base_dir=caminho_modelo.parent)
+
+    def validar():
+        VerificadorEstatico.validar_modelo(estado["modelo"])
+
+    def executar():
+        modelo = estado["modelo"]
+        estado["resultado"] = InterpretadorArvoreNormativa(modelo, contexto).executar(modelo["raiz"])
+
+    def salvar():
+        with ArmazemSQLite(diretorio / "execucoes.sqlite3") as armazem:
+            PersistidorExecucao(armazem=armazem).salvar_execucao(
+                modelo_normativo=estado["modelo"],
+                contexto=contexto,
+                resultado=estado["resultado"],
+                no_raiz=estado["modelo"]["raiz"],
+            )
+
+    def renderizar():
+        render_memoria_calculo(estado["resultado"])
+
+    fases: List[Tuple[str, Callable[[], None]]] = list(
+        zip(FASES, (carregar, validar, executar, salvar, renderizar))
+    )
+
+    medidas: Dict[str, Dict[str, float]] = {}
+    for nome, fase in fases:
+        tempos = []
+        for _ in range(repeticoes):
+            gc.collect()
+            inicio = time.perf_counter()
+            fase()
+            tempos.append(time.perf_counter() - inicio)
+
+        gc.collect()
+        tracemalloc.start()
+        fase()
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        medidas[nome] = {
+            "tempo_s": round(min(tempos), 6),
+            "memoria_pico_kb": round(pico / 1024, 1),
+        }
+
+    return medidas
+
+
+def _casos(tamanhos: List[int], diretorio: Path):
+    for nome in MODELOS_REAIS:
+        modelo = carregar_modelo(nome)
+        yield nome, DIR_MODELOS / nome, gerar_contexto(modelo)
+
+    for forma in FORMAS:
+        for tamanho in tamanhos:
+            super_modelo, super_contexto = gerar(forma, tamanho)
+            caminho = diretorio / f"{forma}_{tamanho}.json"
+            caminho.write_text(json.dumps(super_modelo, ensure_ascii=False), encoding="utf-8")
+            yield f"{forma}_{tamanho}", caminho, _carregar_super_contexto(super_contexto)
+
+
+def executar_benchmarks(tamanhos: List[int], *, repeticoes: int, progresso: bool = True) -> Dict[str, Any]:
+    diretorio = Path(tempfile.mkdtemp(prefix="qsk_bench_modelos_"))
+    casos: Dict[str, Any] = {}
+
+    for nome, caminho, contexto in _casos(tamanhos, diretorio):
+        if progresso:
+            print(f"  {nome} ...", file=sys.stderr, flush=True)
+        casos[nome] = medir_caso(caminho, contexto, repeticoes=repeticoes)
+
+    return {
+        "meta": {
+            "data_utc": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "plataforma": platform.platform(),
+            "repeticoes": repeticoes,
+            "tamanhos": list(tamanhos),
+        },
+        "casos": casos,
+    }
+
+
+# ----------------------------------------------------------------
+# Comparação
+# ----------------------------------------------------------------
+
+def comparar(
+    base: Dict[str, Any],
+    atual: Dict[str, Any],
+    *,
+    tolerancia: float = TOLERANCIA_PADRAO,
+) -> List[Dict[str, Any]]:
+    """
+    Linhas (caso, fase, métrica, base, atual, razão, regressao) para
+    os casos e fases presentes nas duas medições.
+    """
+    linhas = []
+    for caso, fases_atual in atual["casos"].items():
+        fases_base = base["casos"].get(caso)
+        if fases_base is None:
+            continue
+        for fase, medidas in fases_atual.items():
+            if fase not in fases_base:
+                continue
+            for metrica, minimo in (("tempo_s", MINIMO_TEMPO_S), ("memoria_pico_kb", MINIMO_MEMORIA_KB)):
+                valor_base = fases_base[fase][metrica]
+                valor_atual = medidas[metrica]
+                razao = valor_atual / valor_base if valor_base else float("inf")
+                linhas.append({
+                    "caso": caso,
+                    "fase": fase,
+                    "metrica": metrica,
+                    "base": valor_base,
+                    "atual": valor_atual,
+                    "razao": razao,
+                    "regressao": razao > 1 + tolerancia and valor_atual - valor_base > minimo,
+                })
+    return linhas
+
+
+def _imprimir_comparacao(linhas: List[Dict[str, Any]], *, todas: bool) -> None:
+    print(f"{'caso':<26} {'fase':<24} {'métrica':<16} {'base':>12} {'atual':>12} {'razão':>7}")
+    for linha in linhas:
+        if not todas and not linha["regressao"] and linha["metrica"] != "tempo_s":
+            continue
+        marca = "  REGRESSÃO" if linha["regressao"] else ""
+        print(
+            f"{linha['caso']:<26} {linha['fase']:<24} {linha['metrica']:<16} "
+            f"{linha['base']:>12g} {linha['atual']:>12g} {linha['razao']:>6.2f}x{marca}"
+        )
+
+
+# ----------------------------------------------------------------
+# Linha de comando
+# ----------------------------------------------------------------
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks do motor normativo.")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    executar = sub.add_parser("executar", help="mede todos os casos")
+    executar.add_argument("--tamanhos", type=int, nargs="+", default=list(TAMANHOS_PADRAO),
+                          help="nós dos modelos sintéticos (ex.: 100 1000 1000000)")
+    executar.add_argument("--repeticoes", type=int, default=3)
+    executar.add_argument("--saida", help="arquivo JSON de saída (padrão: stdout)")
+    executar.add_argument("--comparar-com", help="base para comparar ao final")
+    executar.add_argument("--tolerancia", type=float, default=TOLERANCIA_PADRAO)
+
+    comparar_cmd = sub.add_parser("comparar", help="compara duas medições")
+    comparar_cmd.add_argument("base")
+    comparar_cmd.add_argument("atual")
+    comparar_cmd.add_argument("--tolerancia", type=float, default=TOLERANCIA_PADRAO,
+                              help="aumento relativo tolerado (0.25 = 25%%)")
+    comparar_cmd.add_argument("--todas", action="store_true", help="mostra também a memória sem regressão")
+
+    args = parser.parse_args(argv)
+
+    if args.comando == "executar":
+        atual = executar_benchmarks(args.tamanhos, repeticoes=args.repeticoes)
+        texto = json.dumps(atual, indent=2, ensure_ascii=False)
+        if args.saida:
+            Path(args.saida).write_text(texto + "\n", encoding="utf-8")
+        else:
+            print(texto)
+        if not args.comparar_com:
+            return 0
+        base = json.loads(Path(args.comparar_com).read_text(encoding="utf-8"))
+        todas = False
+    else:
+        base = json.loads(Path(args.base).read_text(encoding="utf-8"))
+        atual = json.loads(Path(args.atual).read_text(encoding="utf-8"))
+        todas = args.todas
+
+    linhas = comparar(base, atual, tolerancia=args.tolerancia)
+    _imprimir_comparacao(linhas, todas=todas)
+    regressoes = [linha for linha in linhas if linha["regressao"]]
+    print(f"\n{len(regressoes)} regressão(ões) acima de {args.tolerancia:.0%}", file=sys.stderr)
+    return 1 if regressoes else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,150 @@
+# ================================================================
+# Quase Sem Querer — API pública leve
+#
+# Ponto de entrada para scripts, rotinas em lote e hooks:
+#
+#     import quase_sem_querer as qsq
+#     resultado = qsq.executar("caderno_tecnico_rj.json", contexto)
+#
+# Importar o pacote não carrega Streamlit, pandas, numpy nem a
+# persistência (sqlite3): cada módulo é importado apenas no primeiro
+# uso do nome correspondente.
+# ================================================================
+
+from __future__ import annotations
+
+import importlib
+
+__version__ = "0.1.0"
+
+# nome público -> módulo que o define (importado sob demanda)
+_EXPORTACOES = {
+    "executar_modelo": "quase_sem_querer.motor.orquestrador",
+    "obter_modelo": "quase_sem_querer.carregadores.registro_modelos",
+    "carregar_modelo": "quase_sem_querer.carregadores.carregador_modelo",
+    "carregar_contexto": "quase_sem_querer.carregadores.carregador_contexto",
+    "InterpretadorArvoreNormativa": "quase_sem_querer.motor.interpretador",
+    "ErroInterpretacao": "quase_sem_querer.motor.interpretador",
+    "executar_lote": "quase_sem_querer.motor.interpretador_vetorial",
+    "analisar_sensibilidade": "quase_sem_querer.motor.sensibilidade",
+    "buscar_meta": "quase_sem_querer.motor.busca_meta",
+    "buscar_metas": "quase_sem_querer.motor.busca_meta",
+    "executar_monte_carlo": "quase_sem_querer.motor.monte_carlo",
+}
+
+__all__ = ["executar", *_EXPORTACOES]
+
+# orçamento de importação de `executar` (pacote + motor, sem o interpretador Python)
+ORCAMENTO_IMPORTACAO_MS = 50
+MODULOS_PROIBIDOS_NA_IMPORTACAO = ("streamlit", "pandas", "numpy", "sqlite3")
+
+
+def __getattr__(nome: str):
+    modulo = _EXPORTACOES.get(nome)
+    if modulo is None:
+        raise AttributeError(f"module 'quase_sem_querer' has no attribute '{nome}'")
+    valor = getattr(importlib.import_module(modulo), nome)
+    globals()[nome] = valor
+    return valor
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTACOES))
+
+
+def executar(
+    modelo: str,
+    contexto,
+    *,
+    no_raiz: str | None = None,
+    modo: str = "completo",
+    persistir: bool = False,
+    **opcoes,
+):
+    """
+    Executa `modelo` sobre `contexto` pelo fluxo canônico (executar_modelo).
+
+    - modelo:   nome em modelos_normativos/ ou caminho de arquivo
+    - contexto: dicionário (achatado ou super-contexto), nome em
+                contextos/ ou caminho de arquivo
+    - no_raiz:  padrão: raiz declarada no modelo
+
+    Demais opções (cache, cache_nos, aguardar_persistencia, aritmetica)
+    seguem para executar_modelo.
+    """
+    from pathlib import Path
+
+    from quase_sem_querer.carregadores.carregador_contexto import (
+        _carregar_super_contexto,
+        carregar_contexto,
+    )
+    from quase_sem_querer.motor.orquestrador import executar_modelo
+
+    caminho_modelo = Path(modelo)
+    if caminho_modelo.is_file():
+        modelo = str(caminho_modelo.resolve())
+
+    if isinstance(contexto, dict):
+        if contexto.get("tipo") == "super_contexto":
+            contexto = _carregar_super_contexto(contexto)
+    else:
+        caminho_contexto = Path(contexto)
+        if caminho_contexto.is_file():
+            contexto = carregar_contexto(
+                caminho_contexto.name, base_dir=caminho_contexto.resolve().parent
+            )
+        else:
+            contexto = carregar_contexto(str(contexto))
+
+    return executar_modelo(
+        nome_modelo=modelo,
+        contexto=contexto,
+        no_raiz=no_raiz,
+        modo=modo,
+        persistir=persistir,
+        **opcoes,
+    )
+
+
+# ----------------------------------------------------------------
+# Testes mínimos (sanity checks)
+# ----------------------------------------------------------------
+
+
+def _test_orcamento_importacao():
+    """
+    Mede `python -X importtime` de um script que usa `executar` e
+    verifica o orçamento e a ausência de dependências pesadas.
+    """
+    import subprocess
+    import sys
+
+    codigo = "import quase_sem_querer as q; q.executar; import quase_sem_querer.motor.orquestrador"
+    processo = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", codigo],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    total_us = 0
+    importados = set()
+    for linha in processo.stderr.splitlines():
+        if not linha.startswith("import time:") or "|" not in linha:
+            continue
+        _, acumulado, nome = linha.split("|")
+        if not acumulado.strip().isdigit():
+            continue  # cabeçalho
+        importados.add(nome.strip().split(".")[0])
+        # importações de primeiro nível do pacote (o acumulado já inclui as
+        # dependências); as do próprio interpretador Python ficam de fora
+        if nome.startswith(" quase_sem_querer"):
+            total_us += int(acumulado)
+
+    proibidos = importados.intersection(MODULOS_PROIBIDOS_NA_IMPORTACAO)
+    assert not proibidos, f"Importação carregou {sorted(proibidos)}"
+
+    assert total_us / 1000 <= ORCAMENTO_IMPORTACAO_MS, (
+        f"Importação levou {total_us / 1000:.1f} ms "
+        f"(orçamento: {ORCAMENTO_IMPORTACAO_MS} ms)"
+    )
@@ -37,6 +37,8 @@ class ErroModeloNormativoInvalido(Exception):
 
 Modelo = Dict[str, Any]
 
+DIR_MODELOS = Path(__file__).resolve().parent.parent / "modelos_normativos"
+
 
 def carregar_modelo(nome_modelo: str, *, base_dir: Path | None = None) -> Modelo:
     """
@@ -48,7 +50,7 @@ def carregar_modelo(nome_modelo: str, *, base_dir: Path | None = None) -> Modelo
     - FUTURO: modelo composto com imports
     """
 
-    base_dir = base_dir or Path(__file__).resolve().parent.parent / "modelos_normativos"
+    base_dir = base_dir or DIR_MODELOS
     caminho = base_dir / nome_modelo
 
     if not caminho.exists():
@@ -107,6 +109,7 @@ def _carregar_super_modelo(modelo: Modelo) -> Modelo:
         )
 
     nos_flat: Dict[str, Dict[str, Any]] = {}
+    indice_modulos: Dict[str, list] = {}
 
     for nome_modulo, conteudo in modulos.items():
         nos = conteudo.get("nos")
@@ -129,9 +132,13 @@ def _carregar_super_modelo(modelo: Modelo) -> Modelo:
 
             nos_flat[no_id] = no
 
+        indice_modulos[nome_modulo] = [no["id"] for no in nos]
+
     return {
         "nos": list(nos_flat.values()),
         "raiz": raiz,
+        # módulo -> ids (hashes por módulo; o grafo continua único)
+        "indice_modulos": indice_modulos,
     }
 
 
@@ -158,3 +165,4 @@ def _test_super_modelo():
     out = _carregar_super_modelo(modelo)
     assert len(out["nos"]) == 2
     assert out["raiz"] == "y"
+    assert out["indice_modulos"] == {"a": ["x"], "b": ["y"]}
@@ -0,0 +1,180 @@
+# ================================================================
+# Registro de modelos normativos (cache por processo)
+# Projeto: Quase Sem Querer
+#
+# Mantém, por processo, os modelos já:
+# - lidos e achatados (carregar_modelo)
+# - verificados (VerificadorEstatico)
+# - identificados por hashes Merkle (nó, módulo e raiz; mesmo critério
+#   da persistência)
+# - compilados em planos de avaliação, por raiz
+#
+# Chave: caminho do arquivo + mtime + tamanho. Qualquer alteração no
+# arquivo invalida a entrada na próxima consulta; planos cujo cone de
+# nós não mudou são herdados da versão anterior. Entradas menos
+# usadas são descartadas (LRU) quando a capacidade é atingida.
+#
+# Os modelos registrados são compartilhados: não devem ser alterados.
+# ================================================================
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from quase_sem_querer.carregadores.carregador_modelo import (
+    DIR_MODELOS,
+    Modelo,
+    carregar_modelo,
+)
+from quase_sem_querer.motor.hash_merkle import HashesMerkle, hashes_modelo
+from quase_sem_querer.motor.interpretador import PlanoAvaliacao, compilar_plano
+from quase_sem_querer.motor.verificador import VerificadorEstatico
+
+
+CAPACIDADE_PADRAO = 32
+
+
+class ModeloRegistrado:
+    """Modelo achatado, verificado e com hash, pronto para execução."""
+
+    def __init__(
+        self,
+        *,
+        caminho: Path,
+        assinatura: Tuple[int, int],
+        modelo: Modelo,
+        analise: VerificadorEstatico,
+        tempos_carga_ms: Dict[str, float] | None = None,
+    ):
+        self.caminho = caminho
+        self.assinatura = assinatura
+        self.modelo = modelo
+        # ordem topológica, profundidade, alcançáveis e avisos da verificação
+        self.analise = analise
+        inicio = time.perf_counter()
+        self.hashes: HashesMerkle = hashes_modelo(modelo)
+        # duração de cada fase da carga (leitura, verificação, hash)
+        self.tempos_carga_ms: Dict[str, float] = dict(tempos_carga_ms or {})
+        self.tempos_carga_ms["hash_modelo"] = (time.perf_counter() - inicio) * 1000
+        self.carregado_em = time.perf_counter()
+        self.hash_modelo = self.hashes.raiz
+        self.nos: Dict[str, Dict] = {no["id"]: no for no in modelo["nos"]}
+        # diferenças em relação à versão anterior do mesmo arquivo
+        self.alteracoes: Dict[str, List[str]] | None = None
+        self._planos: Dict[str, PlanoAvaliacao] = {}
+        self._lock = threading.Lock()
+
+    def herdar(self, anterior: "ModeloRegistrado") -> None:
+        """Reaproveita os planos de `anterior` cujo cone não mudou."""
+        self.alteracoes = self.hashes.comparar(anterior.hashes)
+        for no_raiz, plano in list(anterior._planos.items()):
+            hash_atual = self.hashes.itens.get(no_raiz)
+            if hash_atual is not None and hash_atual == anterior.hashes.itens.get(no_raiz):
+                self._planos[no_raiz] = plano
+
+    def plano(self, no_raiz: str) -> PlanoAvaliacao:
+        """Plano compilado para `no_raiz` (compilado uma única vez)."""
+        plano = self._planos.get(no_raiz)
+        if plano is None:
+            with self._lock:
+                plano = self._planos.get(no_raiz)
+                if plano is None:
+                    plano = compilar_plano(self.nos, no_raiz, hashes=self.hashes.itens)
+                    self._planos[no_raiz] = plano
+        return plano
+
+
+class RegistroModelos:
+    def __init__(self, capacidade: int = CAPACIDADE_PADRAO):
+        if capacidade < 1:
+            raise ValueError("Capacidade do registro deve ser positiva.")
+        self.capacidade = capacidade
+        self._entradas: "OrderedDict[Path, ModeloRegistrado]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    # -----------------------------
+    # API pública
+    # -----------------------------
+
+    def obter(self, nome_modelo: str, *, base_dir: Path | None = None) -> ModeloRegistrado:
+        """
+        Retorna o modelo registrado, recarregando-o (leitura, achatamento,
+        verificação e hash) apenas se o arquivo mudou ou não está em cache.
+        """
+        caminho = ((base_dir or DIR_MODELOS) / nome_modelo).resolve()
+
+        try:
+            stat = caminho.stat()
+        except FileNotFoundError:
+            self.invalidar(nome_modelo, base_dir=base_dir)
+            raise FileNotFoundError(f"Modelo normativo não encontrado: {caminho}")
+
+        assinatura = (stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            anterior = self._entradas.get(caminho)
+            if anterior is not None and anterior.assinatura == assinatura:
+                self._entradas.move_to_end(caminho)
+                return anterior
+
+        # carga fora do lock: outras consultas não esperam por I/O
+        inicio = time.perf_counter()
+        modelo = carregar_modelo(caminho.name, base_dir=caminho.parent)
+        lido = time.perf_counter()
+        analise = VerificadorEstatico.analisar_modelo(modelo)
+        verificado = time.perf_counter()
+        entrada = ModeloRegistrado(
+            caminho=caminho,
+            assinatura=assinatura,
+            modelo=modelo,
+            analise=analise,
+            tempos_carga_ms={
+                "carregar_modelo": (lido - inicio) * 1000,
+                "verificar_modelo": (verificado - lido) * 1000,
+            },
+        )
+        if anterior is not None:
+            entrada.herdar(anterior)
+
+        with self._lock:
+            self._entradas[caminho] = entrada
+            self._entradas.move_to_end(caminho)
+            while len(self._entradas) > self.capacidade:
+                self._entradas.popitem(last=False)
+
+        return entrada
+
+    def invalidar(self, nome_modelo: str | None = None, *, base_dir: Path | None = None) -> None:
+        """Remove um modelo do registro ou, sem argumentos, todos."""
+        with self._lock:
+            if nome_modelo is None:
+                self._entradas.clear()
+                return
+            caminho = ((base_dir or DIR_MODELOS) / nome_modelo).resolve()
+            self._entradas.pop(caminho, None)
+
+    def __len__(self) -> int:
+        return len(self._entradas)
+
+    def __contains__(self, caminho: Path) -> bool:
+        return Path(caminho).resolve() in self._entradas
+
+
+# ----------------------------------------------------------------
+# Registro do processo
+# ----------------------------------------------------------------
+
+_REGISTRO = RegistroModelos()
+
+
+def obter_modelo(nome_modelo: str, *, base_dir: Path | None = None) -> ModeloRegistrado:
+    return _REGISTRO.obter(nome_modelo, base_dir=base_dir)
+
+
+def invalidar_modelo(nome_modelo: str | None = None, *, base_dir: Path | None = None) -> None:
+    _REGISTRO.invalidar(nome_modelo, base_dir=base_dir)
+
@@ -8,12 +8,18 @@
 
 import streamlit as st
 import json
-from quase_sem_querer.relatorios.memoria_calculo import render_memoria_calculo
+from quase_sem_querer.relatorios.memoria_calculo import render_memorias_calculo
 from quase_sem_querer.contextos.gerador_contexto_operacional import (
     gerar_super_contexto_operacional
 )
 from quase_sem_querer.interface.arvore_calculo import render_no
 from quase_sem_querer.motor.orquestrador import executar_modelo
+from quase_sem_querer.motor.cache_resultados import cache_padrao
+from quase_sem_querer.motor.cache_nos import cache_nos_padrao
+from quase_sem_querer.motor.interpretador import InterpretadorArvoreNormativa
+from quase_sem_querer.motor.sensibilidade import analisar_sensibilidade
+from quase_sem_querer.motor.varredura import contar_cenarios, executar_varredura
+from quase_sem_querer.carregadores.registro_modelos import obter_modelo
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -35,12 +41,42 @@ def sanitizar_texto(texto: str) -> str:
     return texto
 
 
+# ----------------------------------------------------------------
+# Cache compartilhado entre sessões
+# ----------------------------------------------------------------
+# JSONs lidos e listagens de diretório ficam em st.cache_resource,
+# comum a todas as sessões do servidor. A chave inclui mtime e tamanho
+# do arquivo (ou do diretório): uma alteração invalida a entrada na
+# próxima leitura. Modelos achatados e verificados vêm do registro de
+# modelos, com o mesmo critério. A sessão guarda apenas nomes; os
+# objetos em cache são compartilhados e não devem ser alterados.
+
+def _assinatura(caminho: Path) -> tuple[int, int]:
+    info = caminho.stat()
+    return info.st_mtime_ns, info.st_size
+
+
+@st.cache_resource(show_spinner=False, max_entries=64)
+def _json_em_cache(caminho: str, assinatura: tuple[int, int]) -> dict:
+    with open(caminho, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+@st.cache_resource(show_spinner=False, max_entries=16)
+def _listagem_em_cache(diretorio: str, assinatura: tuple[int, int]) -> list[str]:
+    return sorted(
+        [p.name for p in Path(diretorio).glob("*.json") if p.is_file()]
+    )
+
+
+def ler_json(caminho: Path) -> dict:
+    return _json_em_cache(str(caminho), _assinatura(caminho))
+
+
 def listar_jsons(diretorio: Path) -> list[str]:
     if not diretorio.exists():
         return []
-    return sorted(
-        [p.name for p in diretorio.glob("*.json") if p.is_file()]
-    )
+    return _listagem_em_cache(str(diretorio), _assinatura(diretorio))
 
 
 # ----------------------------------------------------------------
@@ -65,6 +101,37 @@ def avancar():
 def voltar():
     st.session_state.etapa -= 1
 
+
+def total_parcial(contexto: dict) -> float:
+    """
+    Total ao vivo da etapa 3: reaproveita o interpretador da sessão e
+    reavalia apenas os nós afetados pelos valores alterados.
+    """
+    vivo = st.session_state.get("interpretador_vivo")
+    no_raiz = st.session_state.no_raiz_modelo
+
+    try:
+        registrado = obter_modelo(st.session_state.modelo_nome)
+
+        if vivo is None or vivo[0] != registrado.hash_modelo:
+            interpretador = InterpretadorArvoreNormativa(registrado.modelo, dict(contexto))
+            valor = interpretador.executar(no_raiz, plano=registrado.plano(no_raiz))["valor_final"]
+            st.session_state.interpretador_vivo = (registrado.hash_modelo, interpretador)
+            return valor
+
+        interpretador = vivo[1]
+        valor = interpretador.memo[no_raiz]
+        for chave, item in contexto.items():
+            atual = interpretador.contexto.get(chave)
+            if not isinstance(atual, dict) or atual.get("valor") != item.get("valor"):
+                valor = interpretador.atualizar(chave, item.get("valor"))["valor_final"]
+        return valor
+
+    except Exception:
+        # estado inconsistente: a próxima chamada reavalia do zero
+        st.session_state.interpretador_vivo = None
+        raise
+
 # ----------------------------------------------------------------
 # ETAPA 1 — Seleção do modelo normativo
 # ----------------------------------------------------------------
@@ -88,21 +155,22 @@ if st.session_state.etapa == 1:
     )
 
     if modelo_escolhido:
-        caminho_modelo = DIR_MODELOS / modelo_escolhido
-
-        with caminho_modelo.open("r", encoding="utf-8") as f:
-            st.session_state.modelo_bytes = f.read().encode("utf-8")
+        try:
+            # lido, achatado e verificado uma vez por versão do arquivo
+            registrado = obter_modelo(modelo_escolhido)
+        except Exception as e:
+            st.session_state.pop("modelo_nome", None)
+            st.error(f"Modelo inválido: {e}")
+        else:
             st.session_state.modelo_nome = modelo_escolhido
+            st.session_state.no_raiz_modelo = registrado.modelo.get("raiz")
 
-        modelo_json = json.loads(st.session_state.modelo_bytes)
-        st.session_state.no_raiz_modelo = modelo_json.get("raiz")
-
-        st.success(f"Modelo selecionado: {modelo_escolhido}")
+            st.success(f"Modelo selecionado: {modelo_escolhido}")
 
     st.button(
         "Próximo →",
         on_click=avancar,
-        disabled="modelo_bytes" not in st.session_state,
+        disabled="modelo_nome" not in st.session_state,
     )
 
 
@@ -126,12 +194,10 @@ elif st.session_state.etapa == 2:
         key="contexto_legal_selecionado",
     )
 
-    caminho_contexto = DIR_CONTEXTOS / contexto_escolhido
-
-    with caminho_contexto.open("r", encoding="utf-8") as f:
-        ctx_legal = json.load(f)
+    ctx_legal = ler_json(DIR_CONTEXTOS / contexto_escolhido)
 
     decisoes_legais = {}
+    opcoes_legais = {}
 
     for modulo, campos in ctx_legal.get("modulos", {}).items():
         with st.expander(modulo.replace("_", " ").title(), expanded=True):
@@ -150,6 +216,11 @@ elif st.session_state.etapa == 2:
                         "origem": "decisao_gestor",
                         "referencia_documental": meta.get("referencia_documental"),
                     }
+                    opcoes_legais[nome] = {
+                        "valor": list(valores),
+                        "origem": "varredura_cenarios",
+                        "referencia_documental": meta.get("referencia_documental"),
+                    }
                 else:
                     st.text_input(nome, value=str(valores), disabled=True)
                     decisoes_legais[nome] = {
@@ -159,6 +230,7 @@ elif st.session_state.etapa == 2:
                     }
 
     st.session_state.decisoes_legais = decisoes_legais
+    st.session_state.opcoes_legais = opcoes_legais
 
     col1, col2 = st.columns(2)
     with col1:
@@ -183,7 +255,7 @@ elif st.session_state.etapa == 3:
         st.markdown("### Contexto operacional")
 
         if st.button("🧠 Gerar contexto automaticamente", key="gerar_ctx_operacional"):
-            modelo = json.loads(st.session_state.modelo_bytes)
+            modelo = ler_json(DIR_MODELOS / st.session_state.modelo_nome)
 
             contexto_legal = {
                 "tipo": "super_contexto",
@@ -213,7 +285,7 @@ elif st.session_state.etapa == 3:
         ctx_operacional = st.session_state["ctx_operacional"]
         valores_livres = {}
 
-        modelo = json.loads(st.session_state.modelo_bytes)
+        modelo = ler_json(DIR_MODELOS / st.session_state.modelo_nome)
         modulos_modelo = modelo.get("modulos") or {}
         modulos_ctx = ctx_operacional.get("modulos", {})
 
@@ -270,6 +342,18 @@ elif st.session_state.etapa == 3:
 
         st.session_state.valores_livres = valores_livres
 
+        contexto_parcial = dict(st.session_state.decisoes_legais)
+        contexto_parcial.update(valores_livres)
+
+        try:
+            valor_parcial = total_parcial(contexto_parcial)
+            st.metric(
+                "Total parcial (ao vivo)",
+                f"R$ {valor_parcial:,.2f}".replace(",", "X").replace(".", ",").replace("X", "."),
+            )
+        except Exception as e:
+            st.info(f"Total parcial indisponível: {e}")
+
         col1, col2 = st.columns(2)
         with col1:
             st.button("← Voltar", on_click=voltar)
@@ -314,6 +398,35 @@ elif st.session_state.etapa == 4:
 
     st.info(f"Nó raiz do modelo: {st.session_state.no_raiz_modelo}")
 
+    # aritmética da execução (registrada em meta_execucao)
+    with st.expander("🔢 Aritmética do cálculo"):
+        modo_aritmetica = st.radio(
+            "Modo",
+            ["float", "decimal"],
+            horizontal=True,
+            key="modo_aritmetica",
+            help=(
+                "Decimal calcula com os valores exatamente como escritos e "
+                "arredonda os nós escolhidos a centavos (e os que declaram "
+                "'casas_decimais' no modelo)."
+            ),
+        )
+        aritmetica = None
+        if modo_aritmetica == "decimal":
+            nos_calculados = [
+                no["id"]
+                for no in obter_modelo(st.session_state.modelo_nome).modelo["nos"]
+                if no.get("dependencias")
+            ]
+            aritmetica = {
+                "modo": "decimal",
+                "arredondar": st.multiselect(
+                    "Arredondar a centavos",
+                    nos_calculados,
+                    key="pontos_arredondamento",
+                ),
+            }
+
     # --------------------------------------------
     # Execução (ação)
     # --------------------------------------------
@@ -325,6 +438,9 @@ elif st.session_state.etapa == 4:
                 contexto=contexto_final,
                 no_raiz=st.session_state.no_raiz_modelo,
                 persistir=True,
+                cache=cache_padrao(),
+                cache_nos=cache_nos_padrao(),
+                aritmetica=aritmetica,
             )
 
 
@@ -350,9 +466,43 @@ elif st.session_state.etapa == 4:
         st.subheader("Resultado canônico")
         st.json(resultado)
 
+        # 📈 Sensibilidade: derivadas de todas as folhas em uma varredura
+        sensibilidade = analisar_sensibilidade(resultado)
+        with st.expander("📈 Sensibilidade do resultado"):
+            st.caption(
+                "Variação do total por unidade de cada valor do contexto "
+                "(R$ 1,00 ou 1 ponto percentual), em ordem de contribuição."
+            )
+            st.dataframe(
+                [
+                    {
+                        "Nó": linha["no_id"],
+                        "Valor": linha["valor"],
+                        "Efeito por unidade": (
+                            linha["derivada"] * 0.01
+                            if linha["derivada"] is not None and linha["no_id"].startswith("percentual_")
+                            else linha["derivada"]
+                        ),
+                        "Contribuição (R$)": linha["contribuicao"],
+                        "Elasticidade": linha["elasticidade"],
+                    }
+                    for linha in sensibilidade
+                ],
+                hide_index=True,
+            )
+            incluir_sensibilidade = st.checkbox(
+                "Incluir na memória de cálculo",
+                key="memoria_com_sensibilidade",
+            )
+
         # 📄 Memória de cálculo
-        memoria_md = render_memoria_calculo(resultado, formato="md")
-        memoria_txt = render_memoria_calculo(resultado, formato="txt")
+        # um único percurso gera os dois formatos (em cache por id de execução)
+        memorias = render_memorias_calculo(
+            resultado,
+            sensibilidade=sensibilidade if incluir_sensibilidade else None,
+        )
+        memoria_md = memorias["md"]
+        memoria_txt = memorias["txt"]
 
         st.download_button(
             "📄 Baixar memória de cálculo (Markdown)",
@@ -370,6 +520,71 @@ elif st.session_state.etapa == 4:
             key="download_txt",
         )
 
+    # --------------------------------------------
+    # Varredura de cenários legais
+    # --------------------------------------------
+
+    opcoes_legais = st.session_state.get("opcoes_legais") or {}
+
+    if opcoes_legais:
+        st.markdown("---")
+        st.subheader("📊 Varredura de cenários legais")
+        st.markdown(
+            "Avalia **todas as combinações** das opções legais selecionadas, "
+            "produzindo o envelope de preços admissível."
+        )
+
+        chaves_varredura = st.multiselect(
+            "Opções legais a variar",
+            list(opcoes_legais),
+            default=list(opcoes_legais),
+            key="varredura_chaves",
+        )
 
+        contexto_varredura = dict(contexto_final)
+        for chave in chaves_varredura:
+            contexto_varredura[chave] = opcoes_legais[chave]
+
+        modelo_flat = obter_modelo(st.session_state.modelo_nome).modelo
+        subtotais = st.multiselect(
+            "Subtotais a exibir",
+            [
+                no["id"]
+                for no in modelo_flat["nos"]
+                if no["tipo"] not in ("constante", "referencia")
+            ],
+            key="varredura_subtotais",
+        )
+
+        st.caption(
+            f"Combinações: {contar_cenarios(contexto_varredura, chaves_varredura)}"
+        )
+
+        if st.button("Executar varredura", key="executar_varredura"):
+            try:
+                st.session_state.resultado_varredura = list(
+                    executar_varredura(
+                        modelo_flat,
+                        contexto_varredura,
+                        chaves=chaves_varredura,
+                        subtotais=subtotais,
+                        no_raiz=st.session_state.no_raiz_modelo,
+                    )
+                )
+            except Exception as e:
+                st.error("Erro durante a varredura de cenários")
+                st.exception(e)
+
+        if "resultado_varredura" in st.session_state:
+            tabela = st.session_state.resultado_varredura
+            st.dataframe(tabela, use_container_width=True)
+
+            st.download_button(
+                "📥 Baixar varredura (JSON)",
+                data=json.dumps(tabela, ensure_ascii=False, indent=2),
+                file_name="varredura_cenarios.json",
+                mime="application/json",
+                key="download_varredura",
+            )
 
     st.button("← Voltar", on_click=voltar, key="voltar4")
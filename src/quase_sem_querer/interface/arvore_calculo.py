@@ -4,12 +4,24 @@
 #
 # Fonte única: resultado canônico da execução
 # Não calcula, não valida, não persiste
+#
+# A árvore é desenhada sob demanda: só os filhos de nós abertos são
+# renderizados. Um nó compartilhado por vários pais aparece completo
+# uma única vez (sob o primeiro pai, em pré-ordem) e, nos demais,
+# como um atalho que abre o caminho até ele. Somas com muitas
+# dependências são paginadas.
 # ================================================================
 
-from typing import Dict, Any
+from typing import Dict, Any, List, Tuple
 import streamlit as st
 
 
+FILHOS_POR_PAGINA = 25
+
+# recuo máximo (em níveis); abaixo disso as linhas ficam alinhadas
+RECUO_MAXIMO = 12
+
+
 def _fmt_valor(no_id: str, v: float | None) -> str:
     if v is None:
         return "—"
@@ -25,51 +37,212 @@ def render_no(
     *,
     no_id: str,
     nos_avaliados: Dict[str, Dict[str, Any]],
-    nivel: int = 0,
+    chave: str = "arvore",
 ):
     """
-    Renderiza um nó da árvore de cálculo de forma recursiva.
+    Renderiza a árvore de cálculo a partir de `no_id`.
+
+    O estado (nós abertos, páginas) fica em st.session_state sob
+    `chave` e é reiniciado quando o resultado muda.
     """
 
-    no = nos_avaliados.get(no_id)
-    if not no:
+    if not nos_avaliados.get(no_id):
         st.error(f"Nó '{no_id}' não encontrado no resultado.")
         return
 
-    valor = no.get("valor_calculado")
-    deps = no.get("dependencias", [])
+    estado = _estado(chave, no_id, nos_avaliados)
+    pai_principal = estado["pai_principal"]
+    abertos = estado["abertos"]
+    paginas = estado["paginas"]
+
+    desenhados = set()
+    # (nó, pai, nível, posição entre as dependências do pai)
+    pilha: List[Tuple[str, str | None, int, int]] = [(no_id, None, 0, 0)]
+
+    while pilha:
+        atual, pai, nivel, posicao = pilha.pop()
+        no = nos_avaliados.get(atual)
+
+        if not no:
+            with _linha(nivel):
+                st.warning(f"Nó '{atual}' não encontrado no resultado.")
+            continue
+
+        if atual in desenhados or (pai is not None and pai_principal.get(atual) != pai):
+            _linha_atalho(chave, atual, no, pai, nivel, posicao, pai_principal)
+            continue
+
+        desenhados.add(atual)
+        aberto = atual in abertos
+        deps = no.get("dependencias", [])
+
+        with _linha(nivel):
+            marcador = ("▾" if aberto else "▸") if deps else "•"
+            st.button(
+                f"{marcador} {atual} — {_fmt_valor(atual, no.get('valor_calculado'))}",
+                key=f"{chave}:no:{atual}",
+                type="tertiary",
+                on_click=_alternar,
+                args=(chave, atual),
+            )
+
+        if not aberto:
+            continue
+
+        with _linha(nivel + 1):
+            _detalhes(no)
+            if deps and len(deps) > FILHOS_POR_PAGINA:
+                _paginacao(chave, atual, len(deps), paginas.get(atual, 0))
+
+        inicio = paginas.get(atual, 0) * FILHOS_POR_PAGINA
+        visiveis = deps[inicio:inicio + FILHOS_POR_PAGINA]
+        for pos in range(inicio + len(visiveis) - 1, inicio - 1, -1):
+            pilha.append((deps[pos], atual, nivel + 1, pos))
+
+
+# ----------------------------------------------------------------
+# Linhas
+# ----------------------------------------------------------------
+
+def _linha(nivel: int):
+    """Coluna recuada conforme o nível."""
+    recuo = min(nivel, RECUO_MAXIMO)
+    if recuo == 0:
+        return st.container()
+    _, conteudo = st.columns([recuo, 2 * RECUO_MAXIMO])
+    return conteudo
+
+
+def _detalhes(no: Dict[str, Any]) -> None:
     meta = no.get("metadados_juridicos", {})
+    deps = no.get("dependencias", [])
 
-    titulo = f"{no_id} — {_fmt_valor(no_id, valor)}"
-
-    # Indentação visual leve por nível (opcional)
-    margem = nivel * 0.5
-
-    with st.container():
-        st.markdown(f"<div style='margin-left: {margem}rem;'>", unsafe_allow_html=True)
+    st.markdown(f"**Tipo de nó:** `{no.get('tipo')}`")
 
-        with st.expander(titulo, expanded=(nivel == 0)):
-            st.markdown(f"**Tipo de nó:** `{no.get('tipo')}`")
+    if meta.get("fundamento_legal"):
+        st.markdown(
+            f"**Fundamento legal:** {meta['fundamento_legal']}"
+        )
 
-            if meta.get("fundamento_legal"):
-                st.markdown(
-                    f"**Fundamento legal:** {meta['fundamento_legal']}"
-                )
+    if meta.get("observacoes"):
+        st.markdown(
+            f"**Observações:** {meta['observacoes']}"
+        )
 
-            if meta.get("observacoes"):
-                st.markdown(
-                    f"**Observações:** {meta['observacoes']}"
-                )
+    if deps:
+        st.markdown(f"**Dependências ({len(deps)}):**")
+    else:
+        st.markdown("_Nó folha (valor proveniente do Contexto)._")
 
-            if deps:
-                st.markdown("**Dependências:**")
-                for dep in deps:
-                    render_no(
-                        no_id=dep,
-                        nos_avaliados=nos_avaliados,
-                        nivel=nivel + 1,
-                    )
-            else:
-                st.markdown("_Nó folha (valor proveniente do Contexto)._")
 
-        st.markdown("</div>", unsafe_allow_html=True)
+def _linha_atalho(
+    chave: str,
+    no_id: str,
+    no: Dict[str, Any],
+    pai: str | None,
+    nivel: int,
+    posicao: int,
+    pai_principal: Dict[str, str],
+) -> None:
+    principal = pai_principal.get(no_id)
+    onde = f"detalhado em {principal}" if principal else "nó raiz"
+    with _linha(nivel):
+        st.button(
+            f"↪ {no_id} — {_fmt_valor(no_id, no.get('valor_calculado'))} ({onde})",
+            key=f"{chave}:atalho:{pai}:{posicao}",
+            type="tertiary",
+            on_click=_ir_para,
+            args=(chave, no_id),
+        )
+
+
+def _paginacao(chave: str, no_id: str, total: int, pagina: int) -> None:
+    ultima = (total - 1) // FILHOS_POR_PAGINA
+    inicio = pagina * FILHOS_POR_PAGINA
+
+    anterior, legenda, proxima = st.columns([1, 3, 1])
+    anterior.button(
+        "◀",
+        key=f"{chave}:pagina_anterior:{no_id}",
+        disabled=pagina == 0,
+        on_click=_mudar_pagina,
+        args=(chave, no_id, pagina - 1),
+    )
+    legenda.caption(
+        f"{inicio + 1}–{min(inicio + FILHOS_POR_PAGINA, total)} de {total}"
+    )
+    proxima.button(
+        "▶",
+        key=f"{chave}:pagina_proxima:{no_id}",
+        disabled=pagina >= ultima,
+        on_click=_mudar_pagina,
+        args=(chave, no_id, pagina + 1),
+    )
+
+
+# ----------------------------------------------------------------
+# Estado
+# ----------------------------------------------------------------
+
+def _estado(chave: str, no_raiz: str, nos_avaliados: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    origem = (id(nos_avaliados), no_raiz)
+    estado = st.session_state.get(f"{chave}:estado")
+    if estado is None or estado["origem"] != origem:
+        estado = {
+            "origem": origem,
+            "nos": nos_avaliados,
+            "pai_principal": _pais_principais(no_raiz, nos_avaliados),
+            "abertos": {no_raiz},
+            "paginas": {},
+        }
+        st.session_state[f"{chave}:estado"] = estado
+    return estado
+
+
+def _pais_principais(no_raiz: str, nos_avaliados: Dict[str, Dict[str, Any]]) -> Dict[str, str]:
+    """
+    Pai sob o qual cada nó é mostrado por completo: o da primeira
+    ocorrência em pré-ordem a partir da raiz.
+    """
+    pai_principal: Dict[str, str] = {}
+    vistos = set()
+    pilha: List[Tuple[str, str | None]] = [(no_raiz, None)]
+    while pilha:
+        atual, pai = pilha.pop()
+        if atual in vistos:
+            continue
+        vistos.add(atual)
+        if pai is not None:
+            pai_principal[atual] = pai
+        deps = (nos_avaliados.get(atual) or {}).get("dependencias", [])
+        for dep in reversed(deps):
+            if dep not in vistos:
+                pilha.append((dep, atual))
+    return pai_principal
+
+
+def _alternar(chave: str, no_id: str) -> None:
+    abertos = st.session_state[f"{chave}:estado"]["abertos"]
+    if no_id in abertos:
+        abertos.discard(no_id)
+    else:
+        abertos.add(no_id)
+
+
+def _mudar_pagina(chave: str, no_id: str, pagina: int) -> None:
+    st.session_state[f"{chave}:estado"]["paginas"][no_id] = pagina
+
+
+def _ir_para(chave: str, no_id: str) -> None:
+    """Abre o caminho (pais principais) até `no_id` e o próprio nó."""
+    estado = st.session_state[f"{chave}:estado"]
+    pai_principal = estado["pai_principal"]
+
+    atual = no_id
+    estado["abertos"].add(atual)
+    while atual in pai_principal:
+        pai = pai_principal[atual]
+        estado["abertos"].add(pai)
+        deps = estado["nos"][pai].get("dependencias", [])
+        estado["paginas"][pai] = deps.index(atual) // FILHOS_POR_PAGINA
+        atual = pai
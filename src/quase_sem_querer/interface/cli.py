@@ -1,20 +1,619 @@
 # ================================================================
-# cli.py — Entrada única para a UI
+# cli.py — Entrada única (UI e execução sem interface)
 # Projeto: Quase Sem Querer
+#
+# Comandos:
+# - qsk [app]      abre a interface Streamlit
+# - qsk executar   executa um par modelo/contexto e imprime (ou
+#                  persiste) o resultado canônico; --aritmetica decimal
+#                  calcula em decimal exato, com pontos de arredondamento
+# - qsk lote       executa muitos contextos (diretório ou JSONL) em um
+#                  pool de processos, gravando JSONL na ordem de entrada
+# - qsk exportar   exporta o histórico de execuções para Parquet/CSV,
+#                  acrescentando apenas execuções ainda não exportadas
+# - qsk meta       busca o valor de uma folha que leva um nó a um valor
+#                  desejado (goal seek), para um ou vários alvos
+# - qsk montecarlo sorteia as folhas com "distribuicao" no contexto e
+#                  resume a distribuição do total (percentis, histograma)
+#
+# Códigos de saída: 0 sucesso; 1 alguma execução falhou; 2 uso inválido.
 # ================================================================
 
 from __future__ import annotations
-import subprocess
+
+import argparse
+import json
+import os
 import sys
+from collections import deque
 from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+
+SAIDA_OK = 0
+SAIDA_FALHAS = 1
+SAIDA_USO = 2
+
+TAMANHO_BLOCO_PADRAO = 64
 
+# item de lote: (origem, contexto ou mensagem de erro de leitura)
+ItemLote = Tuple[str, Any]
+
+
+# ----------------------------------------------------------------
+# Interface Streamlit
+# ----------------------------------------------------------------
+
+def _abrir_app(_args: argparse.Namespace) -> int:
+    import subprocess
 
-def main() -> None:
     app = Path(__file__).parent / "app_streamlit.py"
     subprocess.run(
         [sys.executable, "-m", "streamlit", "run", str(app)],
         check=True,
     )
+    return SAIDA_OK
+
+
+# ----------------------------------------------------------------
+# qsk executar
+# ----------------------------------------------------------------
+
+def _comando_executar(args: argparse.Namespace) -> int:
+    from quase_sem_querer.carregadores.carregador_contexto import carregar_contexto
+    from quase_sem_querer.motor.orquestrador import executar_modelo
+
+    nome_modelo, dir_modelo = _resolver_arquivo(args.modelo)
+    nome_contexto, dir_contexto = _resolver_arquivo(args.contexto)
+
+    contexto = carregar_contexto(nome_contexto, base_dir=dir_contexto)
+
+    # sem --raiz, o orquestrador usa a raiz do modelo (e mede a carga)
+    resultado = executar_modelo(
+        nome_modelo=_nome_modelo(nome_modelo, dir_modelo),
+        contexto=contexto,
+        no_raiz=args.raiz,
+        persistir=args.persistir,
+        modo=args.modo,
+        aguardar_persistencia=True,
+        aritmetica=_aritmetica(args),
+    )
+
+    _escrever_json(resultado, args.saida)
+    return SAIDA_OK
+
+
+# ----------------------------------------------------------------
+# qsk lote
+# ----------------------------------------------------------------
+
+def _comando_lote(args: argparse.Namespace) -> int:
+    nome_modelo, dir_modelo = _resolver_arquivo(args.modelo)
+    modelo = _nome_modelo(nome_modelo, dir_modelo)
+    no_raiz = args.raiz or _raiz_padrao(nome_modelo, dir_modelo)
+
+    itens = _ler_entrada(args.entrada)
+    linhas = executar_lote_processos(
+        modelo,
+        itens,
+        no_raiz=no_raiz,
+        modo=args.modo,
+        persistir=args.persistir,
+        processos=args.processos,
+        tamanho_bloco=args.bloco,
+        aritmetica=_aritmetica(args),
+    )
+
+    mostrar_progresso = not args.silencioso and sys.stderr.isatty()
+    total = falhas = 0
+
+    saida = open(args.saida, "w", encoding="utf-8") if args.saida else sys.stdout
+    try:
+        for linha in linhas:
+            saida.write(json.dumps(linha, ensure_ascii=False) + "\n")
+            total += 1
+            if linha["erro"] is not None:
+                falhas += 1
+            if mostrar_progresso and total % args.bloco == 0:
+                print(f"\r{total} contextos processados, {falhas} com erro", end="", file=sys.stderr)
+    finally:
+        if saida is not sys.stdout:
+            saida.close()
+        else:
+            saida.flush()
+
+    if mostrar_progresso:
+        print("\r", end="", file=sys.stderr)
+    if not args.silencioso:
+        print(f"{total} contextos processados, {falhas} com erro", file=sys.stderr)
+
+    return SAIDA_FALHAS if falhas else SAIDA_OK
+
+
+def executar_lote_processos(
+    nome_modelo: str,
+    itens: Iterable[ItemLote],
+    *,
+    no_raiz: str,
+    modo: str = "valor",
+    persistir: bool = False,
+    processos: int | None = None,
+    tamanho_bloco: int = TAMANHO_BLOCO_PADRAO,
+    aritmetica: Dict[str, Any] | None = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Executa cada contexto de `itens` contra o modelo, distribuindo
+    blocos de `tamanho_bloco` contextos entre `processos` processos.
+    `aritmetica` (descrição, ver executar_modelo) vale para todos.
+
+    Produz uma linha por item, na ordem de entrada, à medida que os
+    blocos terminam; a entrada é consumida aos poucos (no máximo dois
+    blocos por processo em andamento). Erros ficam na própria linha.
+    """
+    if tamanho_bloco < 1:
+        raise ValueError("'tamanho_bloco' deve ser positivo.")
+
+    processos = processos or os.cpu_count() or 1
+    parametros = (nome_modelo, no_raiz, modo, persistir, aritmetica)
+    blocos = _em_blocos(enumerate(itens), tamanho_bloco)
+
+    if processos == 1:
+        for bloco in blocos:
+            yield from _executar_bloco(parametros, bloco)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=processos) as pool:
+        em_andamento: deque = deque()
+        for bloco in blocos:
+            em_andamento.append(pool.submit(_executar_bloco, parametros, bloco))
+            if len(em_andamento) >= 2 * processos:
+                yield from em_andamento.popleft().result()
+        while em_andamento:
+            yield from em_andamento.popleft().result()
+
+
+def _executar_bloco(
+    parametros: Tuple[str, str, str, bool, Dict[str, Any] | None],
+    bloco: List[Tuple[int, ItemLote]],
+) -> List[Dict[str, Any]]:
+    # roda no processo de trabalho: o registro de modelos é por processo
+    from quase_sem_querer.motor.orquestrador import executar_modelo
+
+    nome_modelo, no_raiz, modo, persistir, aritmetica = parametros
+    if aritmetica is not None:
+        from quase_sem_querer.motor.aritmetica_decimal import resolver_aritmetica
+
+        # uma instância por bloco: os pontos de arredondamento do plano
+        # são calculados uma vez
+        aritmetica = resolver_aritmetica(aritmetica)
+    linhas = []
+
+    for indice, (origem, contexto) in bloco:
+        linha: Dict[str, Any] = {
+            "indice": indice,
+            "origem": origem,
+            "no_raiz": no_raiz,
+            "valor_final": None,
+            "erro": None,
+        }
+
+        if isinstance(contexto, ErroLeitura):
+            linha["erro"] = str(contexto)
+            linhas.append(linha)
+            continue
+
+        try:
+            resultado = executar_modelo(
+                nome_modelo=nome_modelo,
+                contexto=contexto,
+                no_raiz=no_raiz,
+                persistir=persistir,
+                modo=modo,
+                # processos de trabalho não executam atexit: gravar antes de seguir
+                aguardar_persistencia=True,
+                aritmetica=aritmetica,
+            )
+        except Exception as e:
+            linha["erro"] = f"{type(e).__name__}: {e}"
+        else:
+            linha["valor_final"] = resultado["valor_final"]
+            if modo == "completo":
+                linha["resultado"] = resultado
+
+        linhas.append(linha)
+
+    return linhas
+
+
+# ----------------------------------------------------------------
+# qsk exportar
+# ----------------------------------------------------------------
+
+def _comando_exportar(args: argparse.Namespace) -> int:
+    from quase_sem_querer.motor.armazenamento_execucoes import (
+        ArmazemArquivosJSON,
+        ArmazemSQLite,
+    )
+    from quase_sem_querer.relatorios.exportacao_historico import exportar_historico
+
+    if args.json is not None:
+        armazem = ArmazemArquivosJSON(Path(args.json))
+    else:
+        armazem = ArmazemSQLite(Path(args.banco) if args.banco else None)
+
+    try:
+        totais = exportar_historico(
+            args.destino,
+            armazem=armazem,
+            formato=args.formato,
+            tamanho_bloco=args.bloco,
+        )
+    finally:
+        armazem.fechar()
+
+    print(
+        f"{totais['execucoes']} execuções exportadas "
+        f"({totais['nos']} linhas de nós, {totais['partes']} partes)",
+        file=sys.stderr,
+    )
+    return SAIDA_OK
+
+
+# ----------------------------------------------------------------
+# qsk meta
+# ----------------------------------------------------------------
+
+def _comando_meta(args: argparse.Namespace) -> int:
+    from quase_sem_querer.carregadores.carregador_contexto import carregar_contexto
+    from quase_sem_querer.carregadores.registro_modelos import obter_modelo
+    from quase_sem_querer.motor.busca_meta import buscar_metas
+
+    nome_modelo, dir_modelo = _resolver_arquivo(args.modelo)
+    nome_contexto, dir_contexto = _resolver_arquivo(args.contexto)
+
+    registrado = obter_modelo(nome_modelo, base_dir=dir_modelo)
+    contexto = carregar_contexto(nome_contexto, base_dir=dir_contexto)
+    alvo_no = args.raiz or registrado.modelo.get("raiz")
+    if not alvo_no:
+        raise ValueError(f"Modelo '{nome_modelo}' não declara raiz: informe --raiz.")
+
+    if args.pedidos:
+        pedidos = list(_ler_pedidos_meta(args.pedidos))
+    elif args.folha and args.alvo:
+        intervalo = tuple(args.intervalo) if args.intervalo else None
+        pedidos = [
+            {"folha": args.folha, "alvo_valor": alvo, "intervalo": intervalo}
+            for alvo in args.alvo
+        ]
+    else:
+        raise ValueError("Informe --folha e --alvo, ou --pedidos.")
+
+    for pedido in pedidos:
+        pedido.setdefault("alvo_no", alvo_no)
+
+    linhas = buscar_metas(
+        registrado.modelo,
+        contexto,
+        pedidos,
+        tolerancia=args.tolerancia,
+        plano=registrado.plano(alvo_no),
+    )
+
+    falhas = 0
+    saida = open(args.saida, "w", encoding="utf-8") if args.saida else sys.stdout
+    try:
+        for linha in linhas:
+            saida.write(json.dumps(linha, ensure_ascii=False) + "\n")
+            if not linha["convergiu"]:
+                falhas += 1
+    finally:
+        if saida is not sys.stdout:
+            saida.close()
+
+    return SAIDA_FALHAS if falhas else SAIDA_OK
+
+
+def _ler_pedidos_meta(caminho: str) -> Iterator[Dict[str, Any]]:
+    """JSONL: {"folha", "alvo_valor", "alvo_no"?, "intervalo"?} por linha."""
+    arquivo = sys.stdin if caminho == "-" else open(caminho, "r", encoding="utf-8")
+    try:
+        for numero, linha in enumerate(arquivo, start=1):
+            if not linha.strip():
+                continue
+            pedido = json.loads(linha)
+            if not isinstance(pedido, dict) or "folha" not in pedido or "alvo_valor" not in pedido:
+                raise ValueError(
+                    f"Pedido inválido na linha {numero}: informe 'folha' e 'alvo_valor'."
+                )
+            yield pedido
+    finally:
+        if arquivo is not sys.stdin:
+            arquivo.close()
+
+
+# ----------------------------------------------------------------
+# qsk montecarlo
+# ----------------------------------------------------------------
+
+def _comando_montecarlo(args: argparse.Namespace) -> int:
+    from quase_sem_querer.carregadores.carregador_contexto import carregar_contexto
+    from quase_sem_querer.carregadores.registro_modelos import obter_modelo
+    from quase_sem_querer.motor.monte_carlo import executar_monte_carlo
+
+    nome_modelo, dir_modelo = _resolver_arquivo(args.modelo)
+    nome_contexto, dir_contexto = _resolver_arquivo(args.contexto)
+
+    registrado = obter_modelo(nome_modelo, base_dir=dir_modelo)
+    contexto = carregar_contexto(nome_contexto, base_dir=dir_contexto)
+    no_raiz = args.raiz or registrado.modelo.get("raiz")
+    if not no_raiz:
+        raise ValueError(f"Modelo '{nome_modelo}' não declara raiz: informe --raiz.")
+
+    resumo = executar_monte_carlo(
+        registrado.modelo,
+        contexto,
+        amostras=args.amostras,
+        semente=args.semente,
+        subtotais=args.subtotais,
+        no_raiz=no_raiz,
+        faixas_histograma=args.faixas,
+        tamanho_bloco=args.bloco,
+        plano=registrado.plano(no_raiz),
+    )
+    _escrever_json(resumo, args.saida)
+
+    if resumo["falhas"]:
+        print(
+            f"{resumo['falhas']} de {resumo['amostras']} amostras com erro de avaliação",
+            file=sys.stderr,
+        )
+        return SAIDA_FALHAS
+    return SAIDA_OK
+
+
+# ----------------------------------------------------------------
+# Entrada do lote
+# ----------------------------------------------------------------
+
+class ErroLeitura(str):
+    """Mensagem de erro de leitura de um contexto (vira erro da linha)."""
+
+
+def _ler_entrada(entrada: str) -> Iterator[ItemLote]:
+    """
+    - diretório: cada *.json é um contexto (atômico ou super-contexto)
+    - arquivo .jsonl ou "-" (stdin): um contexto por linha
+    """
+    if entrada != "-" and Path(entrada).is_dir():
+        return _ler_diretorio(Path(entrada))
+    return _ler_jsonl(entrada)
+
+
+def _ler_diretorio(diretorio: Path) -> Iterator[ItemLote]:
+    from quase_sem_querer.carregadores.carregador_contexto import carregar_contexto
+
+    for caminho in sorted(diretorio.glob("*.json")):
+        try:
+            yield caminho.name, carregar_contexto(caminho.name, base_dir=diretorio)
+        except Exception as e:
+            yield caminho.name, ErroLeitura(f"{type(e).__name__}: {e}")
+
+
+def _ler_jsonl(entrada: str) -> Iterator[ItemLote]:
+    from quase_sem_querer.carregadores.carregador_contexto import (
+        _carregar_super_contexto,
+    )
+
+    arquivo = sys.stdin if entrada == "-" else open(entrada, "r", encoding="utf-8")
+    try:
+        for numero, linha in enumerate(arquivo, start=1):
+            if not linha.strip():
+                continue
+            origem = f"linha {numero}"
+            try:
+                contexto = json.loads(linha)
+                if not isinstance(contexto, dict):
+                    raise ValueError("cada linha deve ser um objeto JSON")
+                if contexto.get("tipo") == "super_contexto":
+                    contexto = _carregar_super_contexto(contexto)
+            except Exception as e:
+                yield origem, ErroLeitura(f"{type(e).__name__}: {e}")
+            else:
+                yield origem, contexto
+    finally:
+        if arquivo is not sys.stdin:
+            arquivo.close()
+
+
+def _em_blocos(itens: Iterable[Any], tamanho: int) -> Iterator[List[Any]]:
+    bloco = []
+    for item in itens:
+        bloco.append(item)
+        if len(bloco) == tamanho:
+            yield bloco
+            bloco = []
+    if bloco:
+        yield bloco
+
+
+# ----------------------------------------------------------------
+# Utilidades
+# ----------------------------------------------------------------
+
+def _resolver_arquivo(valor: str) -> Tuple[str, Path | None]:
+    """Caminho existente -> (nome, diretório); senão, nome no diretório padrão."""
+    caminho = Path(valor)
+    if caminho.is_file():
+        return caminho.name, caminho.resolve().parent
+    return valor, None
+
+
+def _nome_modelo(nome: str, base_dir: Path | None) -> str:
+    # o orquestrador resolve nomes no diretório padrão de modelos
+    return str(base_dir / nome) if base_dir is not None else nome
+
+
+def _raiz_padrao(nome_modelo: str, base_dir: Path | None) -> str:
+    # lê só o JSON: pelo registro, a carga do modelo (que a instrumentação
+    # da primeira execução mede) aconteceria aqui
+    from quase_sem_querer.carregadores.carregador_modelo import DIR_MODELOS
+
+    caminho = (base_dir or DIR_MODELOS) / nome_modelo
+    if not caminho.exists():
+        raise FileNotFoundError(f"Modelo normativo não encontrado: {caminho}")
+    with caminho.open("r", encoding="utf-8") as f:
+        raiz = json.load(f).get("raiz")
+    if not raiz:
+        raise ValueError(
+            f"Modelo '{nome_modelo}' não declara raiz: informe --raiz."
+        )
+    return raiz
+
+
+def _aritmetica(args: argparse.Namespace) -> Dict[str, Any] | None:
+    """Descrição da aritmética pedida (None: ponto flutuante)."""
+    parametros = {
+        "casas": args.casas,
+        "arredondar": args.arredondar,
+        "arredondamento": args.arredondamento,
+    }
+    informados = {nome: valor for nome, valor in parametros.items() if valor is not None}
+
+    if args.aritmetica == "float":
+        if informados:
+            opcoes = ", ".join(f"--{nome}" for nome in informados)
+            raise ValueError(f"{opcoes} exige --aritmetica decimal.")
+        return None
+    return {"modo": "decimal", **informados}
+
+
+def _escrever_json(objeto: Any, destino: str | None) -> None:
+    texto = json.dumps(objeto, indent=2, ensure_ascii=False)
+    if destino:
+        Path(destino).write_text(texto + "\n", encoding="utf-8")
+    else:
+        print(texto)
+
+
+# ----------------------------------------------------------------
+# Argumentos
+# ----------------------------------------------------------------
+
+def _criar_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="qsk",
+        description="Quase Sem Querer — cálculo normativo auditável.",
+    )
+    sub = parser.add_subparsers(dest="comando")
+
+    app = sub.add_parser("app", help="abre a interface Streamlit (padrão)")
+    app.set_defaults(func=_abrir_app)
+
+    comuns = argparse.ArgumentParser(add_help=False)
+    comuns.add_argument("--modelo", required=True, help="nome em modelos_normativos/ ou caminho do arquivo")
+    comuns.add_argument("--raiz", help="nó raiz (padrão: raiz declarada no modelo)")
+    comuns.add_argument("--persistir", action="store_true", help="grava cada execução no histórico")
+    comuns.add_argument("--aritmetica", choices=["float", "decimal"], default="float",
+                        help="ponto flutuante (padrão) ou decimal exato")
+    comuns.add_argument("--casas", type=int, help="casas decimais dos nós em --arredondar (padrão: 2)")
+    comuns.add_argument("--arredondar", nargs="+", metavar="NO",
+                        help="nós arredondados a --casas, além dos que declaram 'casas_decimais'")
+    comuns.add_argument("--arredondamento", choices=["meio_acima", "meio_par", "truncar"],
+                        help="regra dos pontos de arredondamento (padrão: meio_acima)")
+
+    executar = sub.add_parser(
+        "executar",
+        parents=[comuns],
+        help="executa um par modelo/contexto",
+    )
+    executar.add_argument("--contexto", required=True, help="nome em contextos/ ou caminho do arquivo")
+    executar.add_argument("--modo", choices=["completo", "valor"], default="completo")
+    executar.add_argument("--saida", help="arquivo JSON de saída (padrão: stdout)")
+    executar.set_defaults(func=_comando_executar)
+
+    lote = sub.add_parser(
+        "lote",
+        parents=[comuns],
+        help="executa muitos contextos em paralelo",
+    )
+    lote.add_argument("entrada", help="diretório de contextos *.json, arquivo JSONL ou '-' (stdin)")
+    lote.add_argument("--modo", choices=["completo", "valor"], default="valor")
+    lote.add_argument("--saida", help="arquivo JSONL de saída (padrão: stdout)")
+    lote.add_argument("--processos", type=int, default=None, help="processos de trabalho (padrão: nº de CPUs)")
+    lote.add_argument("--bloco", type=int, default=TAMANHO_BLOCO_PADRAO, help="contextos por tarefa")
+    lote.add_argument("--silencioso", action="store_true", help="sem progresso nem resumo no stderr")
+    lote.set_defaults(func=_comando_lote)
+
+    exportar = sub.add_parser(
+        "exportar",
+        help="exporta o histórico de execuções (Parquet/CSV)",
+    )
+    exportar.add_argument("destino", help="diretório da exportação (retomada a cada chamada)")
+    exportar.add_argument("--formato", choices=["parquet", "csv"], default="parquet")
+    origem = exportar.add_mutually_exclusive_group()
+    origem.add_argument("--banco", help="arquivo SQLite de execuções (padrão: o do projeto)")
+    origem.add_argument("--json", help="diretório de execuções em JSON (formato legado)")
+    exportar.add_argument("--bloco", type=int, default=1000, help="execuções por parte")
+    exportar.set_defaults(func=_comando_exportar)
+
+    meta = sub.add_parser(
+        "meta",
+        help="busca o valor de uma folha que atinge um valor alvo",
+    )
+    meta.add_argument("--modelo", required=True, help="nome em modelos_normativos/ ou caminho do arquivo")
+    meta.add_argument("--contexto", required=True, help="nome em contextos/ ou caminho do arquivo")
+    meta.add_argument("--raiz", help="nó alvo (padrão: raiz declarada no modelo)")
+    meta.add_argument("--folha", help="valor do contexto a ajustar (ex.: salario_base)")
+    meta.add_argument("--alvo", type=float, nargs="+", help="valor(es) desejado(s) para o nó alvo")
+    meta.add_argument("--intervalo", type=float, nargs=2, metavar=("MIN", "MAX"),
+                      help="faixa admissível para a folha")
+    meta.add_argument("--pedidos", help="arquivo JSONL de pedidos ou '-' (stdin)")
+    meta.add_argument("--tolerancia", type=float, default=1e-6, help="erro absoluto aceito no nó alvo")
+    meta.add_argument("--saida", help="arquivo JSONL de saída (padrão: stdout)")
+    meta.set_defaults(func=_comando_meta)
+
+    montecarlo = sub.add_parser(
+        "montecarlo",
+        help="distribuição do total com folhas incertas (Monte Carlo)",
+    )
+    montecarlo.add_argument("--modelo", required=True, help="nome em modelos_normativos/ ou caminho do arquivo")
+    montecarlo.add_argument("--contexto", required=True,
+                            help="nome em contextos/ ou caminho do arquivo (folhas com 'distribuicao')")
+    montecarlo.add_argument("--raiz", help="nó raiz (padrão: raiz declarada no modelo)")
+    montecarlo.add_argument("--amostras", type=int, default=100_000, help="número de amostras")
+    montecarlo.add_argument("--semente", type=int, help="semente do sorteio (padrão: aleatória, informada na saída)")
+    montecarlo.add_argument("--subtotais", nargs="+", default=[], help="nós intermediários a resumir")
+    montecarlo.add_argument("--faixas", type=int, default=50, help="faixas do histograma")
+    montecarlo.add_argument("--bloco", type=int, default=10_000, help="amostras avaliadas por vez")
+    montecarlo.add_argument("--saida", help="arquivo JSON de saída (padrão: stdout)")
+    montecarlo.set_defaults(func=_comando_montecarlo)
+
+    return parser
+
+
+def main(argv: List[str] | None = None) -> None:
+    args = _criar_parser().parse_args(argv)
+
+    if args.comando is None:
+        sys.exit(_abrir_app(args))
+
+    if getattr(args, "processos", None) is not None and args.processos < 1:
+        print("qsk: --processos deve ser positivo", file=sys.stderr)
+        sys.exit(SAIDA_USO)
+    if getattr(args, "bloco", 1) < 1:
+        print("qsk: --bloco deve ser positivo", file=sys.stderr)
+        sys.exit(SAIDA_USO)
+
+    try:
+        sys.exit(args.func(args))
+    except (FileNotFoundError, ValueError) as e:
+        print(f"qsk: {e}", file=sys.stderr)
+        sys.exit(SAIDA_USO)
+    except Exception as e:
+        print(f"qsk: {type(e).__name__}: {e}", file=sys.stderr)
+        sys.exit(SAIDA_FALHAS)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,341 @@
+# ================================================================
+# Aritmética decimal exata (modo de execução alternativo)
+# Projeto: Quase Sem Querer
+#
+# Responsabilidade:
+# - Descrever a aritmética de uma execução: "float" (padrão, ponto
+#   flutuante binário) ou "decimal"
+# - No modo decimal: ler as folhas do Contexto pelo valor escrito
+#   (0.0833 vale exatamente 0.0833), operar em Decimal com a precisão
+#   declarada e arredondar nos pontos de arredondamento declarados
+#
+# Pontos de arredondamento (valor levado a N casas decimais logo após
+# o cálculo do nó, antes de ser usado pelos dependentes):
+# - nós do modelo que declaram "casas_decimais": N
+# - nós listados em `arredondar` na execução (com `casas`)
+#
+# O resultado continua em float: um valor arredondado a centavos
+# (Decimal("1234.57")) vira o float cuja representação é "1234.57".
+# Os valores exatos ficam no interpretador.
+#
+# Não contém lógica jurídica.
+# ================================================================
+
+from __future__ import annotations
+
+from decimal import (
+    ROUND_DOWN,
+    ROUND_HALF_EVEN,
+    ROUND_HALF_UP,
+    Context,
+    Decimal,
+    DivisionByZero,
+    InvalidOperation,
+    Overflow,
+    localcontext,
+)
+from typing import Any, Dict, Iterable, List, Tuple
+
+from quase_sem_querer.motor.interpretador import (
+    ErroInterpretacao,
+    PlanoAvaliacao,
+    _op_divisao,
+    _op_potencia,
+    _op_soma,
+    _op_subtracao,
+    _validar_raiz,
+)
+
+
+MODOS_ARITMETICA = ("float", "decimal")
+
+# regra aplicada nos pontos de arredondamento
+ARREDONDAMENTOS = {
+    "meio_acima": ROUND_HALF_UP,   # ARRED das planilhas: 0,125 -> 0,13
+    "meio_par": ROUND_HALF_EVEN,
+    "truncar": ROUND_DOWN,
+}
+
+PRECISAO_PADRAO = 28
+CASAS_PADRAO = 2
+
+# chave do nó, no modelo, que declara um ponto de arredondamento
+CHAVE_CASAS_DECIMAIS = "casas_decimais"
+
+
+class AritmeticaDecimal:
+    """
+    Aritmética decimal de uma execução.
+
+    - casas:          casas decimais dos pontos listados em `arredondar`
+    - precisao:       dígitos significativos dos cálculos intermediários
+    - arredondamento: regra dos pontos de arredondamento (ARREDONDAMENTOS)
+    - arredondar:     ids de nós arredondados a `casas`, além dos que
+                      declaram "casas_decimais" no modelo
+    """
+
+    modo = "decimal"
+
+    def __init__(
+        self,
+        *,
+        casas: int = CASAS_PADRAO,
+        precisao: int = PRECISAO_PADRAO,
+        arredondamento: str = "meio_acima",
+        arredondar: Iterable[str] = (),
+    ):
+        if isinstance(casas, bool) or not isinstance(casas, int) or casas < 0:
+            raise ValueError("'casas' deve ser um inteiro não negativo.")
+        if isinstance(precisao, bool) or not isinstance(precisao, int) or precisao < 1:
+            raise ValueError("'precisao' deve ser um inteiro positivo.")
+        if arredondamento not in ARREDONDAMENTOS:
+            raise ValueError(
+                f"Arredondamento inválido: '{arredondamento}'. "
+                f"Use um entre {tuple(ARREDONDAMENTOS)}."
+            )
+        if isinstance(arredondar, str):
+            arredondar = (arredondar,)
+
+        self.casas = casas
+        self.precisao = precisao
+        self.arredondamento = arredondamento
+        self.arredondar: Tuple[str, ...] = tuple(dict.fromkeys(arredondar))
+
+        self.contexto = Context(
+            prec=precisao,
+            rounding=ROUND_HALF_EVEN,
+            traps=[InvalidOperation, DivisionByZero, Overflow],
+        )
+        self.operacoes = OPERACOES_DECIMAL
+        self._regra = ARREDONDAMENTOS[arredondamento]
+        self._quantum = Decimal(1).scaleb(-casas)
+        # plano -> {slot: quantum}; planos vêm do registro e se repetem
+        self._pontos: Dict[int, Tuple[PlanoAvaliacao, Dict[int, Decimal]]] = {}
+
+    def descricao(self) -> Dict[str, Any]:
+        """Registro da escolha em meta_execucao (e parâmetros para recriá-la)."""
+        return {
+            "modo": self.modo,
+            "precisao": self.precisao,
+            "casas": self.casas,
+            "arredondamento": self.arredondamento,
+            "arredondar": list(self.arredondar),
+        }
+
+    def contexto_local(self):
+        """Contexto decimal da avaliação (gerenciador `with`)."""
+        return localcontext(self.contexto)
+
+    # -----------------------------
+    # Pontos de arredondamento
+    # -----------------------------
+
+    def pontos(self, plano: PlanoAvaliacao) -> Dict[int, Decimal]:
+        """{slot: quantum} dos pontos de arredondamento do plano."""
+        em_cache = self._pontos.get(id(plano))
+        if em_cache is not None and em_cache[0] is plano:
+            return em_cache[1]
+
+        ausentes = [no_id for no_id in self.arredondar if no_id not in plano.slots]
+        if ausentes:
+            raise ValueError(
+                f"Pontos de arredondamento não alcançáveis a partir do nó raiz "
+                f"'{plano.no_raiz}': {ausentes}"
+            )
+
+        pontos: Dict[int, Decimal] = {plano.slots[no_id]: self._quantum for no_id in self.arredondar}
+        for slot, definicao in enumerate(plano.definicoes):
+            casas = definicao.get(CHAVE_CASAS_DECIMAIS)
+            if casas is None:
+                continue
+            if isinstance(casas, bool) or not isinstance(casas, int) or casas < 0:
+                raise ErroInterpretacao(
+                    f"Nó '{plano.ids[slot]}': '{CHAVE_CASAS_DECIMAIS}' deve ser um inteiro não negativo."
+                )
+            pontos.setdefault(slot, Decimal(1).scaleb(-casas))
+
+        self._pontos[id(plano)] = (plano, pontos)
+        return pontos
+
+    # -----------------------------
+    # Conversões
+    # -----------------------------
+
+    def converter(self, no_id: str, valor: Any) -> Decimal:
+        """Valor do Contexto -> Decimal pelo valor escrito (não pelo binário)."""
+        if isinstance(valor, Decimal):
+            exato = valor
+        elif isinstance(valor, float):
+            # repr é a menor grafia que identifica o float: a do JSON
+            exato = Decimal(repr(valor))
+        elif isinstance(valor, (int, str)):
+            try:
+                exato = Decimal(valor)
+            except InvalidOperation:
+                exato = None
+        else:
+            exato = None
+
+        if exato is None or not exato.is_finite():
+            raise ErroInterpretacao(
+                f"Valor de '{no_id}' no Contexto não é um número decimal: {valor!r}."
+            )
+        return exato
+
+    def arredondar_valor(self, no_id: str, valor: Decimal, quantum: Decimal) -> Decimal:
+        try:
+            return valor.quantize(quantum, rounding=self._regra, context=self.contexto)
+        except InvalidOperation:
+            raise ErroInterpretacao(
+                f"Nó '{no_id}': valor {valor} excede a precisão de {self.precisao} dígitos "
+                f"ao arredondar para {-quantum.as_tuple().exponent} casas."
+            ) from None
+
+
+# ----------------------------------------------------------------
+# Escolha da aritmética
+# ----------------------------------------------------------------
+
+def resolver_aritmetica(especificacao: Any) -> AritmeticaDecimal | None:
+    """
+    None (float) ou AritmeticaDecimal a partir de:
+    - None ou "float"
+    - "decimal" (parâmetros padrão)
+    - {"modo": "decimal", "casas": 2, ...} (ex.: meta_execucao["aritmetica"])
+    - uma AritmeticaDecimal
+    """
+    if especificacao is None or isinstance(especificacao, AritmeticaDecimal):
+        return especificacao
+
+    if isinstance(especificacao, str):
+        especificacao = {"modo": especificacao}
+    if not isinstance(especificacao, dict):
+        raise ValueError(f"Aritmética inválida: {especificacao!r}.")
+
+    parametros = dict(especificacao)
+    modo = parametros.pop("modo", "float")
+    if modo not in MODOS_ARITMETICA:
+        raise ValueError(
+            f"Modo de aritmética inválido: '{modo}'. Use um entre {MODOS_ARITMETICA}."
+        )
+    if modo == "float":
+        if parametros:
+            raise ValueError(
+                f"Parâmetros {sorted(parametros)} exigem aritmética 'decimal'."
+            )
+        return None
+
+    try:
+        return AritmeticaDecimal(**parametros)
+    except TypeError:
+        raise ValueError(
+            f"Parâmetros de aritmética decimal inválidos: {sorted(parametros)}."
+        ) from None
+
+
+# ----------------------------------------------------------------
+# Operações em Decimal
+# ----------------------------------------------------------------
+# soma, subtração, divisão e potência são as do interpretador: com
+# operandos Decimal, operam no contexto decimal corrente.
+
+_UM = Decimal(1)
+
+
+def _op_multiplicacao_decimal(no_id: str, valores: List[Decimal]) -> Decimal:
+    prod = _UM
+    for v in valores:
+        prod *= v
+    return prod
+
+
+def _op_raiz_decimal(no_id: str, valores: List[Decimal]) -> Decimal:
+    rad, indice = _validar_raiz(no_id, valores)
+
+    # raiz de índice ímpar de negativo: real (−∛8 = −2)
+    negativo = rad < 0
+    if negativo:
+        rad = -rad
+
+    try:
+        if indice == 2:
+            raiz = rad.sqrt()
+        else:
+            # exp(ln(rad)/n) com folga de dígitos: ∛8 sai 2, não 1,999...
+            with localcontext() as ctx:
+                ctx.prec += 6
+                raiz = (rad.ln() / indice).exp()
+            raiz = +raiz
+    except ArithmeticError as e:
+        raise ErroInterpretacao(f"Erro ao calcular raiz no nó '{no_id}': {e!r}")
+
+    if not raiz.is_finite():
+        raise ErroInterpretacao(
+            f"Erro ao calcular raiz no nó '{no_id}': radicando zero com índice negativo."
+        )
+    return -raiz if negativo else raiz
+
+
+# mesma indexação por opcode de interpretador.OPERACOES
+OPERACOES_DECIMAL = (
+    None,
+    None,
+    _op_soma,
+    _op_multiplicacao_decimal,
+    _op_subtracao,
+    _op_divisao,
+    _op_potencia,
+    _op_raiz_decimal,
+)
+
+
+# ----------------------------------------------------------------
+# Testes mínimos (sanity checks)
+# ----------------------------------------------------------------
+
+
+def _test_aritmetica_decimal():
+    from quase_sem_querer.motor.interpretador import InterpretadorArvoreNormativa
+
+    modelo = {
+        "raiz": "total",
+        "nos": [
+            {"id": "salario", "tipo": "referencia", "dependencias": []},
+            {"id": "percentual_a", "tipo": "constante", "dependencias": []},
+            {"id": "percentual_b", "tipo": "constante", "dependencias": []},
+            {"id": "parcela_a", "tipo": "multiplicacao", "dependencias": ["salario", "percentual_a"]},
+            {"id": "parcela_b", "tipo": "multiplicacao", "dependencias": ["parcela_a", "percentual_b"],
+             "casas_decimais": 2},
+            {"id": "oito", "tipo": "constante", "dependencias": []},
+            {"id": "tres", "tipo": "constante", "dependencias": []},
+            {"id": "raiz_cubica", "tipo": "raiz", "dependencias": ["oito", "tres"]},
+            {"id": "total", "tipo": "soma", "dependencias": ["salario", "parcela_a", "parcela_b", "raiz_cubica"]},
+        ],
+    }
+    contexto = {
+        "salario": {"valor": 1412.0},
+        "percentual_a": {"valor": 0.0833},
+        "percentual_b": {"valor": 0.032},
+        "oito": {"valor": 8},
+        "tres": {"valor": 3},
+    }
+
+    exata = AritmeticaDecimal(arredondar=["parcela_a"])
+    interp = InterpretadorArvoreNormativa(modelo, contexto, aritmetica=exata)
+    resultado = interp.executar("total")
+
+    nos = resultado["nos_avaliados"]
+    # 1412 × 0,0833 = 117,6196 -> 117,62; 117,62 × 0,032 = 3,76384 -> 3,76
+    assert nos["parcela_a"]["valor_calculado"] == 117.62
+    assert nos["parcela_b"]["valor_calculado"] == 3.76
+    assert nos["raiz_cubica"]["valor_calculado"] == 2.0
+    # 1412 + 117,62 + 3,76 + 2 (em float, a soma daria 1535.3799999999999)
+    assert repr(resultado["valor_final"]) == "1535.38"
+
+    # atualização incremental no mesmo modo
+    novo = interp.atualizar("salario", 1500.0)
+    assert repr(novo["valor_final"]) == "1630.95"   # 1500 + 124,95 + 4,00 + 2
+    assert nos["parcela_a"]["valor_calculado"] == 124.95
+
+    assert resolver_aritmetica(exata.descricao()).descricao() == exata.descricao()
+    assert resolver_aritmetica("float") is None
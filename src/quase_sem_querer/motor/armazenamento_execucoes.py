@@ -0,0 +1,731 @@
+# ================================================================
+# Armazenamento de Execuções
+# Projeto: Quase Sem Querer
+#
+# Responsabilidade:
+# - Guardar execuções persistidas (payload canônico) de forma
+#   append-only, indexada por hash do modelo, hash do contexto,
+#   nó raiz e data
+# - Agrupar gravações em lotes (group commit)
+# - Permitir gravação concorrente por várias sessões/processos
+# - Deduplicar por conteúdo (SHA-256) modelos, contextos e metadados
+#   jurídicos: cada execução guarda apenas hashes e o vetor de valores,
+#   e o resultado canônico é reconstruído na leitura
+#
+# Implementações:
+# - ArmazemSQLite:        banco SQLite (stdlib), modo WAL — padrão
+# - ArmazemArquivosJSON:  um arquivo JSON por execução (legado)
+#
+# Não calcula, não valida modelo, não monta o payload.
+# ================================================================
+
+from __future__ import annotations
+
+import atexit
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Tuple
+
+from quase_sem_querer.motor.hash_merkle import hash_contexto, hash_modelo
+
+
+DIR_RESULTADOS = Path(__file__).resolve().parent.parent / "resultados"
+
+TAMANHO_LOTE_PADRAO = 1
+
+LIMITE_BLOBS_CONHECIDOS = 100_000
+
+
+class ErroArmazenamento(Exception):
+    """Erro ao gravar ou consultar o armazenamento de execuções."""
+    pass
+
+
+# ----------------------------------------------------------------
+# Interface
+# ----------------------------------------------------------------
+
+class ArmazemExecucoes:
+    """
+    Interface dos armazenamentos de execuções.
+
+    Payloads seguem o formato de PersistidorExecucao:
+    {"meta_execucao": {...}, "resultado": {...}}
+    """
+
+    def registrar(
+        self,
+        payload: Dict[str, Any],
+        *,
+        modelo_normativo: Dict[str, Any] | None = None,
+        contexto: Dict[str, Any] | None = None,
+    ) -> str:
+        """
+        Acrescenta uma execução; retorna seu id_execucao.
+
+        Modelo e contexto, quando informados, permitem ao armazém guardar
+        a execução de forma deduplicada (ver ArmazemSQLite).
+        """
+        raise NotImplementedError
+
+    def flush(self) -> None:
+        """Torna duráveis as gravações pendentes."""
+
+    def obter(self, id_execucao: str) -> Dict[str, Any] | None:
+        raise NotImplementedError
+
+    def buscar(
+        self,
+        *,
+        hash_modelo_normativo: str | None = None,
+        hash_contexto: str | None = None,
+        no_raiz: str | None = None,
+        desde: str | None = None,
+        ate: str | None = None,
+        limite: int | None = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Metadados (meta_execucao) das execuções que atendem aos filtros,
+        em ordem cronológica. `desde`/`ate` são datas ISO-8601 (UTC).
+        """
+        raise NotImplementedError
+
+    def fechar(self) -> None:
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+
+# ----------------------------------------------------------------
+# SQLite
+# ----------------------------------------------------------------
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS execucoes (
+    id_execucao TEXT PRIMARY KEY,
+    data_execucao_utc TEXT NOT NULL,
+    no_raiz TEXT,
+    hash_modelo_normativo TEXT,
+    hash_contexto TEXT,
+    valor_final REAL,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_execucoes_modelo
+    ON execucoes (hash_modelo_normativo, data_execucao_utc);
+CREATE INDEX IF NOT EXISTS idx_execucoes_contexto
+    ON execucoes (hash_contexto, data_execucao_utc);
+CREATE INDEX IF NOT EXISTS idx_execucoes_raiz
+    ON execucoes (no_raiz, data_execucao_utc);
+CREATE INDEX IF NOT EXISTS idx_execucoes_data
+    ON execucoes (data_execucao_utc);
+CREATE TABLE IF NOT EXISTS blobs (
+    hash TEXT PRIMARY KEY,
+    tipo TEXT NOT NULL,
+    conteudo TEXT NOT NULL
+);
+"""
+
+# tipos de blob
+BLOB_MODELO = "modelo"
+BLOB_CONTEXTO = "contexto"
+BLOB_METADADOS = "metadados"
+BLOB_ORDEM = "ordem"
+
+_REF_BLOB = "$blob"
+
+_COLUNAS_META = (
+    "id_execucao",
+    "data_execucao_utc",
+    "no_raiz",
+    "hash_modelo_normativo",
+    "hash_contexto",
+)
+
+
+class ArmazemSQLite(ArmazemExecucoes):
+    """
+    Execuções em uma tabela SQLite indexada.
+
+    Gravações ficam em memória até `tamanho_lote` execuções e são então
+    inseridas em uma única transação. WAL + busy_timeout permitem que
+    várias sessões e processos gravem no mesmo arquivo.
+
+    Quando modelo e contexto acompanham a execução, ela é guardada em
+    forma compacta: o modelo (com metadados jurídicos como blobs
+    próprios), o contexto e a ordem da trilha ficam na tabela `blobs`,
+    endereçados por SHA-256; a execução guarda só hashes e valores.
+    """
+
+    def __init__(self, caminho: Path | None = None, *, tamanho_lote: int = TAMANHO_LOTE_PADRAO):
+        if tamanho_lote < 1:
+            raise ValueError("'tamanho_lote' deve ser positivo.")
+
+        self.caminho = Path(caminho or DIR_RESULTADOS / "execucoes.sqlite3")
+        self.caminho.parent.mkdir(parents=True, exist_ok=True)
+        self.tamanho_lote = tamanho_lote
+
+        self._pendentes: List[tuple] = []
+        self._blobs_pendentes: Dict[str, tuple] = {}
+        self._blobs_gravados: set = set()
+        self._modelos_lidos: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+        self._conexao = sqlite3.connect(
+            self.caminho,
+            timeout=30.0,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        self._conexao.execute("PRAGMA journal_mode=WAL")
+        self._conexao.execute("PRAGMA synchronous=NORMAL")
+        self._conexao.executescript(_ESQUEMA)
+
+    # -----------------------------
+    # Gravação
+    # -----------------------------
+
+    def registrar(
+        self,
+        payload: Dict[str, Any],
+        *,
+        modelo_normativo: Dict[str, Any] | None = None,
+        contexto: Dict[str, Any] | None = None,
+    ) -> str:
+        meta = payload["meta_execucao"]
+        resultado = payload.get("resultado") or {}
+
+        blobs: Dict[str, tuple] = {}
+        armazenado: Dict[str, Any] = payload
+        if modelo_normativo is not None and contexto is not None:
+            compacto = self._compactar(payload, modelo_normativo, contexto, blobs)
+            if compacto is not None:
+                armazenado = compacto
+
+        linha = (
+            meta["id_execucao"],
+            meta["data_execucao_utc"],
+            meta.get("no_raiz"),
+            meta.get("hash_modelo_normativo"),
+            meta.get("hash_contexto"),
+            resultado.get("valor_final"),
+            json.dumps(armazenado, ensure_ascii=False, separators=(",", ":")),
+        )
+
+        with self._lock:
+            self._blobs_pendentes.update(blobs)
+            self._pendentes.append(linha)
+            if len(self._pendentes) >= self.tamanho_lote:
+                self._gravar_pendentes()
+
+        return meta["id_execucao"]
+
+    def flush(self) -> None:
+        with self._lock:
+            self._gravar_pendentes()
+
+    def fechar(self) -> None:
+        with self._lock:
+            self._gravar_pendentes()
+            self._conexao.close()
+
+    def _gravar_pendentes(self) -> None:
+        # chamado com self._lock adquirido
+        if not self._pendentes and not self._blobs_pendentes:
+            return
+        try:
+            self._conexao.execute("BEGIN IMMEDIATE")
+            self._conexao.executemany(
+                "INSERT OR IGNORE INTO blobs VALUES (?, ?, ?)",
+                [(h, *conteudo) for h, conteudo in self._blobs_pendentes.items()],
+            )
+            self._conexao.executemany(
+                "INSERT OR IGNORE INTO execucoes VALUES (?, ?, ?, ?, ?, ?, ?)",
+                self._pendentes,
+            )
+            self._conexao.execute("COMMIT")
+        except sqlite3.Error as e:
+            if self._conexao.in_transaction:
+                self._conexao.execute("ROLLBACK")
+            raise ErroArmazenamento(f"Falha ao gravar execuções em {self.caminho}: {e}")
+        if len(self._blobs_gravados) > LIMITE_BLOBS_CONHECIDOS:
+            # apenas um atalho: INSERT OR IGNORE garante a deduplicação
+            self._blobs_gravados.clear()
+        self._blobs_gravados.update(self._blobs_pendentes)
+        self._blobs_pendentes.clear()
+        self._pendentes.clear()
+
+    # -----------------------------
+    # Deduplicação por conteúdo
+    # -----------------------------
+
+    def _compactar(
+        self,
+        payload: Dict[str, Any],
+        modelo: Dict[str, Any],
+        contexto: Dict[str, Any],
+        blobs: Dict[str, tuple],
+    ) -> Dict[str, Any] | None:
+        """
+        Forma compacta da execução, ou None se a trilha não puder ser
+        reconstruída a partir do modelo (nesse caso, grava-se o payload).
+        """
+        meta = payload["meta_execucao"]
+        resultado = payload.get("resultado") or {}
+        trilha = resultado.get("trilha_calculo")
+        if not isinstance(trilha, dict):
+            return None
+
+        nos = {no["id"]: no for no in modelo.get("nos", [])}
+        for no_id, entrada in trilha.items():
+            no = nos.get(no_id)
+            if no is None or entrada.get("tipo") != no.get("tipo"):
+                return None
+        nos_avaliados = resultado.get("nos_avaliados")
+        if nos_avaliados is not None and list(nos_avaliados) != list(trilha):
+            return None
+
+        hash_do_modelo = meta.get("hash_modelo_normativo") or hash_modelo(modelo)
+        hash_do_contexto = meta.get("hash_contexto") or hash_contexto(contexto)
+
+        if not self._blob_conhecido(hash_do_modelo, blobs):
+            blobs[hash_do_modelo] = (BLOB_MODELO, _serializar(self._modelo_normalizado(modelo, blobs)))
+        if not self._blob_conhecido(hash_do_contexto, blobs):
+            blobs[hash_do_contexto] = (BLOB_CONTEXTO, _serializar(contexto))
+
+        ordem = list(trilha)
+        ordem_serializada = _serializar(ordem)
+        hash_ordem = hashlib.sha256(ordem_serializada.encode("utf-8")).hexdigest()
+        if not self._blob_conhecido(hash_ordem, blobs):
+            blobs[hash_ordem] = (BLOB_ORDEM, ordem_serializada)
+
+        base = {
+            chave: valor
+            for chave, valor in resultado.items()
+            if chave not in ("trilha_calculo", "nos_avaliados")
+        }
+
+        return {
+            "meta_execucao": meta,
+            "resultado_compacto": {
+                "base": base,
+                "hash_modelo_normativo": hash_do_modelo,
+                "hash_contexto": hash_do_contexto,
+                "hash_ordem": hash_ordem,
+                "valores": [trilha[no_id].get("valor_calculado") for no_id in ordem],
+                "com_nos_avaliados": nos_avaliados is not None,
+            },
+        }
+
+    def _modelo_normalizado(self, modelo: Dict[str, Any], blobs: Dict[str, tuple]) -> Dict[str, Any]:
+        # metadados jurídicos viram blobs próprios (compartilhados entre versões do modelo)
+        nos = []
+        for no in modelo.get("nos", []):
+            metadados = no.get("metadados_juridicos")
+            if metadados:
+                serializado = _serializar(metadados)
+                hash_meta = hashlib.sha256(serializado.encode("utf-8")).hexdigest()
+                if not self._blob_conhecido(hash_meta, blobs):
+                    blobs[hash_meta] = (BLOB_METADADOS, serializado)
+                no = {**no, "metadados_juridicos": {_REF_BLOB: hash_meta}}
+            nos.append(no)
+        return {**modelo, "nos": nos}
+
+    def _blob_conhecido(self, hash_blob: str, blobs: Dict[str, tuple]) -> bool:
+        return (
+            hash_blob in blobs
+            or hash_blob in self._blobs_gravados
+            or hash_blob in self._blobs_pendentes
+        )
+
+    def obter_blob(self, hash_blob: str) -> Any:
+        """Conteúdo de um blob (modelo normalizado, contexto, metadados ou ordem)."""
+        with self._lock:
+            pendente = self._blobs_pendentes.get(hash_blob)
+            if pendente is not None:
+                return json.loads(pendente[1])
+            linha = self._conexao.execute(
+                "SELECT conteudo FROM blobs WHERE hash = ?", (hash_blob,)
+            ).fetchone()
+        if linha is None:
+            raise ErroArmazenamento(f"Blob inexistente no armazém: {hash_blob}")
+        return json.loads(linha[0])
+
+    def obter_modelo(self, hash_modelo: str) -> Dict[str, Any]:
+        """Modelo normativo achatado, com metadados jurídicos expandidos."""
+        modelo = self.obter_blob(hash_modelo)
+        cache_meta: Dict[str, Any] = {}
+        nos = []
+        for no in modelo.get("nos", []):
+            metadados = no.get("metadados_juridicos")
+            if isinstance(metadados, dict) and _REF_BLOB in metadados:
+                hash_meta = metadados[_REF_BLOB]
+                if hash_meta not in cache_meta:
+                    cache_meta[hash_meta] = self.obter_blob(hash_meta)
+                no = {**no, "metadados_juridicos": cache_meta[hash_meta]}
+            nos.append(no)
+        return {**modelo, "nos": nos}
+
+    def _reconstruir(self, armazenado: Dict[str, Any]) -> Dict[str, Any]:
+        compacto = armazenado.get("resultado_compacto")
+        if compacto is None:
+            return armazenado
+
+        hash_modelo = compacto["hash_modelo_normativo"]
+        nos = self._modelos_lidos.get(hash_modelo)
+        if nos is None:
+            nos = {no["id"]: no for no in self.obter_modelo(hash_modelo)["nos"]}
+            if len(self._modelos_lidos) >= 8:
+                self._modelos_lidos.pop(next(iter(self._modelos_lidos)))
+            self._modelos_lidos[hash_modelo] = nos
+
+        ordem = self.obter_blob(compacto["hash_ordem"])
+
+        trilha = {}
+        nos_avaliados = {}
+        for no_id, valor in zip(ordem, compacto["valores"]):
+            no = nos[no_id]
+            entrada = {
+                "tipo": no["tipo"],
+                "dependencias": no.get("dependencias", []),
+                "valor_calculado": valor,
+                "metadados_juridicos": no.get("metadados_juridicos", {}),
+            }
+            trilha[no_id] = entrada
+            nos_avaliados[no_id] = {**entrada, "dependencias": list(entrada["dependencias"])}
+
+        resultado = dict(compacto["base"])
+        resultado["trilha_calculo"] = trilha
+        if compacto.get("com_nos_avaliados", True):
+            resultado["nos_avaliados"] = nos_avaliados
+
+        return {"meta_execucao": armazenado["meta_execucao"], "resultado": resultado}
+
+    # -----------------------------
+    # Consulta
+    # -----------------------------
+
+    def obter(self, id_execucao: str) -> Dict[str, Any] | None:
+        self.flush()
+        with self._lock:
+            linha = self._conexao.execute(
+                "SELECT payload FROM execucoes WHERE id_execucao = ?",
+                (id_execucao,),
+            ).fetchone()
+        return self._reconstruir(json.loads(linha[0])) if linha else None
+
+    def buscar(
+        self,
+        *,
+        hash_modelo_normativo: str | None = None,
+        hash_contexto: str | None = None,
+        no_raiz: str | None = None,
+        desde: str | None = None,
+        ate: str | None = None,
+        limite: int | None = None,
+    ) -> List[Dict[str, Any]]:
+        filtros = []
+        parametros: List[Any] = []
+
+        for coluna, valor in (
+            ("hash_modelo_normativo", hash_modelo_normativo),
+            ("hash_contexto", hash_contexto),
+            ("no_raiz", no_raiz),
+        ):
+            if valor is not None:
+                filtros.append(f"{coluna} = ?")
+                parametros.append(valor)
+        if desde is not None:
+            filtros.append("data_execucao_utc >= ?")
+            parametros.append(desde)
+        if ate is not None:
+            filtros.append("data_execucao_utc <= ?")
+            parametros.append(ate)
+
+        sql = f"SELECT {', '.join(_COLUNAS_META)}, valor_final FROM execucoes"
+        if filtros:
+            sql += " WHERE " + " AND ".join(filtros)
+        sql += " ORDER BY data_execucao_utc"
+        if limite is not None:
+            sql += " LIMIT ?"
+            parametros.append(int(limite))
+
+        self.flush()
+        with self._lock:
+            linhas = self._conexao.execute(sql, parametros).fetchall()
+
+        colunas = _COLUNAS_META + ("valor_final",)
+        return [dict(zip(colunas, linha)) for linha in linhas]
+
+    def percentis_tempo(
+        self,
+        fase: str = "total",
+        *,
+        percentis: tuple = (50, 90, 99),
+        no_raiz: str | None = None,
+        desde: str | None = None,
+        ate: str | None = None,
+    ) -> Dict[str, float | int | None]:
+        """
+        Percentis (ms) de uma fase registrada em
+        meta_execucao.instrumentacao.tempos_ms, ex.: "total", "avaliar".
+        """
+        filtros = ["json_extract(payload, ?) IS NOT NULL"]
+        caminho_json = f'$.meta_execucao.instrumentacao.tempos_ms."{fase}"'
+        parametros: List[Any] = [caminho_json, caminho_json]
+        for condicao, valor in (
+            ("no_raiz = ?", no_raiz),
+            ("data_execucao_utc >= ?", desde),
+            ("data_execucao_utc <= ?", ate),
+        ):
+            if valor is not None:
+                filtros.append(condicao)
+                parametros.append(valor)
+
+        sql = (
+            "SELECT json_extract(payload, ?) AS tempo FROM execucoes "
+            f"WHERE {' AND '.join(filtros)} ORDER BY tempo"
+        )
+
+        self.flush()
+        with self._lock:
+            tempos = [linha[0] for linha in self._conexao.execute(sql, parametros)]
+
+        saida: Dict[str, float | int | None] = {"amostras": len(tempos)}
+        for p in percentis:
+            # método do posto mais próximo
+            saida[f"p{p}"] = tempos[max(0, -(-len(tempos) * p // 100) - 1)] if tempos else None
+        return saida
+
+    def iterar_payloads(
+        self,
+        *,
+        desde: str | None = None,
+        apos_id: str | None = None,
+        tamanho_pagina: int = 1000,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Percorre os payloads completos em ordem cronológica, paginando
+        pelo índice de data (memória limitada a uma página).
+
+        Com `apos_id`, retoma depois da execução (desde, apos_id), já
+        vista em uma leitura anterior.
+        """
+        self.flush()
+        cursor_chave = (desde or "", apos_id or "")
+
+        while True:
+            with self._lock:
+                linhas = self._conexao.execute(
+                    "SELECT data_execucao_utc, id_execucao, payload FROM execucoes "
+                    "WHERE (data_execucao_utc, id_execucao) > (?, ?) "
+                    "ORDER BY data_execucao_utc, id_execucao LIMIT ?",
+                    (*cursor_chave, tamanho_pagina),
+                ).fetchall()
+            if not linhas:
+                return
+            for _, _, payload in linhas:
+                yield self._reconstruir(json.loads(payload))
+            cursor_chave = (linhas[-1][0], linhas[-1][1])
+
+    def iterar_gravadas(
+        self,
+        *,
+        apos_posicao: int = 0,
+        tamanho_pagina: int = 1000,
+    ) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """
+        Percorre (posicao, payload) na ordem em que as execuções foram
+        gravadas, paginando pelo rowid (memória limitada a uma página).
+
+        A posição cresce com a gravação, não com a data da execução:
+        com gravação em lotes ou vários processos, uma execução mais
+        antiga pode ser gravada depois de uma mais nova. Para retomar
+        uma leitura sem perder execuções, use `apos_posicao` com a
+        última posição vista (e não a data).
+        """
+        self.flush()
+        # append-only e sem VACUUM: o rowid implícito segue a ordem dos commits
+        # (as transações de escrita são serializadas por BEGIN IMMEDIATE)
+        while True:
+            with self._lock:
+                linhas = self._conexao.execute(
+                    "SELECT rowid, payload FROM execucoes WHERE rowid > ? "
+                    "ORDER BY rowid LIMIT ?",
+                    (apos_posicao, tamanho_pagina),
+                ).fetchall()
+            if not linhas:
+                return
+            for posicao, payload in linhas:
+                yield posicao, self._reconstruir(json.loads(payload))
+            apos_posicao = linhas[-1][0]
+
+    def posicao(self, id_execucao: str) -> int | None:
+        """Posição de gravação (ver iterar_gravadas) de uma execução."""
+        self.flush()
+        with self._lock:
+            linha = self._conexao.execute(
+                "SELECT rowid FROM execucoes WHERE id_execucao = ?", (id_execucao,)
+            ).fetchone()
+        return linha[0] if linha else None
+
+    def __len__(self) -> int:
+        self.flush()
+        with self._lock:
+            return self._conexao.execute("SELECT COUNT(*) FROM execucoes").fetchone()[0]
+
+
+# ----------------------------------------------------------------
+# Arquivos JSON (legado)
+# ----------------------------------------------------------------
+
+class ArmazemArquivosJSON(ArmazemExecucoes):
+    """Um arquivo JSON indentado por execução (formato original)."""
+
+    def __init__(self, diretorio: Path | None = None):
+        self.diretorio = Path(diretorio or DIR_RESULTADOS / "execucoes")
+        self.diretorio.mkdir(parents=True, exist_ok=True)
+
+    def caminho(self, id_execucao: str) -> Path:
+        return self.diretorio / f"{id_execucao}.json"
+
+    def registrar(
+        self,
+        payload: Dict[str, Any],
+        *,
+        modelo_normativo: Dict[str, Any] | None = None,
+        contexto: Dict[str, Any] | None = None,
+    ) -> str:
+        id_execucao = payload["meta_execucao"]["id_execucao"]
+
+        # escrita atômica: arquivo temporário no mesmo diretório + rename
+        descritor, temporario = tempfile.mkstemp(
+            dir=self.diretorio, prefix=f".{id_execucao}.", suffix=".tmp"
+        )
+        try:
+            with os.fdopen(descritor, "w", encoding="utf-8") as f:
+                json.dump(payload, f, indent=2, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temporario, self.caminho(id_execucao))
+        except BaseException:
+            Path(temporario).unlink(missing_ok=True)
+            raise
+        return id_execucao
+
+    def obter(self, id_execucao: str) -> Dict[str, Any] | None:
+        caminho = self.caminho(id_execucao)
+        if not caminho.exists():
+            return None
+        with caminho.open("r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def iterar_payloads(
+        self,
+        *,
+        desde: str | None = None,
+        apos_id: str | None = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Percorre os arquivos em ordem de id (cronológica). Com `apos_id`,
+        arquivos de ids até ele nem são abertos.
+        """
+        for caminho in sorted(self.diretorio.glob("execucao_*.json")):
+            if apos_id is not None and caminho.stem <= apos_id:
+                continue
+            with caminho.open("r", encoding="utf-8") as f:
+                payload = json.load(f)
+            if desde is None or payload["meta_execucao"]["data_execucao_utc"] >= desde:
+                yield payload
+
+    def buscar(
+        self,
+        *,
+        hash_modelo_normativo: str | None = None,
+        hash_contexto: str | None = None,
+        no_raiz: str | None = None,
+        desde: str | None = None,
+        ate: str | None = None,
+        limite: int | None = None,
+    ) -> List[Dict[str, Any]]:
+        # varredura completa: é exatamente o custo que ArmazemSQLite evita
+        encontrados = []
+        for payload in self.iterar_payloads(desde=desde):
+            meta = payload["meta_execucao"]
+            if hash_modelo_normativo is not None and meta.get("hash_modelo_normativo") != hash_modelo_normativo:
+                continue
+            if hash_contexto is not None and meta.get("hash_contexto") != hash_contexto:
+                continue
+            if no_raiz is not None and meta.get("no_raiz") != no_raiz:
+                continue
+            if ate is not None and meta["data_execucao_utc"] > ate:
+                continue
+            registro = {coluna: meta.get(coluna) for coluna in _COLUNAS_META}
+            registro["valor_final"] = (payload.get("resultado") or {}).get("valor_final")
+            encontrados.append(registro)
+
+        encontrados.sort(key=lambda r: r["data_execucao_utc"])
+        return encontrados[:limite] if limite is not None else encontrados
+
+
+# ----------------------------------------------------------------
+# Armazém padrão do processo
+# ----------------------------------------------------------------
+
+_ARMAZEM_PADRAO: ArmazemExecucoes | None = None
+_LOCK_PADRAO = threading.Lock()
+
+
+def armazem_padrao() -> ArmazemExecucoes:
+    """
+    Armazém compartilhado pelo processo: ArmazemSQLite gravado em
+    segundo plano por um GravadorAssincrono, esvaziado na saída.
+    """
+    global _ARMAZEM_PADRAO
+    with _LOCK_PADRAO:
+        if _ARMAZEM_PADRAO is None:
+            # importação local: o gravador depende deste módulo
+            from quase_sem_querer.motor.gravador_assincrono import (
+                TAMANHO_LOTE_PADRAO as TAMANHO_LOTE_GRAVADOR,
+                GravadorAssincrono,
+            )
+
+            _ARMAZEM_PADRAO = GravadorAssincrono(
+                # o gravador chama flush a cada lote: commits agrupados por ele
+                ArmazemSQLite(tamanho_lote=TAMANHO_LOTE_GRAVADOR)
+            )
+            atexit.register(_ARMAZEM_PADRAO.fechar)
+        return _ARMAZEM_PADRAO
+
+
+def importar_arquivos_json(
+    destino: ArmazemExecucoes,
+    diretorio: Path | None = None,
+) -> int:
+    """
+    Migra execuções gravadas como um JSON por arquivo para `destino`.
+    Execuções já existentes no destino são ignoradas.
+    """
+    origem = ArmazemArquivosJSON(diretorio)
+    total = 0
+    for payload in origem.iterar_payloads():
+        destino.registrar(payload)
+        total += 1
+    destino.flush()
+    return total
+
+
+# ----------------------------------------------------------------
+# Utilidades
+# ----------------------------------------------------------------
+
+def _serializar(objeto: Any) -> str:
+    return json.dumps(objeto, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
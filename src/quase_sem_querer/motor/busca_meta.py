@@ -0,0 +1,352 @@
+# ================================================================
+# Busca de meta (goal seek)
+# Projeto: Quase Sem Querer
+#
+# Responsabilidade:
+# - Encontrar o valor de uma folha do Contexto que faz um nó alvo
+#   atingir um valor desejado (ex.: salário base que produz um preço
+#   de posto; percentual de lucro que atinge o teto de referência)
+# - Resolver muitos pedidos em lote sobre o mesmo interpretador
+#
+# Método: Newton com derivada exata (modo direto sobre o cone da
+# folha, com as derivadas locais de sensibilidade), protegido por
+# bisseção quando o passo sai do intervalo que contém a raiz ou a
+# derivada se anula. Cada avaliação usa InterpretadorArvoreNormativa
+# .atualizar: só os nós que dependem da folha são recalculados. Em
+# modelos lineares na folha, a solução sai em um passo.
+#
+# Não altera o Contexto recebido. Não persiste.
+# ================================================================
+
+from __future__ import annotations
+
+import math
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+from quase_sem_querer.motor.interpretador import (
+    OPCODES_FOLHA,
+    TIPOS_POR_OPCODE,
+    ErroInterpretacao,
+    InterpretadorArvoreNormativa,
+    PlanoAvaliacao,
+)
+from quase_sem_querer.motor.sensibilidade import derivadas_locais
+
+
+TOLERANCIA_PADRAO = 1e-6
+MAXIMO_ITERACOES = 60
+
+
+class ErroBuscaMeta(Exception):
+    """Pedido de busca de meta inválido (folha, alvo ou intervalo)."""
+    pass
+
+
+# ----------------------------------------------------------------
+# API pública
+# ----------------------------------------------------------------
+
+def buscar_meta(
+    modelo: Dict[str, Any],
+    contexto: Dict[str, Any],
+    *,
+    folha: str,
+    alvo_valor: float,
+    alvo_no: str | None = None,
+    intervalo: Tuple[float, float] | None = None,
+    tolerancia: float = TOLERANCIA_PADRAO,
+    maximo_iteracoes: int = MAXIMO_ITERACOES,
+    plano: PlanoAvaliacao | None = None,
+) -> Dict[str, Any]:
+    """
+    Valor de `folha` com o qual `alvo_no` (padrão: raiz do modelo)
+    vale `alvo_valor`, a menos de `tolerancia` (absoluta).
+
+    `intervalo` (mín, máx), se informado, restringe a busca e deve
+    conter a solução. Retorna uma linha de buscar_metas.
+    """
+    return next(buscar_metas(
+        modelo,
+        contexto,
+        [{"folha": folha, "alvo_valor": alvo_valor, "alvo_no": alvo_no, "intervalo": intervalo}],
+        tolerancia=tolerancia,
+        maximo_iteracoes=maximo_iteracoes,
+        plano=plano,
+    ))
+
+
+def buscar_metas(
+    modelo: Dict[str, Any],
+    contexto: Dict[str, Any],
+    pedidos: Iterable[Dict[str, Any]],
+    *,
+    tolerancia: float = TOLERANCIA_PADRAO,
+    maximo_iteracoes: int = MAXIMO_ITERACOES,
+    plano: PlanoAvaliacao | None = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Resolve cada pedido {"folha", "alvo_valor", "alvo_no"?, "intervalo"?}
+    a partir do mesmo Contexto, na ordem recebida. Produz, por pedido:
+
+    {folha, alvo_no, alvo_valor, valor_folha, valor_obtido, convergiu,
+     iteracoes, avaliacoes, erro}
+
+    O interpretador é reaproveitado entre pedidos do mesmo nó alvo; a
+    solução anterior da mesma folha serve de ponto de partida.
+    """
+    if tolerancia <= 0:
+        raise ValueError("'tolerancia' deve ser positiva.")
+
+    interpretador = InterpretadorArvoreNormativa(modelo, contexto)
+    no_executado = None
+    plano_alvo = plano
+    ultimas: Dict[Tuple[str, str], float] = {}
+
+    for pedido in pedidos:
+        folha = pedido["folha"]
+        alvo_no = pedido.get("alvo_no") or modelo.get("raiz")
+        linha: Dict[str, Any] = {
+            "folha": folha,
+            "alvo_no": alvo_no,
+            "alvo_valor": pedido["alvo_valor"],
+            "valor_folha": None,
+            "valor_obtido": None,
+            "convergiu": False,
+            "iteracoes": 0,
+            "avaliacoes": 0,
+            "erro": None,
+        }
+
+        try:
+            if not alvo_no:
+                raise ErroBuscaMeta("Modelo sem raiz declarada: informe 'alvo_no'.")
+
+            if alvo_no != no_executado:
+                plano_alvo = (
+                    plano
+                    if plano is not None and plano.no_raiz == alvo_no
+                    else interpretador.compilar(alvo_no)
+                )
+                interpretador.executar(alvo_no, plano=plano_alvo, modo="valor")
+                no_executado = alvo_no
+
+            inicial = _valor_inicial(contexto, folha)
+            partida = ultimas.get((folha, alvo_no), inicial)
+            try:
+                _resolver(
+                    interpretador,
+                    plano_alvo,
+                    linha,
+                    partida=partida,
+                    intervalo=pedido.get("intervalo"),
+                    tolerancia=tolerancia,
+                    maximo_iteracoes=maximo_iteracoes,
+                )
+            finally:
+                # o próximo pedido parte do Contexto original
+                interpretador.atualizar(folha, inicial)
+        except (ErroBuscaMeta, ErroInterpretacao) as e:
+            linha["erro"] = str(e)
+
+        if linha["convergiu"]:
+            ultimas[(folha, alvo_no)] = linha["valor_folha"]
+        yield linha
+
+
+# ----------------------------------------------------------------
+# Newton protegido por bisseção
+# ----------------------------------------------------------------
+
+def _resolver(
+    interpretador: InterpretadorArvoreNormativa,
+    plano: PlanoAvaliacao,
+    linha: Dict[str, Any],
+    *,
+    partida: float,
+    intervalo: Tuple[float, float] | None,
+    tolerancia: float,
+    maximo_iteracoes: int,
+) -> None:
+    folha = linha["folha"]
+    alvo = linha["alvo_valor"]
+    slot = plano.slots.get(folha)
+    if slot is None or plano.opcodes[slot] not in OPCODES_FOLHA:
+        raise ErroBuscaMeta(
+            f"'{folha}' não é folha do cálculo de '{plano.no_raiz}'."
+        )
+    cone = plano.ancestrais(slot)
+
+    def residuo(x: float) -> float | None:
+        linha["avaliacoes"] += 1
+        try:
+            return interpretador.atualizar(folha, x)["valor_final"] - alvo
+        except ErroInterpretacao:
+            return None
+
+    # [a, b] com resíduos de sinais opostos, quando conhecido
+    limites: List[Tuple[float, float]] = []
+    if intervalo is not None:
+        a, b = sorted(float(v) for v in intervalo)
+        ra, rb = residuo(a), residuo(b)
+        if ra is None or rb is None:
+            raise ErroBuscaMeta(f"Cálculo inválido em um dos extremos do intervalo {intervalo}.")
+        if ra == 0 or rb == 0:
+            _concluir(linha, a if ra == 0 else b, alvo + (ra if ra == 0 else rb))
+            return
+        if (ra > 0) == (rb > 0):
+            raise ErroBuscaMeta(
+                f"O intervalo {intervalo} não contém a meta: "
+                f"'{linha['alvo_no']}' vai de {ra + alvo} a {rb + alvo}."
+            )
+        limites = [(a, ra), (b, rb)]
+        if not a <= partida <= b:
+            partida = (a + b) / 2
+
+    x = partida
+    r = residuo(x)
+    if r is None:
+        raise ErroBuscaMeta(f"Cálculo inválido no ponto de partida {folha} = {x}.")
+
+    for iteracao in range(1, maximo_iteracoes + 1):
+        linha["iteracoes"] = iteracao
+        if abs(r) <= tolerancia:
+            _concluir(linha, x, r + alvo)
+            return
+
+        derivada = _derivada(interpretador, plano, slot, cone)
+        proximo = None
+        if derivada and math.isfinite(derivada):
+            proximo = x - r / derivada
+            if limites and not min(limites)[0] < proximo < max(limites)[0]:
+                proximo = None
+        if proximo is None:
+            if not limites:
+                raise ErroBuscaMeta(
+                    f"Derivada nula ou indefinida em {folha} = {x}: informe 'intervalo'."
+                )
+            proximo = (limites[0][0] + limites[1][0]) / 2
+
+        r_proximo = residuo(proximo)
+        if r_proximo is None:
+            if not limites:
+                raise ErroBuscaMeta(f"Cálculo inválido em {folha} = {proximo}: informe 'intervalo'.")
+            # ponto inválido dentro do intervalo: recua pela bisseção
+            proximo = (limites[0][0] + limites[1][0]) / 2
+            r_proximo = residuo(proximo)
+            if r_proximo is None:
+                raise ErroBuscaMeta(f"Cálculo inválido em {folha} = {proximo}.")
+
+        limites = _atualizar_limites(limites, (x, r), (proximo, r_proximo))
+        if proximo == x:
+            break
+        x, r = proximo, r_proximo
+
+    if abs(r) <= tolerancia:
+        _concluir(linha, x, r + alvo)
+        return
+    linha["valor_folha"] = x
+    linha["valor_obtido"] = r + alvo
+    linha["erro"] = f"Sem convergência em {maximo_iteracoes} iterações (resíduo {r})."
+
+
+def _atualizar_limites(
+    limites: List[Tuple[float, float]],
+    anterior: Tuple[float, float],
+    novo: Tuple[float, float],
+) -> List[Tuple[float, float]]:
+    """Menor intervalo conhecido com resíduos de sinais opostos."""
+    if not limites:
+        if (anterior[1] > 0) != (novo[1] > 0):
+            return sorted([anterior, novo])
+        return []
+    a, b = limites
+    if (novo[1] > 0) == (a[1] > 0):
+        return [novo, b] if novo[0] > a[0] else [a, b]
+    return [a, novo] if novo[0] < b[0] else [a, b]
+
+
+def _derivada(
+    interpretador: InterpretadorArvoreNormativa,
+    plano: PlanoAvaliacao,
+    slot: int,
+    cone: List[int],
+) -> float:
+    """∂alvo/∂folha no ponto atual (modo direto sobre o cone da folha)."""
+    memo = interpretador.memo
+    ids = plano.ids
+    tangentes = {slot: 1.0}
+    for ancestral in cone:
+        operandos = plano.operandos[ancestral]
+        valores = [memo[ids[i]] for i in operandos]
+        locais = derivadas_locais(
+            TIPOS_POR_OPCODE[plano.opcodes[ancestral]],
+            valores,
+            memo[ids[ancestral]],
+        )
+        tangentes[ancestral] = sum(
+            local * tangentes[op]
+            for op, local in zip(operandos, locais)
+            if op in tangentes
+        )
+    return tangentes.get(len(ids) - 1, 0.0)
+
+
+def _valor_inicial(contexto: Dict[str, Any], folha: str) -> float:
+    item = contexto.get(folha)
+    valor = item.get("valor") if isinstance(item, dict) else None
+    if not isinstance(valor, (int, float)) or isinstance(valor, bool):
+        raise ErroBuscaMeta(
+            f"Folha '{folha}' sem valor numérico no Contexto (ponto de partida da busca)."
+        )
+    return float(valor)
+
+
+def _concluir(linha: Dict[str, Any], x: float, obtido: float) -> None:
+    linha["valor_folha"] = x
+    linha["valor_obtido"] = obtido
+    linha["convergiu"] = True
+    linha["erro"] = None
+
+
+# ----------------------------------------------------------------
+# Testes mínimos (sanity checks)
+# ----------------------------------------------------------------
+
+
+def _test_busca_meta():
+    modelo = {
+        "raiz": "total",
+        "nos": [
+            {"id": "salario", "tipo": "referencia", "dependencias": []},
+            {"id": "percentual_encargos", "tipo": "referencia", "dependencias": []},
+            {"id": "dois", "tipo": "constante", "dependencias": []},
+            {"id": "encargos", "tipo": "multiplicacao", "dependencias": ["salario", "percentual_encargos"]},
+            {"id": "quadrado", "tipo": "potencia", "dependencias": ["salario", "dois"]},
+            {"id": "linear", "tipo": "soma", "dependencias": ["salario", "encargos"]},
+            {"id": "total", "tipo": "soma", "dependencias": ["linear", "quadrado"]},
+        ],
+    }
+    contexto = {
+        "salario": {"valor": 1.0},
+        "percentual_encargos": {"valor": 0.5},
+        "dois": {"valor": 2.0},
+    }
+
+    # linear na folha: um passo de Newton
+    linha = buscar_meta(modelo, contexto, folha="salario", alvo_valor=300.0, alvo_no="linear")
+    assert linha["convergiu"] and abs(linha["valor_folha"] - 200.0) < 1e-9, linha
+    assert linha["avaliacoes"] <= 3, linha
+
+    # não linear, com intervalo e em lote
+    linhas = list(buscar_metas(
+        modelo,
+        contexto,
+        [
+            {"folha": "salario", "alvo_valor": alvo, "intervalo": (0.0, 1000.0)}
+            for alvo in (10.0, 1000.0, 50_000.0)
+        ] + [{"folha": "percentual_encargos", "alvo_valor": 4.0}],
+    ))
+    for linha in linhas:
+        assert linha["convergiu"], linha
+        assert abs(linha["valor_obtido"] - linha["alvo_valor"]) <= TOLERANCIA_PADRAO, linha
+    assert contexto["salario"]["valor"] == 1.0
@@ -0,0 +1,93 @@
+# ================================================================
+# Cache de Subárvores entre Execuções
+# Projeto: Quase Sem Querer
+#
+# Responsabilidade:
+# - Reaproveitar, entre execuções (e sessões do mesmo processo), os
+#   valores de subárvores idênticas
+# - Chave: hash Merkle do nó (definição + cone de dependências) e os
+#   valores, com tipo, das folhas do Contexto de que o nó depende
+# - Limitar memória (LRU) e contabilizar acertos e falhas
+#
+# Usado pelo InterpretadorArvoreNormativa; não altera o resultado
+# canônico (os valores guardados são os mesmos que seriam calculados).
+# ================================================================
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Tuple
+
+
+CAPACIDADE_PADRAO = 50_000
+
+# subárvores com menos nós que isto são recalculadas (a chave custaria mais)
+MINIMO_NOS_SUBARVORE = 8
+
+
+class CacheNos:
+    def __init__(self, capacidade: int = CAPACIDADE_PADRAO):
+        if capacidade < 1:
+            raise ValueError("Capacidade do cache deve ser positiva.")
+        self.capacidade = capacidade
+        self._entradas: "OrderedDict[Hashable, Tuple[Any, ...]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+
+    # -----------------------------
+    # API pública
+    # -----------------------------
+
+    def obter(self, chave: Hashable) -> Tuple[Any, ...] | None:
+        """Valores da subárvore (em ordem de slot) ou None."""
+        with self._lock:
+            valores = self._entradas.get(chave)
+            if valores is None:
+                self.falhas += 1
+                return None
+            self._entradas.move_to_end(chave)
+            self.acertos += 1
+            return valores
+
+    def guardar(self, chave: Hashable, valores: Tuple[Any, ...]) -> None:
+        with self._lock:
+            self._entradas[chave] = valores
+            self._entradas.move_to_end(chave)
+            while len(self._entradas) > self.capacidade:
+                self._entradas.popitem(last=False)
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._entradas.clear()
+            self.acertos = self.falhas = 0
+
+    def estatisticas(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "acertos": self.acertos,
+                "falhas": self.falhas,
+                "entradas": len(self._entradas),
+                "capacidade": self.capacidade,
+            }
+
+    def __len__(self) -> int:
+        return len(self._entradas)
+
+
+# ----------------------------------------------------------------
+# Cache padrão do processo
+# ----------------------------------------------------------------
+
+_CACHE_PADRAO: CacheNos | None = None
+_LOCK_PADRAO = threading.Lock()
+
+
+def cache_nos_padrao() -> CacheNos:
+    """Cache de subárvores compartilhado pelo processo (apenas memória)."""
+    global _CACHE_PADRAO
+    with _LOCK_PADRAO:
+        if _CACHE_PADRAO is None:
+            _CACHE_PADRAO = CacheNos()
+        return _CACHE_PADRAO
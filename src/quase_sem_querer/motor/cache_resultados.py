@@ -0,0 +1,153 @@
+# ================================================================
+# Cache de Resultados entre Execuções
+# Projeto: Quase Sem Querer
+#
+# Responsabilidade:
+# - Reaproveitar resultados canônicos já calculados para o mesmo
+#   (hash do modelo, hash do contexto, nó raiz)
+# - Limitar memória (LRU) e contabilizar acertos e falhas
+# - Opcionalmente, consultar o histórico persistido em caso de falha
+#
+# O hash do modelo vem do registro de modelos, que o recalcula quando
+# o arquivo muda: uma entrada nunca é servida para outro conteúdo.
+#
+# Os resultados guardados são compartilhados: não devem ser alterados.
+# ================================================================
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Tuple
+
+from quase_sem_querer.motor.armazenamento_execucoes import ArmazemExecucoes
+
+
+CAPACIDADE_PADRAO = 256
+
+Chave = Tuple[str, str, str]
+
+
+class CacheResultados:
+    def __init__(
+        self,
+        capacidade: int = CAPACIDADE_PADRAO,
+        *,
+        armazem: ArmazemExecucoes | None = None,
+    ):
+        if capacidade < 1:
+            raise ValueError("Capacidade do cache deve ser positiva.")
+        self.capacidade = capacidade
+        self.armazem = armazem
+        self._entradas: "OrderedDict[Chave, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.acertos_historico = 0
+        self.falhas = 0
+
+    # -----------------------------
+    # API pública
+    # -----------------------------
+
+    def obter(self, hash_modelo: str, hash_contexto: str, no_raiz: str) -> Dict[str, Any] | None:
+        chave = (hash_modelo, hash_contexto, no_raiz)
+
+        with self._lock:
+            resultado = self._entradas.get(chave)
+            if resultado is not None:
+                self._entradas.move_to_end(chave)
+                self.acertos += 1
+                return resultado
+
+        resultado = self._buscar_historico(chave)
+
+        with self._lock:
+            if resultado is None:
+                self.falhas += 1
+                return None
+            self.acertos_historico += 1
+            self._inserir(chave, resultado)
+            return resultado
+
+    def guardar(
+        self,
+        hash_modelo: str,
+        hash_contexto: str,
+        no_raiz: str,
+        resultado: Dict[str, Any],
+    ) -> None:
+        with self._lock:
+            self._inserir((hash_modelo, hash_contexto, no_raiz), resultado)
+
+    def invalidar_modelo(self, hash_modelo: str) -> None:
+        with self._lock:
+            for chave in [c for c in self._entradas if c[0] == hash_modelo]:
+                del self._entradas[chave]
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._entradas.clear()
+            self.acertos = self.acertos_historico = self.falhas = 0
+
+    def estatisticas(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "acertos": self.acertos,
+                "acertos_historico": self.acertos_historico,
+                "falhas": self.falhas,
+                "entradas": len(self._entradas),
+                "capacidade": self.capacidade,
+            }
+
+    def __len__(self) -> int:
+        return len(self._entradas)
+
+    # -----------------------------
+    # Implementação
+    # -----------------------------
+
+    def _inserir(self, chave: Chave, resultado: Dict[str, Any]) -> None:
+        # chamado com self._lock adquirido
+        self._entradas[chave] = resultado
+        self._entradas.move_to_end(chave)
+        while len(self._entradas) > self.capacidade:
+            self._entradas.popitem(last=False)
+
+    def _buscar_historico(self, chave: Chave) -> Dict[str, Any] | None:
+        if self.armazem is None:
+            return None
+
+        hash_modelo, hash_contexto, no_raiz = chave
+        encontrados = self.armazem.buscar(
+            hash_modelo_normativo=hash_modelo,
+            hash_contexto=hash_contexto,
+            no_raiz=no_raiz,
+        )
+
+        # a mais recente em ponto flutuante (a aritmética padrão): o cache
+        # não serve execuções decimais, que podem estar entre as encontradas
+        for meta in reversed(encontrados):
+            payload = self.armazem.obter(meta["id_execucao"])
+            if payload is None:
+                continue
+            aritmetica = (payload.get("meta_execucao") or {}).get("aritmetica") or {}
+            if aritmetica.get("modo", "float") == "float":
+                return payload.get("resultado")
+        return None
+
+
+# ----------------------------------------------------------------
+# Cache padrão do processo
+# ----------------------------------------------------------------
+
+_CACHE_PADRAO: CacheResultados | None = None
+_LOCK_PADRAO = threading.Lock()
+
+
+def cache_padrao() -> CacheResultados:
+    """Cache de resultados compartilhado pelo processo (apenas memória)."""
+    global _CACHE_PADRAO
+    with _LOCK_PADRAO:
+        if _CACHE_PADRAO is None:
+            _CACHE_PADRAO = CacheResultados()
+        return _CACHE_PADRAO
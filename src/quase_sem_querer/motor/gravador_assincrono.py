@@ -0,0 +1,233 @@
+# ================================================================
+# Gravador Assíncrono de Execuções
+# Projeto: Quase Sem Querer
+#
+# Responsabilidade:
+# - Tirar a gravação de execuções do caminho crítico do chamador
+#   (ex.: botão "Executar cálculo" do Streamlit)
+# - Fila limitada (contrapressão), thread gravadora única, lotes
+#   gravados com um único flush do armazém de destino
+# - Garantir o esvaziamento da fila no encerramento do processo
+# - Expor o estado de cada execução para quem precisa aguardar a
+#   durabilidade
+#
+# Payload e contexto são copiados (pickle) já no registro: o que se
+# grava é o que foi hasheado, mesmo que o chamador os altere depois.
+#
+# Não monta payloads, não calcula hashes: apenas encaminha ao destino.
+# ================================================================
+
+from __future__ import annotations
+
+import pickle
+import queue
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Tuple
+
+from quase_sem_querer.motor.armazenamento_execucoes import (
+    ArmazemExecucoes,
+    ErroArmazenamento,
+)
+
+
+CAPACIDADE_FILA_PADRAO = 1_000
+TAMANHO_LOTE_PADRAO = 64
+LIMITE_ESTADOS = 10_000
+
+PENDENTE = "pendente"
+GRAVADA = "gravada"
+ERRO = "erro"
+
+_ENCERRAR = object()
+
+
+class GravadorAssincrono(ArmazemExecucoes):
+    """
+    Armazém que encaminha gravações a `destino` em uma thread própria.
+
+    `registrar` apenas enfileira (bloqueia só se a fila estiver cheia) uma
+    cópia serializada do payload e do contexto. O modelo segue por
+    referência: vem do registro de modelos, que nunca o altera.
+    Consultas esvaziam a fila antes de delegar ao destino, de modo que
+    sempre enxergam as execuções já registradas.
+    """
+
+    def __init__(
+        self,
+        destino: ArmazemExecucoes,
+        *,
+        capacidade_fila: int = CAPACIDADE_FILA_PADRAO,
+        tamanho_lote: int = TAMANHO_LOTE_PADRAO,
+    ):
+        if capacidade_fila < 1 or tamanho_lote < 1:
+            raise ValueError("'capacidade_fila' e 'tamanho_lote' devem ser positivos.")
+
+        self.destino = destino
+        self.tamanho_lote = tamanho_lote
+
+        self._fila: "queue.Queue[Any]" = queue.Queue(maxsize=capacidade_fila)
+        self._estados: "OrderedDict[str, Tuple[str, str | None]]" = OrderedDict()
+        self._condicao = threading.Condition()
+        self._encerrado = False
+
+        self._thread = threading.Thread(
+            target=self._laco,
+            name="quase_sem_querer-gravador",
+            daemon=True,
+        )
+        self._thread.start()
+
+    # -----------------------------
+    # Gravação
+    # -----------------------------
+
+    def registrar(
+        self,
+        payload: Dict[str, Any],
+        *,
+        modelo_normativo: Dict[str, Any] | None = None,
+        contexto: Dict[str, Any] | None = None,
+    ) -> str:
+        if self._encerrado:
+            raise ErroArmazenamento("Gravador assíncrono já encerrado.")
+
+        id_execucao = payload["meta_execucao"]["id_execucao"]
+        # hashes e id já foram calculados: gravar o estado deste instante
+        copia = pickle.dumps((payload, contexto), pickle.HIGHEST_PROTOCOL)
+        with self._condicao:
+            self._definir_estado(id_execucao, PENDENTE, None)
+
+        self._fila.put((id_execucao, copia, modelo_normativo))
+        return id_execucao
+
+    # -----------------------------
+    # Estado e durabilidade
+    # -----------------------------
+
+    def status(self, id_execucao: str) -> Dict[str, Any]:
+        """
+        {"estado": "pendente" | "gravada" | "erro" | "desconhecido",
+         "erro": mensagem ou None}
+        """
+        with self._condicao:
+            estado, erro = self._estados.get(id_execucao, ("desconhecido", None))
+        return {"estado": estado, "erro": erro}
+
+    def aguardar(self, id_execucao: str, timeout: float | None = None) -> bool:
+        """
+        Aguarda a gravação de uma execução. Retorna True se gravada;
+        levanta ErroArmazenamento se a gravação falhou; False em timeout.
+        """
+        limite = None if timeout is None else time.monotonic() + timeout
+
+        with self._condicao:
+            while True:
+                # ids fora do histórico de estados já deixaram a fila há muito
+                estado, erro = self._estados.get(id_execucao, (GRAVADA, None))
+                if estado == GRAVADA:
+                    return True
+                if estado == ERRO:
+                    raise ErroArmazenamento(
+                        f"Falha ao gravar execução '{id_execucao}': {erro}"
+                    )
+                restante = None if limite is None else limite - time.monotonic()
+                if restante is not None and restante <= 0:
+                    return False
+                self._condicao.wait(restante)
+
+    def pendentes(self) -> int:
+        return self._fila.unfinished_tasks
+
+    def flush(self) -> None:
+        """Bloqueia até que tudo o que foi registrado esteja gravado."""
+        self._fila.join()
+
+    def fechar(self) -> None:
+        if self._encerrado:
+            return
+        self._encerrado = True
+        self._fila.put(_ENCERRAR)
+        self._thread.join()
+        self.destino.fechar()
+
+    # -----------------------------
+    # Consulta (delegada)
+    # -----------------------------
+
+    def obter(self, id_execucao: str) -> Dict[str, Any] | None:
+        self.flush()
+        return self.destino.obter(id_execucao)
+
+    def buscar(self, **filtros) -> List[Dict[str, Any]]:
+        self.flush()
+        return self.destino.buscar(**filtros)
+
+    def __getattr__(self, nome: str):
+        # demais recursos do destino (iterar_payloads, obter_blob, ...)
+        destino = self.__dict__.get("destino")
+        if destino is None:
+            raise AttributeError(nome)
+        self.flush()
+        return getattr(destino, nome)
+
+    # -----------------------------
+    # Thread gravadora
+    # -----------------------------
+
+    def _laco(self) -> None:
+        encerrar = False
+        while not encerrar:
+            lote = [self._fila.get()]
+
+            # agrupar o que já estiver na fila, até o tamanho do lote
+            while len(lote) < self.tamanho_lote:
+                try:
+                    lote.append(self._fila.get_nowait())
+                except queue.Empty:
+                    break
+
+            itens = [item for item in lote if item is not _ENCERRAR]
+            encerrar = len(itens) < len(lote)
+
+            try:
+                self._gravar_lote(itens)
+            finally:
+                for _ in lote:
+                    self._fila.task_done()
+
+    def _gravar_lote(self, itens: List[tuple]) -> None:
+        if not itens:
+            return
+
+        ids = []
+        erros: Dict[str, str] = {}
+        for id_execucao, copia, modelo in itens:
+            try:
+                payload, contexto = pickle.loads(copia)
+                self.destino.registrar(payload, modelo_normativo=modelo, contexto=contexto)
+                ids.append(id_execucao)
+            except Exception as e:
+                erros[id_execucao] = str(e)
+
+        try:
+            self.destino.flush()
+        except Exception as e:
+            for id_execucao in ids:
+                erros[id_execucao] = str(e)
+            ids = []
+
+        with self._condicao:
+            for id_execucao in ids:
+                self._definir_estado(id_execucao, GRAVADA, None)
+            for id_execucao, erro in erros.items():
+                self._definir_estado(id_execucao, ERRO, erro)
+            self._condicao.notify_all()
+
+    def _definir_estado(self, id_execucao: str, estado: str, erro: str | None) -> None:
+        # chamado com self._condicao adquirida
+        self._estados[id_execucao] = (estado, erro)
+        self._estados.move_to_end(id_execucao)
+        while len(self._estados) > LIMITE_ESTADOS:
+            self._estados.popitem(last=False)
@@ -0,0 +1,268 @@
+# ================================================================
+# Hashes hierárquicos (Merkle) de modelos e contextos
+# Projeto: Quase Sem Querer
+#
+# Responsabilidade:
+# - Ponto único do hash canônico de JSON (hash_json)
+# - Hash por nó do modelo: definição do nó + hashes das dependências
+#   (muda sempre que algo no cone de entrada do nó muda)
+# - Hash por módulo (super-modelo / super-contexto) e hash raiz
+# - Comparação de versões em O(módulos alterados)
+#
+# O hash raiz não depende da divisão em módulos: o mesmo conteúdo
+# achatado produz o mesmo hash, venha de um super-modelo ou não.
+#
+# Não carrega arquivos, não valida modelos.
+# ================================================================
+
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import Any, Dict, Iterable, List, Tuple
+
+
+# ----------------------------------------------------------------
+# Hash canônico
+# ----------------------------------------------------------------
+
+def hash_json(objeto: Any) -> str:
+    """sha256 do JSON canônico (chaves ordenadas) de `objeto`."""
+    serializado = json.dumps(objeto, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(serializado.encode("utf-8")).hexdigest()
+
+
+def _hash_partes(partes: Iterable[str]) -> str:
+    h = hashlib.sha256()
+    for parte in partes:
+        h.update(parte.encode("utf-8"))
+        h.update(b"\x00")
+    return h.hexdigest()
+
+
+def _hash_itens(itens: Iterable[Tuple[str, str]]) -> str:
+    # pares (id, hash) em ordem de id
+    return _hash_partes(f"{chave}={valor}" for chave, valor in sorted(itens))
+
+
+# ----------------------------------------------------------------
+# Estrutura de hashes
+# ----------------------------------------------------------------
+
+class HashesMerkle:
+    """
+    Hashes de um modelo ou contexto:
+
+    - itens:   id -> hash Merkle (nó: inclui o cone de dependências;
+               contexto: hash do valor da chave)
+    - locais:  id -> hash apenas da própria definição
+    - membros: módulo -> ids (modelos/contextos atômicos: módulo "")
+    - modulos: módulo -> hash das definições locais do módulo
+    - raiz:    hash do conjunto (independente da divisão em módulos)
+    """
+
+    __slots__ = ("raiz", "modulos", "membros", "itens", "locais")
+
+    def __init__(
+        self,
+        *,
+        raiz: str,
+        modulos: Dict[str, str],
+        membros: Dict[str, List[str]],
+        itens: Dict[str, str],
+        locais: Dict[str, str],
+    ):
+        self.raiz = raiz
+        self.modulos = modulos
+        self.membros = membros
+        self.itens = itens
+        self.locais = locais
+
+    def comparar(self, outro: "HashesMerkle") -> Dict[str, List[str]]:
+        """
+        Diferenças em relação a `outro` (versão anterior):
+
+        {"modulos": módulos alterados, incluídos ou removidos,
+         "itens":   ids cuja definição mudou, incluídos ou removidos}
+
+        Só os módulos com hash diferente têm seus itens comparados.
+        """
+        if self.raiz == outro.raiz:
+            return {"modulos": [], "itens": []}
+
+        modulos = sorted(
+            nome
+            for nome in self.modulos.keys() | outro.modulos.keys()
+            if self.modulos.get(nome) != outro.modulos.get(nome)
+        )
+
+        itens = set()
+        for nome in modulos:
+            ids = set(self.membros.get(nome, ())) | set(outro.membros.get(nome, ()))
+            itens.update(
+                no_id for no_id in ids
+                if self.locais.get(no_id) != outro.locais.get(no_id)
+            )
+
+        return {"modulos": modulos, "itens": sorted(itens)}
+
+    def __repr__(self) -> str:
+        return f"HashesMerkle(raiz={self.raiz[:12]}, modulos={len(self.modulos)}, itens={len(self.itens)})"
+
+
+# ----------------------------------------------------------------
+# Modelos
+# ----------------------------------------------------------------
+
+def hashes_modelo(modelo: Dict[str, Any]) -> HashesMerkle:
+    """
+    Hashes de um modelo achatado (carregar_modelo). A divisão em
+    módulos vem de `indice_modulos`, quando presente.
+    """
+    nos = {no["id"]: no for no in modelo.get("nos", [])}
+    locais = {no_id: hash_json(no) for no_id, no in nos.items()}
+    itens = _hashes_cone(nos, locais)
+
+    membros = _membros(modelo.get("indice_modulos"), nos)
+    modulos = {
+        nome: _hash_itens((no_id, locais[no_id]) for no_id in ids if no_id in locais)
+        for nome, ids in membros.items()
+    }
+
+    raiz = _hash_partes(
+        [f"raiz={modelo.get('raiz') or ''}", _hash_itens(itens.items())]
+    )
+
+    return HashesMerkle(raiz=raiz, modulos=modulos, membros=membros, itens=itens, locais=locais)
+
+
+def hash_modelo(modelo: Dict[str, Any]) -> str:
+    return hashes_modelo(modelo).raiz
+
+
+def _hashes_cone(nos: Dict[str, Dict], locais: Dict[str, str]) -> Dict[str, str]:
+    # pós-ordem iterativa; dependências ausentes ou em ciclo entram pelo id
+    itens: Dict[str, str] = {}
+    em_visita = set()
+
+    for inicio in nos:
+        if inicio in itens:
+            continue
+        pilha = [(inicio, False)]
+        while pilha:
+            no_id, expandido = pilha.pop()
+            if no_id in itens:
+                continue
+            deps = nos[no_id].get("dependencias", [])
+            if not expandido:
+                em_visita.add(no_id)
+                pilha.append((no_id, True))
+                for dep in reversed(deps):
+                    if dep in nos and dep not in itens and dep not in em_visita:
+                        pilha.append((dep, False))
+                continue
+            em_visita.discard(no_id)
+            itens[no_id] = _hash_partes(
+                [locais[no_id], *(itens.get(dep, f"?{dep}") for dep in deps)]
+            )
+
+    return itens
+
+
+# ----------------------------------------------------------------
+# Contextos
+# ----------------------------------------------------------------
+
+def hashes_contexto(contexto: Dict[str, Any]) -> HashesMerkle:
+    """
+    Hashes de um contexto achatado ou de um super-contexto bruto
+    ({"tipo": "super_contexto", "modulos": {...}}). Ambos produzem o
+    mesmo hash raiz para o mesmo conjunto de chaves.
+    """
+    if contexto.get("tipo") == "super_contexto" and isinstance(contexto.get("modulos"), dict):
+        valores = {}
+        membros = {}
+        for nome, bloco in contexto["modulos"].items():
+            membros[nome] = list(bloco)
+            valores.update(bloco)
+    else:
+        valores = contexto
+        membros = {"": list(contexto)}
+
+    itens = {chave: hash_json(valor) for chave, valor in valores.items()}
+    modulos = {
+        nome: _hash_itens((chave, itens[chave]) for chave in chaves)
+        for nome, chaves in membros.items()
+    }
+
+    return HashesMerkle(
+        raiz=_hash_itens(itens.items()),
+        modulos=modulos,
+        membros=membros,
+        itens=itens,
+        locais=itens,
+    )
+
+
+def hash_contexto(contexto: Dict[str, Any]) -> str:
+    return hashes_contexto(contexto).raiz
+
+
+# ----------------------------------------------------------------
+# Utilidades
+# ----------------------------------------------------------------
+
+def _membros(indice: Dict[str, List[str]] | None, nos: Dict[str, Dict]) -> Dict[str, List[str]]:
+    if not indice:
+        return {"": list(nos)}
+    membros = {nome: list(ids) for nome, ids in indice.items()}
+    listados = {no_id for ids in membros.values() for no_id in ids}
+    avulsos = [no_id for no_id in nos if no_id not in listados]
+    if avulsos:
+        membros.setdefault("", []).extend(avulsos)
+    return membros
+
+
+# ----------------------------------------------------------------
+# Testes mínimos (sanity checks)
+# ----------------------------------------------------------------
+
+
+def _test_merkle_modelo():
+    base = {
+        "nos": [
+            {"id": "a", "tipo": "constante", "valor": 1, "dependencias": []},
+            {"id": "b", "tipo": "constante", "valor": 2, "dependencias": []},
+            {"id": "c", "tipo": "soma", "dependencias": ["a", "b"]},
+            {"id": "d", "tipo": "constante", "valor": 3, "dependencias": []},
+        ],
+        "raiz": "c",
+        "indice_modulos": {"m1": ["a", "b", "c"], "m2": ["d"]},
+    }
+    alterado = json.loads(json.dumps(base))
+    alterado["nos"][0]["valor"] = 5
+
+    h1, h2 = hashes_modelo(base), hashes_modelo(alterado)
+    assert h1.raiz != h2.raiz
+    assert h1.itens["c"] != h2.itens["c"]
+    assert h1.itens["d"] == h2.itens["d"]
+    assert h2.comparar(h1) == {"modulos": ["m1"], "itens": ["a"]}
+
+    sem_modulos = {k: v for k, v in base.items() if k != "indice_modulos"}
+    assert hashes_modelo(sem_modulos).raiz == h1.raiz
+
+
+def _test_merkle_contexto():
+    super_ctx = {
+        "tipo": "super_contexto",
+        "modulos": {"a": {"x": {"valor": 1}}, "b": {"y": {"valor": 2}}},
+    }
+    plano = {"x": {"valor": 1}, "y": {"valor": 2}}
+    assert hash_contexto(super_ctx) == hash_contexto(plano)
+
+    alterado = json.loads(json.dumps(super_ctx))
+    alterado["modulos"]["b"]["y"]["valor"] = 3
+    assert hashes_contexto(alterado).comparar(hashes_contexto(super_ctx)) == {
+        "modulos": ["b"],
+        "itens": ["y"],
+    }
@@ -7,27 +7,495 @@
 # - Utilizar exclusivamente valores do Contexto
 # - Produzir resultado determinístico e auditável
 #
+# O modelo é compilado uma única vez em um plano de avaliação
+# (ordem topológica, slots inteiros, opcodes e operandos), que é
+# percorrido por um laço não recursivo.
+#
+# Com um CacheNos, subárvores já calculadas (mesmo hash Merkle e mesmos
+# valores de folhas) são reaproveitadas entre execuções.
+#
+# Com uma AritmeticaDecimal, o plano é avaliado em Decimal, com os
+# pontos de arredondamento declarados; o resultado segue em float.
+#
 # Não contém lógica jurídica.
 # Não valida modelo (pressupõe verificação prévia).
 # Não persiste resultados.
 # ================================================================
 
-from typing import Dict, Any
+from __future__ import annotations
+
 import math
+import time
+from typing import TYPE_CHECKING, Callable, Dict, Any, List, Sequence, Tuple
+
+if TYPE_CHECKING:
+    from quase_sem_querer.motor.aritmetica_decimal import AritmeticaDecimal
+    from quase_sem_querer.motor.cache_nos import CacheNos
+
 
 class ErroInterpretacao(Exception):
     """Erro ocorrido durante a avaliação da árvore normativa."""
     pass
 
 
+# ----------------------------------------------------------------
+# Opcodes
+# ----------------------------------------------------------------
+
+OP_CONSTANTE = 0
+OP_REFERENCIA = 1
+OP_SOMA = 2
+OP_MULTIPLICACAO = 3
+OP_SUBTRACAO = 4
+OP_DIVISAO = 5
+OP_POTENCIA = 6
+OP_RAIZ = 7
+
+TIPOS_POR_OPCODE: Tuple[str, ...] = (
+    "constante",
+    "referencia",
+    "soma",
+    "multiplicacao",
+    "subtracao",
+    "divisao",
+    "potencia",
+    "raiz",
+)
+
+OPCODES: Dict[str, int] = {tipo: op for op, tipo in enumerate(TIPOS_POR_OPCODE)}
+
+OPCODES_FOLHA = (OP_CONSTANTE, OP_REFERENCIA)
+
+
+# ----------------------------------------------------------------
+# Plano de avaliação compilado
+# ----------------------------------------------------------------
+
+class PlanoAvaliacao:
+    """
+    Modelo normativo compilado para uma raiz.
+
+    Cada nó alcançável a partir da raiz ocupa um slot inteiro, em
+    ordem topológica (dependências antes dos dependentes, na mesma
+    ordem em que a avaliação recursiva os visitaria). A raiz ocupa
+    sempre o último slot.
+
+    - ids[slot]        -> id do nó
+    - opcodes[slot]    -> operação (OP_*)
+    - operandos[slot]  -> slots das dependências
+    - definicoes[slot] -> definição original do nó (metadados)
+    - folhas           -> slots ligados a chaves do Contexto
+    - inicios[slot]    -> primeiro slot do bloco contíguo compilado ao
+                          visitar o nó (o cone, exceto nós compartilhados
+                          já compilados antes)
+    - hashes[slot]     -> hash Merkle do nó, quando informado na compilação
+    - dependentes      -> índice reverso (slots que consomem cada slot),
+                          construído na primeira consulta
+    """
+
+    __slots__ = (
+        "no_raiz",
+        "ids",
+        "slots",
+        "opcodes",
+        "operandos",
+        "definicoes",
+        "folhas",
+        "inicios",
+        "hashes",
+        "_dependentes",
+        "_subarvores",
+    )
+
+    def __init__(
+        self,
+        *,
+        no_raiz: str,
+        ids: List[str],
+        opcodes: List[int],
+        operandos: List[Tuple[int, ...]],
+        definicoes: List[Dict[str, Any]],
+        inicios: List[int] | None = None,
+        hashes: List[str] | None = None,
+    ):
+        self.no_raiz = no_raiz
+        self.ids = ids
+        self.slots: Dict[str, int] = {no_id: slot for slot, no_id in enumerate(ids)}
+        self.opcodes = opcodes
+        self.operandos = operandos
+        self.definicoes = definicoes
+        self.folhas: Tuple[int, ...] = tuple(
+            slot for slot, op in enumerate(opcodes) if op in OPCODES_FOLHA
+        )
+        self.inicios = inicios
+        self.hashes = hashes
+        self._dependentes: List[Tuple[int, ...]] | None = None
+        self._subarvores: Tuple[int, Dict[int, Tuple[int, str, Tuple[int, ...]]]] | None = None
+
+    @property
+    def dependentes(self) -> List[Tuple[int, ...]]:
+        if self._dependentes is None:
+            reverso: List[List[int]] = [[] for _ in self.ids]
+            for slot, ops in enumerate(self.operandos):
+                for dep in set(ops):
+                    reverso[dep].append(slot)
+            self._dependentes = [tuple(d) for d in reverso]
+        return self._dependentes
+
+    def ancestrais(self, slot: int) -> List[int]:
+        """
+        Slots que dependem, direta ou indiretamente, de `slot`, em
+        ordem topológica.
+        """
+        dependentes = self.dependentes
+        vistos = set()
+        pendentes = [slot]
+        while pendentes:
+            atual = pendentes.pop()
+            for dep in dependentes[atual]:
+                if dep not in vistos:
+                    vistos.add(dep)
+                    pendentes.append(dep)
+        return sorted(vistos)
+
+    def subarvores(self, minimo: int) -> Dict[int, Tuple[int, str, Tuple[int, ...]]]:
+        """
+        Blocos reaproveitáveis pelo cache de subárvores, por slot inicial:
+        {inicio: (slot do nó, forma do bloco, slots das folhas do cone)}.
+
+        Considera operações cujo bloco tem ao menos `minimo` nós; entre
+        blocos com o mesmo início, só o mais externo. As folhas vêm em
+        ordem de id, e a forma identifica os ids do bloco, para que a
+        chave não dependa da ordem de compilação.
+        """
+        if self._subarvores is not None and self._subarvores[0] == minimo:
+            return self._subarvores[1]
+
+        blocos: Dict[int, Tuple[int, str, Tuple[int, ...]]] = {}
+        if self.inicios is not None and self.hashes is not None:
+            externos: Dict[int, int] = {}
+            for slot, inicio in enumerate(self.inicios):
+                if self.opcodes[slot] in OPCODES_FOLHA or slot - inicio + 1 < minimo:
+                    continue
+                # blocos com o mesmo início são aninhados: o último é o maior
+                externos[inicio] = slot
+
+            for inicio, slot in externos.items():
+                folhas = set()
+                vistos = {slot}
+                pendentes = [slot]
+                while pendentes:
+                    atual = pendentes.pop()
+                    if self.opcodes[atual] in OPCODES_FOLHA:
+                        folhas.add(atual)
+                    for dep in self.operandos[atual]:
+                        if dep not in vistos:
+                            vistos.add(dep)
+                            pendentes.append(dep)
+                forma = "\x00".join(self.ids[inicio:slot + 1])
+                blocos[inicio] = (
+                    slot,
+                    forma,
+                    tuple(sorted(folhas, key=self.ids.__getitem__)),
+                )
+
+        self._subarvores = (minimo, blocos)
+        return blocos
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+def compilar_plano(
+    nos: Dict[str, Dict],
+    no_raiz: str,
+    *,
+    hashes: Dict[str, str] | None = None,
+) -> PlanoAvaliacao:
+    """
+    Compila o subgrafo alcançável a partir de `no_raiz` em um plano
+    topologicamente ordenado, sem recursão.
+
+    `hashes` (id -> hash Merkle, ver hash_merkle) habilita o cache de
+    subárvores para o plano.
+    """
+
+    if no_raiz not in nos:
+        raise ErroInterpretacao(f"Nó inexistente: {no_raiz}")
+
+    ids: List[str] = []
+    opcodes: List[int] = []
+    definicoes: List[Dict[str, Any]] = []
+    deps_por_slot: List[Sequence[str]] = []
+    inicios: List[int] = []
+
+    slots: Dict[str, int] = {}
+    inicio_por_no: Dict[str, int] = {no_raiz: 0}
+    em_andamento = set()
+
+    # pilha de (id do nó, índice da próxima dependência a visitar)
+    pilha: List[List[Any]] = [[no_raiz, 0]]
+    em_andamento.add(no_raiz)
+
+    while pilha:
+        topo = pilha[-1]
+        no_id, proxima = topo
+        no = nos[no_id]
+        deps = no.get("dependencias", [])
+
+        if proxima < len(deps):
+            topo[1] = proxima + 1
+            dep = deps[proxima]
+
+            if dep in slots:
+                continue
+            if dep in em_andamento:
+                raise ErroInterpretacao(
+                    f"Ciclo detectado envolvendo o nó '{dep}'."
+                )
+            if dep not in nos:
+                raise ErroInterpretacao(f"Nó inexistente: {dep}")
+
+            em_andamento.add(dep)
+            inicio_por_no[dep] = len(ids)
+            pilha.append([dep, 0])
+            continue
+
+        tipo = no["tipo"]
+        if tipo not in OPCODES:
+            raise ErroInterpretacao(f"Tipo de nó desconhecido: {tipo}")
+
+        pilha.pop()
+        em_andamento.discard(no_id)
+
+        slots[no_id] = len(ids)
+        ids.append(no_id)
+        opcodes.append(OPCODES[tipo])
+        definicoes.append(no)
+        deps_por_slot.append(deps)
+        inicios.append(inicio_por_no[no_id])
+
+    operandos = [tuple(slots[dep] for dep in deps) for deps in deps_por_slot]
+
+    return PlanoAvaliacao(
+        no_raiz=no_raiz,
+        ids=ids,
+        opcodes=opcodes,
+        operandos=operandos,
+        definicoes=definicoes,
+        inicios=inicios,
+        hashes=[hashes[no_id] for no_id in ids] if hashes is not None else None,
+    )
+
+
+# ----------------------------------------------------------------
+# Operações
+# ----------------------------------------------------------------
+
+def _op_soma(no_id: str, valores: List[float]) -> float:
+    return sum(valores)
+
+
+def _op_multiplicacao(no_id: str, valores: List[float]) -> float:
+    prod = 1.0
+    for v in valores:
+        prod *= v
+    return prod
+
+
+def _op_subtracao(no_id: str, valores: List[float]) -> float:
+    # comportamento: a - b - c - ...
+    if len(valores) < 2:
+        raise ErroInterpretacao(f"Nó '{no_id}' subtracao requer ao menos 2 dependências.")
+    return valores[0] - sum(valores[1:])
+
+
+def _op_divisao(no_id: str, valores: List[float]) -> float:
+    if len(valores) < 2:
+        raise ErroInterpretacao(f"Nó '{no_id}' divisao requer ao menos 2 dependências.")
+    resultado = valores[0]
+    for idx, v in enumerate(valores[1:], start=2):
+        if v == 0:
+            raise ErroInterpretacao(
+                f"Divisão por zero ao avaliar nó '{no_id}' (dependência #{idx} resultou em zero)."
+            )
+        resultado /= v
+    return resultado
+
+
+def _op_potencia(no_id: str, valores: List[float]) -> float:
+    # aridade exatamente 2: base ^ expoente
+    if len(valores) != 2:
+        raise ErroInterpretacao(f"Nó '{no_id}' potencia requer exatamente 2 dependências (base, expoente).")
+    base, expo = valores
+
+    # proteger contra base negativa e expoente fracionário que resultaria em número complexo
+    if base < 0 and not float(expo).is_integer():
+        raise ErroInterpretacao(
+            f"Potência inválida no nó '{no_id}': base negativa ({base}) com expoente fracionário ({expo}) produziria número complexo."
+        )
+    try:
+        return base ** expo
+    except Exception as e:
+        raise ErroInterpretacao(f"Erro ao calcular potencia no nó '{no_id}': {e}")
+
+
+def _op_raiz(no_id: str, valores: List[float]) -> float:
+    rad, indice_int = _validar_raiz(no_id, valores)
+
+    try:
+        # calcular raiz n-ésima: rad ** (1 / indice)
+        return rad ** (1.0 / indice_int)
+    except Exception as e:
+        raise ErroInterpretacao(f"Erro ao calcular raiz no nó '{no_id}': {e}")
+
+
+def _validar_raiz(no_id: str, valores: List[Any]) -> Tuple[Any, int]:
+    """(radicando, índice inteiro) de um nó raiz válido."""
+    # aridade exatamente 2: radicando, indice
+    if len(valores) != 2:
+        raise ErroInterpretacao(f"Nó '{no_id}' raiz requer exatamente 2 dependências (radicando, indice).")
+    rad, indice = valores
+
+    if indice == 0:
+        raise ErroInterpretacao(f"Nó '{no_id}' raiz: índice não pode ser zero.")
+    # índice deve ser inteiro natural usualmente; aceitar float inteiro (ex.: 2.0)
+    if not float(indice).is_integer():
+        raise ErroInterpretacao(f"Nó '{no_id}' raiz: índice deve ser número inteiro (recebido {indice}).")
+    indice_int = int(indice)
+
+    if rad < 0 and (indice_int % 2 == 0):
+        raise ErroInterpretacao(
+            f"Nó '{no_id}' raiz: radicando negativo ({rad}) com índice par ({indice_int}) produziria número complexo."
+        )
+
+    return rad, indice_int
+
+
+# tabela de despacho indexada por opcode (folhas são resolvidas à parte)
+OPERACOES: Tuple[Callable[[str, List[float]], float] | None, ...] = (
+    None,
+    None,
+    _op_soma,
+    _op_multiplicacao,
+    _op_subtracao,
+    _op_divisao,
+    _op_potencia,
+    _op_raiz,
+)
+
+
+def _erro_decimal(no_id: str | None, erro: ArithmeticError) -> ErroInterpretacao:
+    # estouro ou operação inválida no contexto da aritmética decimal
+    return ErroInterpretacao(
+        f"Erro aritmético (decimal) ao avaliar nó '{no_id}': {erro!r}"
+    )
+
+
+# ----------------------------------------------------------------
+# Resultados
+# ----------------------------------------------------------------
+
+MODOS_RESULTADO = {"completo", "compacto", "valor"}
+
+
+def _entrada_trilha(
+    no: Dict[str, Any],
+    valor: float,
+    *,
+    copiar_dependencias: bool = False,
+) -> Dict[str, Any]:
+    dependencias = no.get("dependencias", [])
+    return {
+        "tipo": no["tipo"],
+        "dependencias": list(dependencias) if copiar_dependencias else dependencias,
+        "valor_calculado": valor,
+        "metadados_juridicos": no.get("metadados_juridicos", {}),
+    }
+
+
+class ResultadoCompacto:
+    """
+    Resultado enxuto de uma execução: os ids dos nós são os do plano
+    (compartilhados entre execuções) e os valores, uma lista alinhada
+    aos slots. A trilha canônica é construída apenas quando solicitada.
+    """
+
+    __slots__ = ("plano", "valores", "meta_execucao")
+
+    def __init__(self, plano: PlanoAvaliacao, valores: List[float]):
+        self.plano = plano
+        self.valores = valores
+        # instrumentação preenchida pelo orquestrador (fora de como_dict)
+        self.meta_execucao: Dict[str, Any] | None = None
+
+    @property
+    def no_raiz(self) -> str:
+        return self.plano.no_raiz
+
+    @property
+    def valor_final(self) -> float:
+        return self.valores[-1]
+
+    def valor(self, no_id: str) -> float:
+        return self.valores[self.plano.slots[no_id]]
+
+    def trilha_calculo(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            no_id: _entrada_trilha(no, valor)
+            for no_id, no, valor in zip(self.plano.ids, self.plano.definicoes, self.valores)
+        }
+
+    def nos_avaliados(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            no_id: _entrada_trilha(no, valor, copiar_dependencias=True)
+            for no_id, no, valor in zip(self.plano.ids, self.plano.definicoes, self.valores)
+        }
+
+    def como_dict(self) -> Dict[str, Any]:
+        """Resultado canônico equivalente ao modo "completo"."""
+        return {
+            "no_raiz": self.no_raiz,
+            "valor_final": self.valor_final,
+            "trilha_calculo": self.trilha_calculo(),
+            "nos_avaliados": self.nos_avaliados(),
+        }
+
+
+# rastreador(evento, dados): evento "no" a cada nó visitado, com
+# {"no_id", "tipo", "valor", "origem" ("calculado" | "memo"), "duracao_ns"}
+Rastreador = Callable[[str, Dict[str, Any]], None]
+
+
 class InterpretadorArvoreNormativa:
-    def __init__(self, modelo_normativo: Dict, contexto: Dict):
+    def __init__(
+        self,
+        modelo_normativo: Dict,
+        contexto: Dict,
+        *,
+        cache_nos: "CacheNos | None" = None,
+        rastreador: Rastreador | None = None,
+        aritmetica: "AritmeticaDecimal | None" = None,
+    ):
         self.modelo = modelo_normativo
         self.contexto = contexto
+        self.cache_nos = cache_nos
+        self.rastreador = rastreador
+        # None: ponto flutuante (padrão)
+        self.aritmetica = aritmetica
+        # contagens da última avaliação (ver _avaliar_plano)
+        self.estatisticas: Dict[str, int] = {}
+        self._nos_cache = 0
         self.nos = self._indexar_nos()
         self.memo: Dict[str, float] = {}
+        # valores exatos (Decimal) por nó, com aritmética decimal; memo
+        # guarda as mesmas entradas convertidas para float
+        self._exatos: Dict[str, Any] = {}
         self.trilha: Dict[str, Dict[str, Any]] = {}
         self._nos_avaliados = {}
+        self._planos: Dict[str, PlanoAvaliacao] = {}
+        self._plano_atual: PlanoAvaliacao | None = None
+        self._contexto_proprio = False
 
     # -----------------------------
     # Preparação
@@ -39,134 +507,460 @@ class InterpretadorArvoreNormativa:
             index[no["id"]] = no
         return index
 
+    def compilar(self, no_raiz: str) -> PlanoAvaliacao:
+        """
+        Retorna o plano compilado para `no_raiz`, compilando-o apenas
+        na primeira solicitação.
+        """
+        plano = self._planos.get(no_raiz)
+        if plano is None:
+            hashes = None
+            if self.cache_nos is not None:
+                from quase_sem_querer.motor.hash_merkle import hashes_modelo
+                hashes = hashes_modelo(self.modelo).itens
+            plano = compilar_plano(self.nos, no_raiz, hashes=hashes)
+            self._planos[no_raiz] = plano
+        return plano
+
     # -----------------------------
     # API pública
     # -----------------------------
 
-    def executar(self, no_raiz: str) -> Dict[str, Any]:
-        valor_final = self._avaliar_no(no_raiz)
+    def executar(
+        self,
+        no_raiz: str,
+        *,
+        plano: PlanoAvaliacao | None = None,
+        modo: str = "completo",
+    ) -> Dict[str, Any] | ResultadoCompacto:
+        """
+        Avalia `no_raiz`. Um `plano` previamente compilado (ex.: reutilizado
+        entre vários contextos do mesmo modelo) pode ser informado para
+        evitar a compilação.
+
+        Modos:
+        - "completo": resultado canônico (trilha_calculo e nos_avaliados)
+        - "compacto": ResultadoCompacto (ids internados + vetor de valores;
+                      dicionários materializados apenas sob demanda)
+        - "valor":    apenas {"no_raiz", "valor_final"}
+        """
+        if modo not in MODOS_RESULTADO:
+            raise ValueError(
+                f"Modo de resultado inválido: '{modo}'. Use um entre {sorted(MODOS_RESULTADO)}."
+            )
+
+        if plano is None:
+            plano = self.compilar(no_raiz)
+        elif plano.no_raiz != no_raiz:
+            raise ErroInterpretacao(
+                f"Plano compilado para '{plano.no_raiz}' não corresponde ao nó raiz '{no_raiz}'."
+            )
+
+        valores = self._avaliar_plano(plano)
+        self._plano_atual = plano
+
+        if modo == "valor":
+            return {"no_raiz": no_raiz, "valor_final": valores[-1]}
+
+        compacto = ResultadoCompacto(plano, valores)
+        if modo == "compacto":
+            return compacto
+
+        self._materializar(compacto)
         return {
             "no_raiz": no_raiz,
-            "valor_final": valor_final,
+            "valor_final": compacto.valor_final,
             "trilha_calculo": self.trilha,
             "nos_avaliados": self._nos_avaliados,
         }
 
-    # -----------------------------
-    # Avaliação recursiva
-    # -----------------------------
+    def atualizar(self, chave: str, novo_valor: float) -> Dict[str, Any]:
+        """
+        Altera o valor de uma folha no Contexto e reavalia apenas os
+        nós que dependem dela (propagação de sujeira sobre o `memo`).
+
+        Exige uma chamada prévia a `executar`. Retorna o novo
+        `valor_final` da última raiz executada e o conjunto de nós
+        cujo valor mudou.
+        """
+        plano = self._plano_atual
+        if plano is None:
+            raise ErroInterpretacao(
+                "Nenhuma execução prévia: chame 'executar' antes de 'atualizar'."
+            )
 
-    def _avaliar_no(self, no_id: str) -> float:
-        if no_id in self.memo:
-            return self.memo[no_id]
+        slot = plano.slots.get(chave)
+        if slot is not None and plano.opcodes[slot] not in OPCODES_FOLHA:
+            raise ErroInterpretacao(
+                f"Nó '{chave}' não é folha: apenas valores do Contexto podem ser atualizados."
+            )
 
-        if no_id not in self.nos:
-            raise ErroInterpretacao(f"Nó inexistente: {no_id}")
+        # o contexto recebido pertence ao chamador: copiar antes de alterar
+        if not self._contexto_proprio:
+            self.contexto = dict(self.contexto)
+            self._contexto_proprio = True
+        ausente = chave not in self.contexto
+        item = self.contexto.get(chave)
+        self.contexto[chave] = {**item, "valor": novo_valor} if isinstance(item, dict) else {"valor": novo_valor}
 
-        no = self.nos[no_id]
-        tipo = no["tipo"]
+        memo = self.memo
 
-        # folhas
-        if tipo == "constante":
-            valor = self._resolver_constante(no_id)
-
-        elif tipo == "referencia":
-            valor = self._resolver_referencia(no_id)
-
-        # operações existentes
-        elif tipo == "soma":
-            valores = [self._avaliar_no(dep) for dep in no["dependencias"]]
-            valor = sum(valores)
-
-        elif tipo == "multiplicacao":
-            valores = [self._avaliar_no(dep) for dep in no["dependencias"]]
-            prod = 1.0
-            for v in valores:
-                prod *= v
-            valor = prod
-
-        elif tipo == "subtracao":
-            valores = [self._avaliar_no(dep) for dep in no["dependencias"]]
-            # comportamento: a - b - c - ...
-            if len(valores) < 2:
-                raise ErroInterpretacao(f"Nó '{no_id}' subtracao requer ao menos 2 dependências.")
-            valor = valores[0] - sum(valores[1:])
-
-        elif tipo == "divisao":
-            valores = [self._avaliar_no(dep) for dep in no["dependencias"]]
-            if len(valores) < 2:
-                raise ErroInterpretacao(f"Nó '{no_id}' divisao requer ao menos 2 dependências.")
-            resultado = valores[0]
-            for idx, v in enumerate(valores[1:], start=2):
-                if v == 0:
-                    raise ErroInterpretacao(
-                        f"Divisão por zero ao avaliar nó '{no_id}' (dependência #{idx} resultou em zero)."
-                    )
-                resultado /= v
-            valor = resultado
-
-        elif tipo == "potencia":
-            # aridade exatamente 2: base ^ expoente
-            deps = no.get("dependencias", [])
-            if len(deps) != 2:
-                raise ErroInterpretacao(f"Nó '{no_id}' potencia requer exatamente 2 dependências (base, expoente).")
-            base = self._avaliar_no(deps[0])
-            expo = self._avaliar_no(deps[1])
-
-            # proteger contra base negativa e expoente fracionário que resultaria em número complexo
-            if base < 0 and not float(expo).is_integer():
-                raise ErroInterpretacao(
-                    f"Potência inválida no nó '{no_id}': base negativa ({base}) com expoente fracionário ({expo}) produziria número complexo."
-                )
-            try:
-                valor = base ** expo
-            except Exception as e:
-                raise ErroInterpretacao(f"Erro ao calcular potencia no nó '{no_id}': {e}")
-
-        elif tipo == "raiz":
-            # aridade exatamente 2: radicando, indice
-            deps = no.get("dependencias", [])
-            if len(deps) != 2:
-                raise ErroInterpretacao(f"Nó '{no_id}' raiz requer exatamente 2 dependências (radicando, indice).")
-            rad = self._avaliar_no(deps[0])
-            indice = self._avaliar_no(deps[1])
-
-            if indice == 0:
-                raise ErroInterpretacao(f"Nó '{no_id}' raiz: índice não pode ser zero.")
-            # índice deve ser inteiro natural usualmente; aceitar float inteiro (ex.: 2.0)
-            if not float(indice).is_integer():
-                raise ErroInterpretacao(f"Nó '{no_id}' raiz: índice deve ser número inteiro (recebido {indice}).")
-            indice_int = int(indice)
-
-            if rad < 0 and (indice_int % 2 == 0):
-                raise ErroInterpretacao(
-                    f"Nó '{no_id}' raiz: radicando negativo ({rad}) com índice par ({indice_int}) produziria número complexo."
-                )
+        # nós de execuções com outras raízes não são reavaliados aqui: descartá-los
+        # (também quando a folha não está no plano atual, mas sim no deles)
+        if len(memo) > len(plano):
+            for no_id in [n for n in memo if n not in plano.slots]:
+                del memo[no_id]
+                self._exatos.pop(no_id, None)
+                self.trilha.pop(no_id, None)
+                self._nos_avaliados.pop(no_id, None)
 
-            try:
-                # calcular raiz n-ésima: rad ** (1 / indice)
-                valor = rad ** (1.0 / indice_int)
-            except Exception as e:
-                raise ErroInterpretacao(f"Erro ao calcular raiz no nó '{no_id}': {e}")
+        if slot is None:
+            return {
+                "no_raiz": plano.no_raiz,
+                "valor_final": memo[plano.no_raiz],
+                "nos_alterados": set(),
+            }
 
-        else:
-            raise ErroInterpretacao(f"Tipo de nó desconhecido: {tipo}")
+        try:
+            if self.aritmetica is None:
+                novos = self._propagar(plano, slot, chave)
+            else:
+                novos = self._propagar_exato(plano, slot, chave)
+        except BaseException:
+            # memo não foi alterado: o contexto volta a corresponder a ele
+            if ausente:
+                del self.contexto[chave]
+            else:
+                self.contexto[chave] = item
+            raise
 
-        # memo, trilha e nos_avaliados
-        self.memo[no_id] = valor
-        self.trilha[no_id] = {
-            "tipo": tipo,
-            "dependencias": no.get("dependencias", []),
-            "valor_calculado": valor,
-            "metadados_juridicos": no.get("metadados_juridicos", {})
+        for no_id, valor in novos.items():
+            memo[no_id] = valor
+            # a trilha só existe se materializada por uma execução "completo"
+            if no_id in self.trilha:
+                self.trilha[no_id]["valor_calculado"] = valor
+                self._nos_avaliados[no_id]["valor_calculado"] = valor
+
+        return {
+            "no_raiz": plano.no_raiz,
+            "valor_final": memo[plano.no_raiz],
+            "nos_alterados": set(novos),
         }
-        self._nos_avaliados[no_id] = {
-            "tipo": no["tipo"],
-            "dependencias": list(no.get("dependencias", [])),
-            "valor_calculado": valor,
-            "metadados_juridicos": no.get("metadados_juridicos", {}),
+
+    def _propagar(self, plano: PlanoAvaliacao, slot: int, chave: str) -> Dict[str, float]:
+        # valores novos são calculados à parte e só aplicados se não houver erro
+        ids = plano.ids
+        memo = self.memo
+        novos: Dict[str, float] = {}
+        alterados = set()
+
+        if plano.opcodes[slot] == OP_CONSTANTE:
+            valor = self._resolver_constante(chave)
+        else:
+            valor = self._resolver_referencia(chave)
+        if valor != memo[chave]:
+            novos[chave] = valor
+            alterados.add(slot)
+
+        for ancestral in plano.ancestrais(slot) if alterados else ():
+            ops = plano.operandos[ancestral]
+            if not any(op in alterados for op in ops):
+                continue
+
+            no_id = ids[ancestral]
+            valores = [novos.get(ids[i], memo[ids[i]]) for i in ops]
+            valor = OPERACOES[plano.opcodes[ancestral]](no_id, valores)
+
+            if valor != memo[no_id]:
+                novos[no_id] = valor
+                alterados.add(ancestral)
+
+        return novos
+
+    def _propagar_exato(self, plano: PlanoAvaliacao, slot: int, chave: str) -> Dict[str, float]:
+        # como _propagar, sobre os valores exatos; devolve os novos em float
+        exata = self.aritmetica
+        pontos = exata.pontos(plano)
+        operacoes = exata.operacoes
+        ids = plano.ids
+        exatos = self._exatos
+        novos: Dict[str, Any] = {}
+        alterados = set()
+
+        no_id = chave
+        try:
+            with exata.contexto_local():
+                if plano.opcodes[slot] == OP_CONSTANTE:
+                    valor = self._resolver_constante(chave)
+                else:
+                    valor = self._resolver_referencia(chave)
+                valor = exata.converter(chave, valor)
+                if slot in pontos:
+                    valor = exata.arredondar_valor(chave, valor, pontos[slot])
+                if valor != exatos[chave]:
+                    novos[chave] = valor
+                    alterados.add(slot)
+
+                for ancestral in plano.ancestrais(slot) if alterados else ():
+                    ops = plano.operandos[ancestral]
+                    if not any(op in alterados for op in ops):
+                        continue
+
+                    no_id = ids[ancestral]
+                    valores = [novos.get(ids[i], exatos[ids[i]]) for i in ops]
+                    valor = operacoes[plano.opcodes[ancestral]](no_id, valores)
+                    if ancestral in pontos:
+                        valor = exata.arredondar_valor(no_id, valor, pontos[ancestral])
+
+                    if valor != exatos[no_id]:
+                        novos[no_id] = valor
+                        alterados.add(ancestral)
+        except ArithmeticError as e:
+            raise _erro_decimal(no_id, e) from None
+
+        exatos.update(novos)
+        return {no_id: float(valor) for no_id, valor in novos.items()}
+
+    # -----------------------------
+    # Avaliação do plano (iterativa)
+    # -----------------------------
+
+    def _avaliar_plano(self, plano: PlanoAvaliacao) -> List[float]:
+        # nós calculados = entradas novas no memo: contagem sem custo por nó
+        antes = len(self.memo)
+        self._nos_cache = 0
+
+        if self.aritmetica is not None:
+            # valores exatos não entram no cache de subárvores (que guarda floats)
+            valores = self._avaliar_plano_exato(plano)
+        elif self.rastreador is not None:
+            # com rastreamento cada nó é avaliado individualmente (sem cache de subárvores)
+            valores = self._avaliar_plano_rastreado(plano)
+        elif self.cache_nos is not None and plano.hashes is not None:
+            valores = self._avaliar_plano_com_cache(plano)
+        else:
+            valores = self._avaliar_plano_simples(plano)
+
+        calculados = len(self.memo) - antes - self._nos_cache
+        self.estatisticas = {
+            "nos_plano": len(plano),
+            "nos_calculados": calculados,
+            "nos_cache": self._nos_cache,
+            "nos_memo": len(plano) - calculados - self._nos_cache,
         }
-        return valor
+        return valores
+
+    def _avaliar_plano_simples(self, plano: PlanoAvaliacao) -> List[float]:
+        ids = plano.ids
+        opcodes = plano.opcodes
+        operandos = plano.operandos
+        memo = self.memo
+
+        valores: List[float] = [0.0] * len(plano)
+
+        for slot, no_id in enumerate(ids):
+            if no_id in memo:
+                valores[slot] = memo[no_id]
+                continue
+
+            op = opcodes[slot]
+
+            # folhas
+            if op == OP_CONSTANTE:
+                valor = self._resolver_constante(no_id)
+            elif op == OP_REFERENCIA:
+                valor = self._resolver_referencia(no_id)
+
+            # operações
+            else:
+                valor = OPERACOES[op](no_id, [valores[i] for i in operandos[slot]])
+
+            valores[slot] = valor
+            memo[no_id] = valor
+
+        return valores
+
+    def _avaliar_plano_com_cache(self, plano: PlanoAvaliacao) -> List[float]:
+        # mesmo laço de _avaliar_plano; no início de cada bloco reaproveitável,
+        # um acerto no cache preenche o bloco inteiro e o laço salta para o fim
+        from quase_sem_querer.motor.cache_nos import MINIMO_NOS_SUBARVORE
+
+        cache = self.cache_nos
+        ids = plano.ids
+        opcodes = plano.opcodes
+        operandos = plano.operandos
+        hashes = plano.hashes
+        subarvores = plano.subarvores(MINIMO_NOS_SUBARVORE)
+        memo = self.memo
+
+        valores: List[float] = [0.0] * len(plano)
+        a_guardar: Dict[int, Tuple[Any, int]] = {}
+
+        slot = 0
+        total = len(plano)
+        while slot < total:
+            bloco = subarvores.get(slot)
+            if bloco is not None and ids[bloco[0]] not in memo:
+                fim, forma, folhas = bloco
+                chave = self._chave_subarvore(hashes[fim], forma, folhas, ids)
+                if chave is not None:
+                    em_cache = cache.obter(chave)
+                    if em_cache is not None:
+                        antes = len(memo)
+                        for i, valor in enumerate(em_cache, slot):
+                            valores[i] = memo.setdefault(ids[i], valor)
+                        self._nos_cache += len(memo) - antes
+                        slot = fim + 1
+                        continue
+                    a_guardar[fim] = (chave, slot)
+
+            no_id = ids[slot]
+            if no_id in memo:
+                valores[slot] = memo[no_id]
+            else:
+                op = opcodes[slot]
+                if op == OP_CONSTANTE:
+                    valor = self._resolver_constante(no_id)
+                elif op == OP_REFERENCIA:
+                    valor = self._resolver_referencia(no_id)
+                else:
+                    valor = OPERACOES[op](no_id, [valores[i] for i in operandos[slot]])
+                valores[slot] = valor
+                memo[no_id] = valor
+
+            pendente = a_guardar.pop(slot, None)
+            if pendente is not None:
+                chave, inicio = pendente
+                cache.guardar(chave, tuple(valores[inicio:slot + 1]))
+
+            slot += 1
+
+        return valores
+
+    def _avaliar_plano_rastreado(self, plano: PlanoAvaliacao) -> List[float]:
+        rastreador = self.rastreador
+        relogio = time.perf_counter_ns
+        ids = plano.ids
+        opcodes = plano.opcodes
+        operandos = plano.operandos
+        memo = self.memo
+
+        valores: List[float] = [0.0] * len(plano)
+
+        for slot, no_id in enumerate(ids):
+            inicio = relogio()
+            op = opcodes[slot]
+            if no_id in memo:
+                valor = memo[no_id]
+                origem = "memo"
+            else:
+                if op == OP_CONSTANTE:
+                    valor = self._resolver_constante(no_id)
+                elif op == OP_REFERENCIA:
+                    valor = self._resolver_referencia(no_id)
+                else:
+                    valor = OPERACOES[op](no_id, [valores[i] for i in operandos[slot]])
+                memo[no_id] = valor
+                origem = "calculado"
+            valores[slot] = valor
+
+            rastreador("no", {
+                "no_id": no_id,
+                "tipo": TIPOS_POR_OPCODE[op],
+                "valor": valor,
+                "origem": origem,
+                "duracao_ns": relogio() - inicio,
+            })
+
+        return valores
+
+    def _avaliar_plano_exato(self, plano: PlanoAvaliacao) -> List[float]:
+        exata = self.aritmetica
+        pontos = exata.pontos(plano)
+        operacoes = exata.operacoes
+        rastreador = self.rastreador
+        relogio = time.perf_counter_ns
+        ids = plano.ids
+        opcodes = plano.opcodes
+        operandos = plano.operandos
+        memo = self.memo
+        exatos = self._exatos
+
+        valores: List[Any] = [None] * len(plano)
+        saida: List[float] = [0.0] * len(plano)
+
+        no_id = None
+        try:
+            with exata.contexto_local():
+                for slot, no_id in enumerate(ids):
+                    inicio = relogio() if rastreador is not None else 0
+                    op = opcodes[slot]
+                    valor = exatos.get(no_id)
+                    if valor is not None:
+                        origem = "memo"
+                    else:
+                        if op == OP_CONSTANTE:
+                            valor = exata.converter(no_id, self._resolver_constante(no_id))
+                        elif op == OP_REFERENCIA:
+                            valor = exata.converter(no_id, self._resolver_referencia(no_id))
+                        else:
+                            valor = operacoes[op](no_id, [valores[i] for i in operandos[slot]])
+                        quantum = pontos.get(slot)
+                        if quantum is not None:
+                            valor = exata.arredondar_valor(no_id, valor, quantum)
+                        exatos[no_id] = valor
+                        memo[no_id] = float(valor)
+                        origem = "calculado"
+                    valores[slot] = valor
+                    saida[slot] = memo[no_id]
+
+                    if rastreador is not None:
+                        rastreador("no", {
+                            "no_id": no_id,
+                            "tipo": TIPOS_POR_OPCODE[op],
+                            "valor": saida[slot],
+                            "origem": origem,
+                            "duracao_ns": relogio() - inicio,
+                        })
+        except ArithmeticError as e:
+            raise _erro_decimal(no_id, e) from None
+
+        return saida
+
+    def _chave_subarvore(
+        self,
+        hash_no: str,
+        forma: str,
+        folhas: Tuple[int, ...],
+        ids: List[str],
+    ) -> Tuple[Any, ...] | None:
+        # folhas ausentes ou valores não hasheáveis: sem cache (a avaliação
+        # normal produz o mesmo erro que produziria sem ele)
+        valores = tuple(self._buscar_valor_contexto(ids[f]) for f in folhas)
+        if any(v is None for v in valores):
+            return None
+        # o tipo entra na chave: 1 e 1.0 (ou 0.0 e -0.0) geram trilhas diferentes
+        tipos = tuple(
+            type(v) if v or type(v) is not float else math.copysign(1.0, v)
+            for v in valores
+        )
+        chave = (hash_no, forma, valores, tipos)
+        try:
+            hash(chave)
+        except TypeError:
+            return None
+        return chave
+
+    def _materializar(self, compacto: ResultadoCompacto) -> None:
+        # trilha e nos_avaliados, na ordem do plano, apenas para nós ainda ausentes
+        plano = compacto.plano
+        for slot, no_id in enumerate(plano.ids):
+            if no_id in self.trilha:
+                continue
+            no = plano.definicoes[slot]
+            valor = compacto.valores[slot]
+            self.trilha[no_id] = _entrada_trilha(no, valor)
+            self._nos_avaliados[no_id] = _entrada_trilha(no, valor, copiar_dependencias=True)
 
     # -----------------------------
     # Resolução de folhas
@@ -200,3 +994,54 @@ class InterpretadorArvoreNormativa:
         if isinstance(item, dict) and "valor" in item:
             return item["valor"]
         return None
+
+
+# ----------------------------------------------------------------
+# Testes mínimos (sanity checks)
+# ----------------------------------------------------------------
+
+
+def _test_atualizar_com_erro_preserva_contexto():
+    modelo = {
+        "raiz": "d",
+        "nos": [
+            {"id": "a", "tipo": "referencia", "dependencias": []},
+            {"id": "b", "tipo": "referencia", "dependencias": []},
+            {"id": "d", "tipo": "divisao", "dependencias": ["a", "b"]},
+        ],
+    }
+    contexto = {"a": {"valor": 1.0}, "b": {"valor": 2.0}}
+    interp = InterpretadorArvoreNormativa(modelo, contexto)
+    assert interp.executar("d", modo="valor")["valor_final"] == 0.5
+
+    try:
+        interp.atualizar("b", 0.0)
+    except ErroInterpretacao:
+        pass
+    else:
+        raise AssertionError("divisão por zero deveria falhar")
+    # contexto e memo seguem coerentes após a falha
+    assert interp.contexto["b"] == {"valor": 2.0}
+    assert contexto["b"] == {"valor": 2.0}
+
+    assert interp.atualizar("a", 3.0)["valor_final"] == 1.5
+    assert interp.executar("d", modo="valor")["valor_final"] == 1.5
+
+
+def _test_atualizar_folha_de_outra_raiz():
+    modelo = {
+        "raiz": "A",
+        "nos": [
+            {"id": "x", "tipo": "referencia", "dependencias": []},
+            {"id": "y", "tipo": "referencia", "dependencias": []},
+            {"id": "A", "tipo": "soma", "dependencias": ["x", "y"]},
+            {"id": "B", "tipo": "soma", "dependencias": ["y", "y"]},
+        ],
+    }
+    interp = InterpretadorArvoreNormativa(modelo, {"x": {"valor": 2.0}, "y": {"valor": 1.0}})
+    assert interp.executar("A")["valor_final"] == 3.0
+    assert interp.executar("B")["valor_final"] == 2.0
+
+    # x não está no plano de B, mas A (no memo) depende dele
+    assert interp.atualizar("x", 10.0)["nos_alterados"] == set()
+    assert interp.executar("A")["valor_final"] == 11.0
@@ -0,0 +1,324 @@
+# ================================================================
+# Interpretador Vetorial (avaliação em lote)
+# Projeto: Quase Sem Querer
+#
+# Responsabilidade:
+# - Avaliar um mesmo modelo normativo sobre N contextos de uma vez
+# - Cada folha vira uma coluna de tamanho N; cada operação, uma
+#   operação NumPy sobre colunas
+# - Aplicar, linha a linha, as mesmas verificações do interpretador
+#   escalar (divisão por zero, potência e raiz inválidas)
+#
+# Não contém lógica jurídica.
+# Não persiste resultados.
+# ================================================================
+
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, List, Mapping, Sequence
+
+import numpy as np
+
+from quase_sem_querer.motor.interpretador import (
+    OP_CONSTANTE,
+    OP_DIVISAO,
+    OP_MULTIPLICACAO,
+    OP_POTENCIA,
+    OP_RAIZ,
+    OP_REFERENCIA,
+    OP_SOMA,
+    OP_SUBTRACAO,
+    PlanoAvaliacao,
+    compilar_plano,
+)
+from quase_sem_querer.motor.verificador import VerificadorEstatico
+
+
+class ResultadoLote:
+    """
+    Resultado de uma avaliação em lote.
+
+    - valores: matriz (N contextos x nós do plano), float64
+    - erros:   {linha: mensagem} com o primeiro erro de cada linha
+    - resultado[no_id] devolve a coluna do nó (tamanho N)
+
+    Linhas com erro têm NaN a partir do nó que falhou.
+    """
+
+    def __init__(self, plano: PlanoAvaliacao, valores: np.ndarray, erros: Dict[int, str]):
+        self.plano = plano
+        self.no_raiz = plano.no_raiz
+        self.ids = plano.ids
+        self.indice = plano.slots
+        self.valores = valores
+        self.erros = erros
+
+    def __len__(self) -> int:
+        return self.valores.shape[0]
+
+    def __getitem__(self, no_id: str) -> np.ndarray:
+        return self.valores[:, self.indice[no_id]]
+
+    @property
+    def valor_final(self) -> np.ndarray:
+        return self.valores[:, -1]
+
+    @property
+    def validas(self) -> np.ndarray:
+        mascara = np.ones(len(self), dtype=bool)
+        if self.erros:
+            mascara[list(self.erros)] = False
+        return mascara
+
+
+# ----------------------------------------------------------------
+# API pública
+# ----------------------------------------------------------------
+
+def executar_lote(
+    modelo: Dict[str, Any],
+    contextos: Sequence[Dict[str, Any]],
+    *,
+    no_raiz: str | None = None,
+    plano: PlanoAvaliacao | None = None,
+) -> ResultadoLote:
+    """
+    Avalia `modelo` (já achatado) sobre uma sequência de contextos
+    (já achatados), percorrendo o plano compilado uma única vez.
+
+    O modelo é verificado uma vez; erros de avaliação não interrompem
+    o lote e são reportados por linha em `ResultadoLote.erros`.
+    """
+
+    no_raiz = no_raiz or modelo.get("raiz")
+    if not no_raiz:
+        raise ValueError("Informe 'no_raiz' ou declare 'raiz' no modelo.")
+
+    if plano is None:
+        VerificadorEstatico.validar_modelo(modelo)
+        nos = {no["id"]: no for no in modelo.get("nos", [])}
+        plano = compilar_plano(nos, no_raiz)
+
+    return _avaliar_plano_vetorial(
+        plano,
+        len(contextos),
+        lambda no_id, rotulo, erros: _coluna_folha(no_id, rotulo, contextos, erros),
+    )
+
+
+def executar_colunas(
+    plano: PlanoAvaliacao,
+    colunas: Mapping[str, np.ndarray | float],
+    n: int,
+) -> ResultadoLote:
+    """
+    Avalia `plano` sobre N linhas cujas folhas já são colunas NumPy
+    (tamanho N) ou escalares (mesmo valor em todas as linhas).
+
+    Evita montar N contextos quando os valores já estão em vetores
+    (ex.: amostras de Monte Carlo). Toda folha do plano deve constar
+    em `colunas`.
+    """
+    ausentes = [plano.ids[slot] for slot in plano.folhas if plano.ids[slot] not in colunas]
+    if ausentes:
+        raise ValueError(f"Folhas sem coluna de valores: {ausentes}")
+
+    return _avaliar_plano_vetorial(plano, n, lambda no_id, _rotulo, _erros: colunas[no_id])
+
+
+# ----------------------------------------------------------------
+# Avaliação
+# ----------------------------------------------------------------
+
+def _coluna_folha(
+    no_id: str,
+    rotulo: str,
+    contextos: Sequence[Dict[str, Any]],
+    erros: Dict[int, str],
+) -> np.ndarray:
+    # caminho rápido: todas as linhas possuem valor numérico
+    try:
+        return np.fromiter(
+            (contexto[no_id]["valor"] for contexto in contextos),
+            dtype=np.float64,
+            count=len(contextos),
+        )
+    except (KeyError, TypeError, ValueError):
+        pass
+
+    coluna = np.empty(len(contextos), dtype=np.float64)
+
+    for linha, contexto in enumerate(contextos):
+        item = contexto.get(no_id)
+        valor = item.get("valor") if isinstance(item, dict) else None
+
+        if valor is None:
+            erros.setdefault(linha, f"{rotulo} '{no_id}' não encontrada no Contexto.")
+            coluna[linha] = np.nan
+            continue
+
+        try:
+            coluna[linha] = float(valor)
+        except (TypeError, ValueError):
+            erros.setdefault(
+                linha, f"{rotulo} '{no_id}' possui valor não numérico no Contexto: {valor!r}."
+            )
+            coluna[linha] = np.nan
+
+    return coluna
+
+
+def _marcar_erro(
+    erros: Dict[int, str],
+    linhas: np.ndarray,
+    mensagem,
+) -> None:
+    for linha in np.flatnonzero(linhas):
+        erros.setdefault(int(linha), mensagem(int(linha)))
+
+
+def _avaliar_plano_vetorial(
+    plano: PlanoAvaliacao,
+    n: int,
+    coluna_folha: Callable[[str, str, Dict[int, str]], np.ndarray | float],
+) -> ResultadoLote:
+    valores = np.empty((n, len(plano)), dtype=np.float64)
+    erros: Dict[int, str] = {}
+
+    with np.errstate(all="ignore"):
+        for slot, no_id in enumerate(plano.ids):
+            op = plano.opcodes[slot]
+
+            if op == OP_CONSTANTE:
+                valores[:, slot] = coluna_folha(no_id, "Constante", erros)
+                continue
+            if op == OP_REFERENCIA:
+                valores[:, slot] = coluna_folha(no_id, "Referência", erros)
+                continue
+
+            cols: List[np.ndarray] = [valores[:, i] for i in plano.operandos[slot]]
+            # linhas ainda sem erro (NaN se propaga pelas dependências)
+            ok = ~np.isnan(cols[0])
+            for c in cols[1:]:
+                ok &= ~np.isnan(c)
+
+            if op == OP_SOMA:
+                res = cols[0].copy()
+                for c in cols[1:]:
+                    res += c
+
+            elif op == OP_MULTIPLICACAO:
+                res = cols[0].copy()
+                for c in cols[1:]:
+                    res *= c
+
+            elif op == OP_SUBTRACAO:
+                # comportamento: a - b - c - ...
+                resto = cols[1].copy()
+                for c in cols[2:]:
+                    resto += c
+                res = cols[0] - resto
+
+            elif op == OP_DIVISAO:
+                res = cols[0].copy()
+                for idx, c in enumerate(cols[1:], start=2):
+                    zero = ok & (c == 0)
+                    _marcar_erro(
+                        erros,
+                        zero,
+                        lambda _, idx=idx: (
+                            f"Divisão por zero ao avaliar nó '{no_id}' "
+                            f"(dependência #{idx} resultou em zero)."
+                        ),
+                    )
+                    ok &= ~zero
+                    res /= c
+
+            elif op == OP_POTENCIA:
+                base, expo = cols
+                complexo = ok & (base < 0) & (expo != np.floor(expo))
+                _marcar_erro(
+                    erros,
+                    complexo,
+                    lambda linha: (
+                        f"Potência inválida no nó '{no_id}': base negativa ({base[linha]}) "
+                        f"com expoente fracionário ({expo[linha]}) produziria número complexo."
+                    ),
+                )
+                ok &= ~complexo
+
+                zero_negativo = ok & (base == 0) & (expo < 0)
+                _marcar_erro(
+                    erros,
+                    zero_negativo,
+                    lambda _: (
+                        f"Erro ao calcular potencia no nó '{no_id}': "
+                        f"0.0 cannot be raised to a negative power"
+                    ),
+                )
+                ok &= ~zero_negativo
+
+                res = np.power(base, expo)
+                estouro = ok & ~np.isfinite(res)
+                _marcar_erro(
+                    erros,
+                    estouro,
+                    lambda _: (
+                        f"Erro ao calcular potencia no nó '{no_id}': "
+                        f"(34, 'Numerical result out of range')"
+                    ),
+                )
+                ok &= ~estouro
+
+            elif op == OP_RAIZ:
+                rad, indice = cols
+
+                indice_zero = ok & (indice == 0)
+                _marcar_erro(
+                    erros,
+                    indice_zero,
+                    lambda _: f"Nó '{no_id}' raiz: índice não pode ser zero.",
+                )
+                ok &= ~indice_zero
+
+                fracionario = ok & (indice != np.floor(indice))
+                _marcar_erro(
+                    erros,
+                    fracionario,
+                    lambda linha: (
+                        f"Nó '{no_id}' raiz: índice deve ser número inteiro "
+                        f"(recebido {indice[linha]})."
+                    ),
+                )
+                ok &= ~fracionario
+
+                par_negativo = ok & (rad < 0) & (np.fmod(indice, 2) == 0)
+                _marcar_erro(
+                    erros,
+                    par_negativo,
+                    lambda linha: (
+                        f"Nó '{no_id}' raiz: radicando negativo ({rad[linha]}) com índice par "
+                        f"({int(indice[linha])}) produziria número complexo."
+                    ),
+                )
+                ok &= ~par_negativo
+
+                res = np.power(rad, 1.0 / np.trunc(indice))
+                complexo = ok & np.isnan(res)
+                _marcar_erro(
+                    erros,
+                    complexo,
+                    lambda linha: (
+                        f"Erro ao calcular raiz no nó '{no_id}': radicando negativo "
+                        f"({rad[linha]}) não possui raiz real no ponto flutuante."
+                    ),
+                )
+                ok &= ~complexo
+
+            else:
+                raise ValueError(f"Opcode desconhecido no plano: {op}")
+
+            res[~ok] = np.nan
+            valores[:, slot] = res
+
+    return ResultadoLote(plano, valores, erros)
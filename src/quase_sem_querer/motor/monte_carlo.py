@@ -0,0 +1,357 @@
+# ================================================================
+# Análise de incerteza (Monte Carlo vetorial)
+# Projeto: Quase Sem Querer
+#
+# Responsabilidade:
+# - Ler distribuições declaradas nas folhas do Contexto, ao lado de
+#   "valor":
+#
+#       "salario_base": {
+#           "valor": 2500.0,
+#           "distribuicao": {"tipo": "normal", "desvio_padrao": 150.0}
+#       }
+#
+# - Sortear N amostras e avaliar o modelo em blocos, coluna a coluna
+#   (interpretador vetorial), sem montar um contexto por amostra
+# - Entregar média, desvio, percentis e histograma de valor_final e
+#   dos subtotais escolhidos
+#
+# Reprodutibilidade: cada folha tem seu próprio gerador, derivado da
+# semente e do nome da folha. O resultado não depende do tamanho do
+# bloco nem das demais folhas sorteadas.
+#
+# Memória: a matriz de avaliação tem `tamanho_bloco` linhas; das
+# amostras, guarda-se apenas uma coluna por nó reportado.
+#
+# Não escolhe cenário. Não persiste resultados.
+# ================================================================
+
+from __future__ import annotations
+
+import zlib
+from collections import Counter
+from typing import Any, Dict, Sequence, Tuple
+
+import numpy as np
+
+from quase_sem_querer.motor.interpretador import (
+    OP_CONSTANTE,
+    PlanoAvaliacao,
+    compilar_plano,
+)
+from quase_sem_querer.motor.interpretador_vetorial import executar_colunas
+from quase_sem_querer.motor.verificador import VerificadorEstatico
+
+
+AMOSTRAS_PADRAO = 100_000
+TAMANHO_BLOCO_PADRAO = 10_000
+PERCENTIS_PADRAO = (1, 5, 10, 25, 50, 75, 90, 95, 99)
+FAIXAS_HISTOGRAMA_PADRAO = 50
+
+# mensagens de erro distintas mantidas no resumo
+MAXIMO_MENSAGENS_ERRO = 10
+
+# tipo -> (parâmetros obrigatórios, parâmetros opcionais)
+DISTRIBUICOES = {
+    "normal": (("desvio_padrao",), ("media", "minimo", "maximo")),
+    "uniforme": (("minimo", "maximo"), ()),
+    "triangular": (("minimo", "maximo"), ("moda",)),
+}
+
+
+class ErroMonteCarlo(Exception):
+    """Erro bloqueante na definição de uma análise de Monte Carlo."""
+    pass
+
+
+# ----------------------------------------------------------------
+# Distribuições do Contexto
+# ----------------------------------------------------------------
+
+def _validar_distribuicao(chave: str, item: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Parâmetros validados e completados da "distribuicao" de uma entrada
+    do contexto:
+
+    - normal:     desvio_padrao; media (padrão: valor); minimo e
+                  maximo opcionais (amostras fora são levadas ao limite)
+    - uniforme:   minimo, maximo
+    - triangular: minimo, maximo; moda (padrão: valor)
+    """
+    definicao = item["distribuicao"]
+    if not isinstance(definicao, dict):
+        raise ErroMonteCarlo(f"Distribuição de '{chave}' deve ser um objeto JSON.")
+
+    tipo = definicao.get("tipo")
+    if tipo not in DISTRIBUICOES:
+        raise ErroMonteCarlo(
+            f"Distribuição de '{chave}' com tipo inválido: {tipo!r}. "
+            f"Use um entre {tuple(DISTRIBUICOES)}."
+        )
+
+    obrigatorios, opcionais = DISTRIBUICOES[tipo]
+    ausentes = [p for p in obrigatorios if p not in definicao]
+    if ausentes:
+        raise ErroMonteCarlo(f"Distribuição {tipo} de '{chave}' sem parâmetros: {ausentes}")
+
+    parametros: Dict[str, Any] = {"tipo": tipo}
+    for nome in (*obrigatorios, *opcionais):
+        if definicao.get(nome) is None:
+            continue
+        valor = definicao[nome]
+        if isinstance(valor, bool) or not isinstance(valor, (int, float)):
+            raise ErroMonteCarlo(
+                f"Parâmetro '{nome}' da distribuição de '{chave}' não é numérico: {valor!r}."
+            )
+        parametros[nome] = float(valor)
+
+    # parâmetros de centro ausentes vêm do valor nominal
+    centro = "media" if tipo == "normal" else "moda" if tipo == "triangular" else None
+    if centro and centro not in parametros:
+        nominal = item.get("valor")
+        if isinstance(nominal, bool) or not isinstance(nominal, (int, float)):
+            raise ErroMonteCarlo(
+                f"Distribuição {tipo} de '{chave}' sem '{centro}' e sem 'valor' numérico."
+            )
+        parametros[centro] = float(nominal)
+
+    minimo = parametros.get("minimo", -np.inf)
+    maximo = parametros.get("maximo", np.inf)
+    if minimo > maximo:
+        raise ErroMonteCarlo(f"Distribuição de '{chave}': 'minimo' maior que 'maximo'.")
+    if tipo == "normal" and parametros["desvio_padrao"] < 0:
+        raise ErroMonteCarlo(f"Distribuição de '{chave}': 'desvio_padrao' negativo.")
+    if tipo == "triangular" and not minimo <= parametros["moda"] <= maximo:
+        raise ErroMonteCarlo(
+            f"Distribuição de '{chave}': 'moda' fora do intervalo [minimo, maximo]."
+        )
+
+    return parametros
+
+
+# ----------------------------------------------------------------
+# API pública
+# ----------------------------------------------------------------
+
+def executar_monte_carlo(
+    modelo: Dict[str, Any],
+    contexto: Dict[str, Any],
+    *,
+    amostras: int = AMOSTRAS_PADRAO,
+    semente: int | None = None,
+    subtotais: Sequence[str] = (),
+    no_raiz: str | None = None,
+    percentis: Sequence[float] = PERCENTIS_PADRAO,
+    faixas_histograma: int = FAIXAS_HISTOGRAMA_PADRAO,
+    tamanho_bloco: int = TAMANHO_BLOCO_PADRAO,
+    plano: PlanoAvaliacao | None = None,
+) -> Dict[str, Any]:
+    """
+    Sorteia `amostras` valores de cada folha com distribuição em
+    `contexto` (já achatado), avalia `modelo` (já achatado) em blocos
+    de `tamanho_bloco` e resume a distribuição de valor_final e de
+    cada subtotal:
+
+        {"no_raiz", "amostras", "semente", "validas", "falhas",
+         "erros": {mensagem: ocorrências},
+         "folhas_aleatorias": {folha: distribuição},
+         "estatisticas": {
+             "valor_final": {"media", "desvio_padrao", "minimo", "maximo",
+                             "percentis": {"p5": ..., ...},
+                             "histograma": {"limites": [...], "contagens": [...]}},
+             "<subtotal>": {...}}}
+
+    Sem `semente`, uma é sorteada e devolvida no resumo para que a
+    análise possa ser repetida. Amostras com erro de avaliação (ex.:
+    divisão por zero) são contadas em "falhas" e ficam fora das
+    estatísticas.
+    """
+
+    if amostras < 1:
+        raise ErroMonteCarlo("'amostras' deve ser positivo.")
+    if tamanho_bloco < 1:
+        raise ErroMonteCarlo("'tamanho_bloco' deve ser positivo.")
+    if faixas_histograma < 1:
+        raise ErroMonteCarlo("'faixas_histograma' deve ser positivo.")
+    if any(not 0 <= p <= 100 for p in percentis):
+        raise ErroMonteCarlo("Percentis devem estar entre 0 e 100.")
+
+    no_raiz = no_raiz or modelo.get("raiz")
+    if not no_raiz:
+        raise ErroMonteCarlo("Informe 'no_raiz' ou declare 'raiz' no modelo.")
+
+    if plano is None:
+        VerificadorEstatico.validar_modelo(modelo)
+        plano = compilar_plano({no["id"]: no for no in modelo["nos"]}, no_raiz)
+
+    for subtotal in subtotais:
+        if subtotal not in plano.slots:
+            raise ErroMonteCarlo(
+                f"Subtotal '{subtotal}' não é alcançável a partir do nó raiz '{no_raiz}'."
+            )
+
+    sequencia = np.random.SeedSequence(semente)
+    aleatorias, fixas = _folhas(plano, contexto)
+    geradores = {
+        folha: np.random.default_rng(
+            np.random.SeedSequence(sequencia.entropy, spawn_key=(zlib.crc32(folha.encode("utf-8")),))
+        )
+        for folha in aleatorias
+    }
+
+    reportados = {"valor_final": plano.slots[no_raiz]}
+    reportados.update({subtotal: plano.slots[subtotal] for subtotal in subtotais})
+    colunas_reportadas = {nome: np.empty(amostras, dtype=np.float64) for nome in reportados}
+    validas = np.ones(amostras, dtype=bool)
+    erros: Counter = Counter()
+
+    for inicio in range(0, amostras, tamanho_bloco):
+        n = min(tamanho_bloco, amostras - inicio)
+        colunas: Dict[str, np.ndarray | float] = dict(fixas)
+        for folha, parametros in aleatorias.items():
+            colunas[folha] = _sortear(geradores[folha], parametros, n)
+
+        lote = executar_colunas(plano, colunas, n)
+        for nome, slot in reportados.items():
+            colunas_reportadas[nome][inicio:inicio + n] = lote.valores[:, slot]
+        if lote.erros:
+            validas[inicio:inicio + n] = lote.validas
+            erros.update(lote.erros.values())
+
+    n_validas = int(validas.sum())
+    return {
+        "no_raiz": no_raiz,
+        "amostras": amostras,
+        "semente": sequencia.entropy,
+        "validas": n_validas,
+        "falhas": amostras - n_validas,
+        "erros": dict(erros.most_common(MAXIMO_MENSAGENS_ERRO)),
+        "folhas_aleatorias": aleatorias,
+        "estatisticas": {
+            nome: _resumir(coluna[validas], percentis, faixas_histograma)
+            for nome, coluna in colunas_reportadas.items()
+        },
+    }
+
+
+# ----------------------------------------------------------------
+# Implementações internas
+# ----------------------------------------------------------------
+
+def _folhas(
+    plano: PlanoAvaliacao,
+    contexto: Dict[str, Any],
+) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, float]]:
+    """(folhas sorteadas -> parâmetros, folhas fixas -> valor) do plano."""
+    aleatorias: Dict[str, Dict[str, Any]] = {}
+    fixas: Dict[str, float] = {}
+
+    for slot in plano.folhas:
+        folha = plano.ids[slot]
+        rotulo = "Constante" if plano.opcodes[slot] == OP_CONSTANTE else "Referência"
+        item = contexto.get(folha)
+
+        if isinstance(item, dict) and "distribuicao" in item:
+            aleatorias[folha] = _validar_distribuicao(folha, item)
+            continue
+
+        valor = item.get("valor") if isinstance(item, dict) else None
+        if valor is None:
+            raise ErroMonteCarlo(f"{rotulo} '{folha}' não encontrada no Contexto.")
+        try:
+            fixas[folha] = float(valor)
+        except (TypeError, ValueError):
+            raise ErroMonteCarlo(
+                f"{rotulo} '{folha}' possui valor não numérico no Contexto: {valor!r}."
+            ) from None
+
+    return aleatorias, fixas
+
+
+def _sortear(gerador: np.random.Generator, parametros: Dict[str, Any], n: int) -> np.ndarray:
+    tipo = parametros["tipo"]
+
+    if tipo == "normal":
+        amostra = gerador.normal(parametros["media"], parametros["desvio_padrao"], n)
+        if "minimo" in parametros or "maximo" in parametros:
+            np.clip(
+                amostra,
+                parametros.get("minimo", -np.inf),
+                parametros.get("maximo", np.inf),
+                out=amostra,
+            )
+        return amostra
+
+    if tipo == "uniforme":
+        return gerador.uniform(parametros["minimo"], parametros["maximo"], n)
+
+    if parametros["minimo"] == parametros["maximo"]:
+        # numpy não aceita triangular degenerada
+        return np.full(n, parametros["minimo"])
+    return gerador.triangular(parametros["minimo"], parametros["moda"], parametros["maximo"], n)
+
+
+def _resumir(
+    valores: np.ndarray,
+    percentis: Sequence[float],
+    faixas_histograma: int,
+) -> Dict[str, Any] | None:
+    if valores.size == 0:
+        return None
+
+    contagens, limites = np.histogram(valores, bins=faixas_histograma)
+    return {
+        "media": float(valores.mean()),
+        "desvio_padrao": float(valores.std()),
+        "minimo": float(valores.min()),
+        "maximo": float(valores.max()),
+        "percentis": {
+            f"p{p:g}": float(v)
+            for p, v in zip(percentis, np.percentile(valores, percentis))
+        },
+        "histograma": {
+            "limites": limites.tolist(),
+            "contagens": contagens.tolist(),
+        },
+    }
+
+
+# ----------------------------------------------------------------
+# Testes mínimos (sanity checks)
+# ----------------------------------------------------------------
+
+
+def _test_monte_carlo():
+    """Reprodutibilidade por semente e independência do tamanho do bloco."""
+    modelo = {
+        "raiz": "total",
+        "nos": [
+            {"id": "salario_base", "tipo": "referencia", "dependencias": []},
+            {"id": "beneficios", "tipo": "referencia", "dependencias": []},
+            {"id": "percentual_encargos", "tipo": "constante", "dependencias": []},
+            {"id": "encargos", "tipo": "multiplicacao", "dependencias": ["salario_base", "percentual_encargos"]},
+            {"id": "total", "tipo": "soma", "dependencias": ["salario_base", "encargos", "beneficios"]},
+        ],
+    }
+    contexto = {
+        "salario_base": {"valor": 2000.0, "distribuicao": {"tipo": "normal", "desvio_padrao": 100.0}},
+        "beneficios": {"valor": 500.0, "distribuicao": {"tipo": "uniforme", "minimo": 400.0, "maximo": 600.0}},
+        "percentual_encargos": {"valor": 0.3, "distribuicao": {"tipo": "triangular", "minimo": 0.25, "maximo": 0.4}},
+    }
+
+    a = executar_monte_carlo(modelo, contexto, amostras=5000, semente=7, subtotais=["encargos"])
+    b = executar_monte_carlo(modelo, contexto, amostras=5000, semente=7, subtotais=["encargos"], tamanho_bloco=333)
+    assert a == b
+    assert a["validas"] == 5000 and a["falhas"] == 0
+
+    total = a["estatisticas"]["valor_final"]
+    # E[total] = E[s]·(1 + E[p]) + E[b], fatores independentes
+    esperado = 2000.0 * (1 + (0.25 + 0.3 + 0.4) / 3) + 500.0
+    assert abs(total["media"] - esperado) < 0.01 * esperado
+    assert total["percentis"]["p1"] < total["percentis"]["p50"] < total["percentis"]["p99"]
+    assert sum(total["histograma"]["contagens"]) == 5000
+
+    fixo = dict(contexto, beneficios={"valor": 500.0})
+    c = executar_monte_carlo(modelo, fixo, amostras=5000, semente=7)
+    assert set(c["folhas_aleatorias"]) == {"salario_base", "percentual_encargos"}
+    assert c["folhas_aleatorias"]["salario_base"]["media"] == 2000.0
@@ -4,13 +4,46 @@
 # ================================================================
 
 from __future__ import annotations
-from typing import Any, Dict
 
-from quase_sem_querer.carregadores.carregador_modelo import carregar_modelo
+import time
+from typing import TYPE_CHECKING, Any, Dict
+
+from quase_sem_querer.carregadores.registro_modelos import obter_modelo
 from quase_sem_querer.carregadores.carregador_contexto import carregar_contexto
-from quase_sem_querer.motor.interpretador import InterpretadorArvoreNormativa
-from quase_sem_querer.motor.verificador import VerificadorEstatico
-from quase_sem_querer.motor.persistencia_execucao import PersistidorExecucao
+from quase_sem_querer.motor.interpretador import (
+    InterpretadorArvoreNormativa,
+    Rastreador,
+    ResultadoCompacto,
+)
+from quase_sem_querer.motor.hash_merkle import hash_contexto as _hash_contexto
+
+if TYPE_CHECKING:
+    # persistência (sqlite3, tempfile, uuid), caches e aritmética decimal
+    # só são importados quando usados: scripts curtos não pagam por eles
+    from quase_sem_querer.motor.aritmetica_decimal import AritmeticaDecimal
+    from quase_sem_querer.motor.cache_nos import CacheNos
+    from quase_sem_querer.motor.cache_resultados import CacheResultados
+
+
+class _Cronometro:
+    """Tempos monotônicos (ms) de fases consecutivas da execução."""
+
+    def __init__(self, rastreador: Rastreador | None):
+        self.rastreador = rastreador
+        self.inicio = self._marca = time.perf_counter()
+        self.tempos: Dict[str, float] = {}
+
+    def marcar(self, fase: str) -> None:
+        agora = time.perf_counter()
+        duracao = (agora - self._marca) * 1000
+        self._marca = agora
+        self.tempos[fase] = round(duracao, 3)
+        if self.rastreador is not None:
+            self.rastreador("fase", {"fase": fase, "duracao_ms": duracao})
+
+    def ate_agora(self) -> Dict[str, float]:
+        """Tempos das fases já marcadas, mais o total decorrido."""
+        return {**self.tempos, "total": round((time.perf_counter() - self.inicio) * 1000, 3)}
 
 
 def executar_modelo(
@@ -18,9 +51,42 @@ def executar_modelo(
     nome_modelo: str,
     nome_contexto: str | None = None,
     contexto: Dict[str, Any] | None = None,
-    no_raiz: str,
+    no_raiz: str | None = None,
     persistir: bool = False,
-) -> Dict[str, Any]:
+    modo: str = "completo",
+    cache: CacheResultados | None = None,
+    cache_nos: CacheNos | None = None,
+    aguardar_persistencia: bool = False,
+    rastreador: Rastreador | None = None,
+    aritmetica: AritmeticaDecimal | str | Dict[str, Any] | None = None,
+) -> Dict[str, Any] | ResultadoCompacto:
+    """
+    Fluxo canônico: modelo (registro) → contexto → interpretação →
+    persistência opcional.
+
+    Sem `no_raiz`, avalia a raiz declarada no modelo.
+
+    Com `cache`, resultados do mesmo (modelo, contexto, raiz) são
+    reaproveitados (modos "completo" e "valor"); o resultado servido
+    pelo cache é compartilhado e não deve ser alterado. Com `cache_nos`,
+    subárvores idênticas às de execuções anteriores não são recalculadas.
+
+    A persistência padrão é assíncrona; `aguardar_persistencia=True`
+    só retorna após a execução estar gravada.
+
+    O resultado traz `meta_execucao["instrumentacao"]`: tempos de cada
+    fase (ms), origem do resultado (cache ou cálculo), contagens de nós
+    e, se o modelo foi (re)carregado nesta chamada, os tempos da carga.
+    Na cópia persistida, o total vai até o início da gravação.
+    `rastreador(evento, dados)` recebe cada fase ("fase") e cada nó
+    visitado ("no"); sem ele, nada é chamado.
+
+    `aritmetica` escolhe a aritmética da execução: None ou "float"
+    (padrão), "decimal" ou {"modo": "decimal", "casas": 2, "arredondar":
+    [...], ...} (ver aritmetica_decimal). A escolha fica registrada em
+    `meta_execucao["aritmetica"]`; execuções decimais não usam `cache`
+    nem `cache_nos`, que guardam resultados em ponto flutuante.
+    """
 
     if (nome_contexto is None and contexto is None) or (
         nome_contexto is not None and contexto is not None
@@ -29,24 +95,121 @@ def executar_modelo(
             "Informe exatamente um entre 'nome_contexto' ou 'contexto'."
         )
 
-    modelo = carregar_modelo(nome_modelo)
+    if persistir and modo == "valor":
+        raise ValueError(
+            "Execuções persistidas exigem a trilha: use modo 'completo' ou 'compacto'."
+        )
+
+    exata = None
+    if aritmetica is not None:
+        from quase_sem_querer.motor.aritmetica_decimal import resolver_aritmetica
+
+        exata = resolver_aritmetica(aritmetica)
+    descricao_aritmetica = exata.descricao() if exata is not None else {"modo": "float"}
+
+    cronometro = _Cronometro(rastreador)
+
+    # leitura, achatamento, verificação estática e hash em cache por processo
+    registrado = obter_modelo(nome_modelo)
+    modelo = registrado.modelo
+    cronometro.marcar("obter_modelo")
+
+    if no_raiz is None:
+        no_raiz = modelo.get("raiz")
+        if not no_raiz:
+            raise ValueError(
+                f"Modelo '{nome_modelo}' não declara raiz: informe 'no_raiz'."
+            )
 
     if nome_contexto is not None:
         contexto_final = carregar_contexto(nome_contexto)
+        cronometro.marcar("carregar_contexto")
     else:
         contexto_final = contexto
 
-    VerificadorEstatico.validar_modelo(modelo)
+    usar_cache = cache is not None and modo != "compacto" and exata is None
+
+    hash_contexto = None
+    if usar_cache or persistir:
+        hash_contexto = _hash_contexto(contexto_final)
+        cronometro.marcar("hash_contexto")
+
+    resultado = None
+    if usar_cache:
+        em_cache = cache.obter(registrado.hash_modelo, hash_contexto, no_raiz)
+        if em_cache is not None:
+            resultado = (
+                em_cache
+                if modo == "completo"
+                else {"no_raiz": no_raiz, "valor_final": em_cache["valor_final"]}
+            )
+        cronometro.marcar("consultar_cache")
+
+    estatisticas_nos = None
+    if resultado is None:
+        interpretador = InterpretadorArvoreNormativa(
+            modelo,
+            contexto_final,
+            cache_nos=cache_nos if exata is None else None,
+            rastreador=rastreador,
+            aritmetica=exata,
+        )
+        resultado = interpretador.executar(
+            no_raiz, plano=registrado.plano(no_raiz), modo=modo
+        )
+        estatisticas_nos = interpretador.estatisticas
+        cronometro.marcar("avaliar")
+        if usar_cache and modo == "completo":
+            cache.guardar(registrado.hash_modelo, hash_contexto, no_raiz, resultado)
 
-    interpretador = InterpretadorArvoreNormativa(modelo, contexto_final)
-    resultado = interpretador.executar(no_raiz)
+    recarregado = registrado.carregado_em >= cronometro.inicio
+    instrumentacao = {
+        "tempos_ms": None,
+        "origem_resultado": "calculo" if estatisticas_nos is not None else "cache",
+        "nos": estatisticas_nos,
+        "modelo_recarregado": recarregado,
+        "carga_modelo_ms": (
+            {fase: round(ms, 3) for fase, ms in registrado.tempos_carga_ms.items()}
+            if recarregado
+            else {}
+        ),
+    }
+
+    meta_execucao: Dict[str, Any] = {
+        "instrumentacao": instrumentacao,
+        "aritmetica": descricao_aritmetica,
+    }
 
     if persistir:
-        PersistidorExecucao().salvar_execucao(
+        from quase_sem_querer.motor.persistencia_execucao import PersistidorExecucao
+
+        persistidor = PersistidorExecucao()
+        id_execucao = persistidor.salvar_execucao(
             modelo_normativo=modelo,
             contexto=contexto_final,
-            resultado=resultado,
+            resultado=(
+                resultado.como_dict()
+                if isinstance(resultado, ResultadoCompacto)
+                else resultado
+            ),
             no_raiz=no_raiz,
+            hash_modelo_normativo=registrado.hash_modelo,
+            hash_contexto=hash_contexto,
+            instrumentacao={**instrumentacao, "tempos_ms": cronometro.ate_agora()},
+            aritmetica=descricao_aritmetica,
         )
+        if aguardar_persistencia:
+            persistidor.aguardar(id_execucao)
+        cronometro.marcar("persistir")
+        # identifica a execução para relatórios (ex.: cache da memória de cálculo)
+        meta_execucao["id_execucao"] = id_execucao
+
+    instrumentacao["tempos_ms"] = cronometro.ate_agora()
+
+    # resultados do cache são compartilhados: a instrumentação vai numa cópia rasa
+    if isinstance(resultado, ResultadoCompacto):
+        resultado.meta_execucao = meta_execucao
+    else:
+        resultado = {**resultado, "meta_execucao": meta_execucao}
 
     return resultado
@@ -12,12 +12,13 @@
 # ================================================================
 #
 import json
-import hashlib
 import uuid
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, Any
 
+from quase_sem_querer.motor.hash_merkle import hash_json
+
 
 FORMATO_CONTEXTO_VERSION = "1.0.0"
 
@@ -82,7 +83,7 @@ class PersistidorContexto:
             contexto[nome_bloco] = conteudo
 
         # hash do contexto completo
-        contexto["meta"]["hash_contexto"] = self._hash_json(contexto)
+        contexto["meta"]["hash_contexto"] = hash_json(contexto)
 
         caminho = self.diretorio / f"{id_contexto}.json"
 
@@ -117,12 +118,3 @@ class PersistidorContexto:
                             f"Entrada '{chave}' no bloco '{nome_bloco}' "
                             f"não contém o campo obrigatório '{campo}'."
                         )
-
-    # -----------------------------
-    # Utilidades
-    # -----------------------------
-
-    @staticmethod
-    def _hash_json(objeto: Dict) -> str:
-        serializado = json.dumps(objeto, sort_keys=True, ensure_ascii=False)
-        return hashlib.sha256(serializado.encode("utf-8")).hexdigest()
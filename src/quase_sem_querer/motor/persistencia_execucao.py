@@ -1,32 +1,52 @@
 # ================================================================
 # Persistidor de Execução
 # Projeto: Quase Sem Querer
+#
+# Monta o payload auditável da execução e o entrega a um
+# armazenamento de execuções (ver armazenamento_execucoes).
 # ================================================================
 
-import json
-import hashlib
 import uuid
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, Any
 
+from quase_sem_querer.motor.armazenamento_execucoes import (
+    ArmazemArquivosJSON,
+    ArmazemExecucoes,
+    armazem_padrao,
+)
+from quase_sem_querer.motor.hash_merkle import hash_contexto as _hash_contexto
+from quase_sem_querer.motor.hash_merkle import hash_modelo as _hash_modelo
+
 
 FORMATO_PERSISTENCIA_VERSION = "1.0.0"
 
 
 class PersistidorExecucao:
-    def __init__(self, diretorio_resultados: Path | None = None):
-        if diretorio_resultados is None:
-            diretorio_resultados = (
-                Path(__file__)
-                .resolve()
-                .parent.parent
-                / "resultados"
-                / "execucoes"
+    def __init__(
+        self,
+        diretorio_resultados: Path | None = None,
+        *,
+        armazem: ArmazemExecucoes | None = None,
+    ):
+        """
+        - armazem informado: grava nele
+        - diretorio_resultados informado: um JSON por execução (legado)
+        - nenhum dos dois: armazém SQLite padrão do processo
+        """
+        if armazem is not None and diretorio_resultados is not None:
+            raise ValueError(
+                "Informe no máximo um entre 'diretorio_resultados' ou 'armazem'."
             )
 
-        self.diretorio = diretorio_resultados
-        self.diretorio.mkdir(parents=True, exist_ok=True)
+        if armazem is None:
+            if diretorio_resultados is not None:
+                armazem = ArmazemArquivosJSON(diretorio_resultados)
+            else:
+                armazem = armazem_padrao()
+
+        self.armazem = armazem
 
     # ------------------------------------------------------------
     # API pública
@@ -38,8 +58,17 @@ class PersistidorExecucao:
         modelo_normativo: Dict,
         contexto: Dict,
         resultado: Dict[str, Any],
-        no_raiz: str
-    ) -> Path:
+        no_raiz: str,
+        hash_modelo_normativo: str | None = None,
+        hash_contexto: str | None = None,
+        instrumentacao: Dict[str, Any] | None = None,
+        aritmetica: Dict[str, Any] | None = None,
+    ) -> str:
+        """
+        Persiste a execução e retorna seu id_execucao. `instrumentacao`
+        (tempos por fase, contagens de nós) e `aritmetica` (modo numérico
+        da execução) vão em meta_execucao.
+        """
         timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S_%f")
         uid = uuid.uuid4().hex[:8]
         execucao_id = f"execucao_{timestamp}_{uid}"
@@ -50,24 +79,28 @@ class PersistidorExecucao:
                 "formato_persistencia_version": FORMATO_PERSISTENCIA_VERSION,
                 "data_execucao_utc": datetime.utcnow().isoformat() + "Z",
                 "no_raiz": no_raiz,
-                "hash_modelo_normativo": self._hash_json(modelo_normativo),
-                "hash_contexto": self._hash_json(contexto),
+                "hash_modelo_normativo": hash_modelo_normativo or _hash_modelo(modelo_normativo),
+                "hash_contexto": hash_contexto or _hash_contexto(contexto),
             },
             "resultado": resultado,
         }
+        if instrumentacao is not None:
+            payload["meta_execucao"]["instrumentacao"] = instrumentacao
+        if aritmetica is not None:
+            payload["meta_execucao"]["aritmetica"] = aritmetica
 
-        caminho = self.diretorio / f"{execucao_id}.json"
-
-        with caminho.open("w", encoding="utf-8") as f:
-            json.dump(payload, f, indent=2, ensure_ascii=False)
-
-        return caminho
-
-    # ------------------------------------------------------------
-    # Utilidades
-    # ------------------------------------------------------------
+        return self.armazem.registrar(
+            payload,
+            modelo_normativo=modelo_normativo,
+            contexto=contexto,
+        )
 
-    @staticmethod
-    def _hash_json(objeto: Dict) -> str:
-        serializado = json.dumps(objeto, sort_keys=True, ensure_ascii=False)
-        return hashlib.sha256(serializado.encode("utf-8")).hexdigest()
+    def aguardar(self, id_execucao: str, timeout: float | None = None) -> bool:
+        """
+        Aguarda a durabilidade de uma execução quando o armazém grava
+        em segundo plano; armazéns síncronos já retornam gravados.
+        """
+        aguardar = getattr(self.armazem, "aguardar", None)
+        if aguardar is None:
+            return True
+        return aguardar(id_execucao, timeout)
@@ -0,0 +1,250 @@
+# ================================================================
+# Análise de sensibilidade (derivadas em modo reverso)
+# Projeto: Quase Sem Querer
+#
+# Responsabilidade:
+# - Calcular ∂valor_final/∂folha para todas as folhas do Contexto em
+#   uma única varredura reversa do grafo avaliado (sem reexecutar)
+# - Atribuir a cada folha sua contribuição de primeira ordem
+#   (∂valor_final/∂folha × valor da folha)
+# - Entregar uma tabela ordenada pela contribuição absoluta
+#
+# Fonte única: resultado canônico (nos_avaliados). Derivadas locais
+# de soma, multiplicacao, subtracao, divisao, potencia e raiz; onde a
+# derivada não existe (ex.: potência de base negativa em relação ao
+# expoente), a folha fica com derivada None.
+#
+# Não altera o resultado. Não persiste.
+# ================================================================
+
+from __future__ import annotations
+
+import math
+from typing import Any, Dict, List, Sequence
+
+
+TIPOS_FOLHA = ("constante", "referencia")
+
+
+class ErroSensibilidade(Exception):
+    """Resultado sem os dados necessários para a análise."""
+    pass
+
+
+# ----------------------------------------------------------------
+# API pública
+# ----------------------------------------------------------------
+
+def analisar_sensibilidade(resultado: Any) -> List[Dict[str, Any]]:
+    """
+    Uma linha por folha alcançável a partir de `no_raiz`, em ordem
+    decrescente de |contribuicao|:
+
+    - no_id, tipo, valor
+    - derivada:     ∂valor_final/∂folha (None se não diferenciável)
+    - contribuicao: derivada × valor (R$)
+    - elasticidade: contribuicao / valor_final (variação relativa do
+                    total por variação relativa da folha)
+
+    Requer resultado em modo "completo" (ou "compacto").
+    """
+    if hasattr(resultado, "como_dict"):
+        resultado = resultado.como_dict()
+
+    nos = resultado.get("nos_avaliados") or resultado.get("trilha_calculo")
+    no_raiz = resultado.get("no_raiz")
+    if not isinstance(nos, dict) or no_raiz not in nos:
+        raise ErroSensibilidade(
+            "Análise de sensibilidade requer resultado com 'nos_avaliados' "
+            "(modo 'completo' ou 'compacto')."
+        )
+
+    ordem = _ordem_topologica(no_raiz, nos)
+    adjuntos = {no_id: 0.0 for no_id in ordem}
+    adjuntos[no_raiz] = 1.0
+
+    # dependentes antes das dependências: o adjunto de cada nó já está
+    # completo quando ele é visitado
+    for no_id in reversed(ordem):
+        no = nos[no_id]
+        deps = no.get("dependencias", [])
+        adjunto = adjuntos[no_id]
+        if not deps or adjunto == 0.0:
+            continue
+        valores = [nos[d]["valor_calculado"] for d in deps]
+        locais = derivadas_locais(no["tipo"], valores, no["valor_calculado"])
+        for dep, local in zip(deps, locais):
+            adjuntos[dep] += adjunto * local
+
+    valor_final = resultado.get("valor_final")
+    linhas = []
+    for no_id in ordem:
+        no = nos[no_id]
+        if no.get("tipo") not in TIPOS_FOLHA:
+            continue
+        valor = no.get("valor_calculado")
+        derivada = adjuntos[no_id]
+        if not math.isfinite(derivada):
+            derivada = None
+
+        contribuicao = derivada * valor if derivada is not None else None
+        linhas.append({
+            "no_id": no_id,
+            "tipo": no["tipo"],
+            "valor": valor,
+            "derivada": derivada,
+            "contribuicao": contribuicao,
+            "elasticidade": (
+                contribuicao / valor_final
+                if contribuicao is not None and valor_final
+                else None
+            ),
+        })
+
+    linhas.sort(
+        key=lambda linha: (
+            linha["contribuicao"] is None,
+            -abs(linha["contribuicao"] or 0.0),
+        )
+    )
+    return linhas
+
+
+# ----------------------------------------------------------------
+# Derivadas locais
+# ----------------------------------------------------------------
+
+def derivadas_locais(tipo: str, valores: Sequence[float], valor: float) -> List[float]:
+    """
+    ∂valor/∂valores[i] de uma operação, dados os operandos e o valor
+    já calculado. Derivadas inexistentes são NaN.
+    """
+    if tipo == "soma":
+        return [1.0] * len(valores)
+
+    if tipo == "subtracao":
+        return [1.0] + [-1.0] * (len(valores) - 1)
+
+    if tipo == "multiplicacao":
+        # produtos de prefixo e sufixo: correto também com fatores nulos
+        n = len(valores)
+        sufixos = [1.0] * (n + 1)
+        for i in range(n - 1, -1, -1):
+            sufixos[i] = sufixos[i + 1] * valores[i]
+        locais = []
+        prefixo = 1.0
+        for i in range(n):
+            locais.append(prefixo * sufixos[i + 1])
+            prefixo *= valores[i]
+        return locais
+
+    if tipo == "divisao":
+        # a / b / c ...: ∂/∂a = 1/(b·c·...), ∂/∂b = -valor/b
+        divisor = 1.0
+        for v in valores[1:]:
+            divisor *= v
+        return [1.0 / divisor] + [-valor / v for v in valores[1:]]
+
+    if tipo == "potencia":
+        base, expoente = valores
+        return [_derivada_potencia_base(base, expoente), _derivada_log(valor, base)]
+
+    if tipo == "raiz":
+        # rad ** (1 / indice)
+        radicando, indice = valores
+        expoente = 1.0 / indice
+        return [
+            _derivada_potencia_base(radicando, expoente),
+            _derivada_log(valor, radicando) * (-expoente * expoente),
+        ]
+
+    raise ErroSensibilidade(f"Tipo de nó sem derivada definida: '{tipo}'.")
+
+
+def _derivada_potencia_base(base: float, expoente: float) -> float:
+    # d(b^e)/db = e·b^(e-1)
+    if expoente == 0:
+        return 0.0
+    if base == 0 and expoente < 1:
+        return math.nan
+    return expoente * base ** (expoente - 1)
+
+
+def _derivada_log(valor: float, base: float) -> float:
+    # d(b^e)/de = b^e·ln(b)
+    if base > 0:
+        return valor * math.log(base)
+    if base == 0:
+        return 0.0
+    return math.nan
+
+
+# ----------------------------------------------------------------
+# Utilidades
+# ----------------------------------------------------------------
+
+def _ordem_topologica(no_raiz: str, nos: Dict[str, Dict[str, Any]]) -> List[str]:
+    """Nós alcançáveis a partir da raiz, dependências antes dos dependentes."""
+    ordem: List[str] = []
+    visitados = {no_raiz}
+    pilha = [(no_raiz, iter(nos[no_raiz].get("dependencias", [])))]
+    while pilha:
+        no_id, deps = pilha[-1]
+        for dep in deps:
+            if dep not in visitados:
+                if dep not in nos:
+                    raise ErroSensibilidade(f"Dependência '{dep}' ausente do resultado.")
+                visitados.add(dep)
+                pilha.append((dep, iter(nos[dep].get("dependencias", []))))
+                break
+        else:
+            pilha.pop()
+            ordem.append(no_id)
+    return ordem
+
+
+# ----------------------------------------------------------------
+# Testes mínimos (sanity checks)
+# ----------------------------------------------------------------
+
+
+def _test_sensibilidade_diferencas_finitas():
+    """Compara as derivadas com diferenças finitas centrais."""
+    from quase_sem_querer.motor.interpretador import InterpretadorArvoreNormativa
+
+    modelo = {
+        "raiz": "total",
+        "nos": [
+            {"id": "a", "tipo": "referencia", "dependencias": []},
+            {"id": "b", "tipo": "referencia", "dependencias": []},
+            {"id": "c", "tipo": "constante", "dependencias": []},
+            {"id": "percentual_x", "tipo": "referencia", "dependencias": []},
+            {"id": "s", "tipo": "soma", "dependencias": ["a", "b"]},
+            {"id": "m", "tipo": "multiplicacao", "dependencias": ["s", "percentual_x", "a"]},
+            {"id": "d", "tipo": "divisao", "dependencias": ["m", "c", "b"]},
+            {"id": "p", "tipo": "potencia", "dependencias": ["s", "percentual_x"]},
+            {"id": "r", "tipo": "raiz", "dependencias": ["s", "c"]},
+            {"id": "total", "tipo": "subtracao", "dependencias": ["d", "p", "r", "a"]},
+        ],
+    }
+    contexto = {
+        "a": {"valor": 3.0},
+        "b": {"valor": 5.0},
+        "c": {"valor": 2.0},
+        "percentual_x": {"valor": 0.2},
+    }
+
+    def avaliar(ctx):
+        return InterpretadorArvoreNormativa(modelo, ctx).executar("total")
+
+    linhas = {linha["no_id"]: linha for linha in analisar_sensibilidade(avaliar(contexto))}
+    assert set(linhas) == set(contexto)
+
+    passo = 1e-6
+    for folha, item in contexto.items():
+        if folha == "c":
+            continue  # índice da raiz precisa ser inteiro
+        acima = {**contexto, folha: {"valor": item["valor"] + passo}}
+        abaixo = {**contexto, folha: {"valor": item["valor"] - passo}}
+        numerica = (avaliar(acima)["valor_final"] - avaliar(abaixo)["valor_final"]) / (2 * passo)
+        assert abs(linhas[folha]["derivada"] - numerica) < 1e-5, (folha, linhas[folha], numerica)
@@ -0,0 +1,184 @@
+# ================================================================
+# Varredura de Cenários Legais
+# Projeto: Quase Sem Querer
+#
+# Responsabilidade:
+# - Expandir o produto cartesiano das opções legais (entradas de
+#   contexto cujo "valor" é uma lista)
+# - Avaliar todas as combinações em lote (interpretador vetorial)
+# - Entregar, de forma incremental, uma tabela
+#   combinação → valor_final (+ subtotais escolhidos)
+#
+# Não escolhe cenário: apenas expõe o envelope de preços admissível.
+# Não persiste resultados.
+# ================================================================
+
+from __future__ import annotations
+
+import itertools
+from typing import Any, Dict, Iterator, List, Sequence, Tuple
+
+from quase_sem_querer.motor.interpretador import compilar_plano
+from quase_sem_querer.motor.interpretador_vetorial import executar_lote
+from quase_sem_querer.motor.verificador import VerificadorEstatico
+
+
+TAMANHO_BLOCO_PADRAO = 10_000
+
+# colunas fixas da tabela de cenários (não podem ser opções legais)
+COLUNAS_FIXAS = ("cenario", "valor_final", "erro")
+
+
+class ErroVarredura(Exception):
+    """Erro bloqueante na definição de uma varredura de cenários."""
+    pass
+
+
+# ----------------------------------------------------------------
+# Opções legais
+# ----------------------------------------------------------------
+
+def opcoes_legais(contexto: Dict[str, Any]) -> Dict[str, List[Any]]:
+    """
+    Retorna as entradas do contexto (já achatado) cujo "valor" é uma
+    lista de opções, preservando a ordem do contexto.
+    """
+    opcoes = {}
+    for chave, item in contexto.items():
+        if isinstance(item, dict) and isinstance(item.get("valor"), list):
+            opcoes[chave] = list(item["valor"])
+    return opcoes
+
+
+def contar_cenarios(contexto: Dict[str, Any], chaves: Sequence[str] | None = None) -> int:
+    total = 1
+    for valores in _selecionar_opcoes(contexto, chaves).values():
+        total *= len(valores)
+    return total
+
+
+def expandir_cenarios(
+    contexto: Dict[str, Any],
+    chaves: Sequence[str] | None = None,
+) -> Iterator[Tuple[Dict[str, Any], Dict[str, Any]]]:
+    """
+    Gera pares (combinação, contexto) para o produto cartesiano das
+    opções legais selecionadas.
+
+    Entradas com lista fora de `chaves` permanecem como estão (e
+    resultarão em erro de avaliação se alcançadas pelo modelo).
+    """
+    opcoes = _selecionar_opcoes(contexto, chaves)
+    nomes = list(opcoes)
+
+    for valores in itertools.product(*opcoes.values()):
+        combinacao = dict(zip(nomes, valores))
+        cenario = dict(contexto)
+        for chave, valor in combinacao.items():
+            cenario[chave] = {**contexto[chave], "valor": valor}
+        yield combinacao, cenario
+
+
+# ----------------------------------------------------------------
+# API pública
+# ----------------------------------------------------------------
+
+def executar_varredura(
+    modelo: Dict[str, Any],
+    contexto: Dict[str, Any],
+    *,
+    chaves: Sequence[str] | None = None,
+    subtotais: Sequence[str] = (),
+    no_raiz: str | None = None,
+    tamanho_bloco: int = TAMANHO_BLOCO_PADRAO,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Avalia `modelo` (já achatado) em todas as combinações das opções
+    legais de `contexto` (já achatado) e produz uma linha por cenário:
+
+        {"cenario": 0, "percentual_rat": 0.01, ..., "valor_final": ...,
+         "<subtotal>": ..., "erro": None}
+
+    As combinações são avaliadas em blocos de `tamanho_bloco`, de modo
+    que a tabela pode ser consumida à medida que é produzida.
+    """
+
+    if tamanho_bloco < 1:
+        raise ErroVarredura("'tamanho_bloco' deve ser positivo.")
+
+    no_raiz = no_raiz or modelo.get("raiz")
+    if not no_raiz:
+        raise ErroVarredura("Informe 'no_raiz' ou declare 'raiz' no modelo.")
+
+    VerificadorEstatico.validar_modelo(modelo)
+    plano = compilar_plano({no["id"]: no for no in modelo["nos"]}, no_raiz)
+
+    for subtotal in subtotais:
+        if subtotal not in plano.slots:
+            raise ErroVarredura(
+                f"Subtotal '{subtotal}' não é alcançável a partir do nó raiz '{no_raiz}'."
+            )
+
+    # cada opção vira uma coluna da linha: não pode sobrescrever as demais
+    reservadas = set(COLUNAS_FIXAS) | set(subtotais)
+    conflitantes = [c for c in _selecionar_opcoes(contexto, chaves) if c in reservadas]
+    if conflitantes:
+        raise ErroVarredura(
+            f"Opções legais com nome de coluna da tabela (cenario, valor_final, "
+            f"erro ou subtotal): {conflitantes}"
+        )
+
+    cenarios = expandir_cenarios(contexto, chaves)
+    indice = 0
+
+    while True:
+        bloco = list(itertools.islice(cenarios, tamanho_bloco))
+        if not bloco:
+            return
+
+        lote = executar_lote(
+            modelo,
+            [cenario for _, cenario in bloco],
+            no_raiz=no_raiz,
+            plano=plano,
+        )
+        valor_final = lote.valor_final.tolist()
+        colunas = {subtotal: lote[subtotal].tolist() for subtotal in subtotais}
+
+        for linha, (combinacao, _) in enumerate(bloco):
+            erro = lote.erros.get(linha)
+            registro: Dict[str, Any] = {"cenario": indice}
+            registro.update(combinacao)
+            registro["valor_final"] = None if erro else valor_final[linha]
+            for subtotal, coluna in colunas.items():
+                registro[subtotal] = None if erro else coluna[linha]
+            registro["erro"] = erro
+            indice += 1
+            yield registro
+
+
+# ----------------------------------------------------------------
+# Implementações internas
+# ----------------------------------------------------------------
+
+def _selecionar_opcoes(
+    contexto: Dict[str, Any],
+    chaves: Sequence[str] | None,
+) -> Dict[str, List[Any]]:
+    opcoes = opcoes_legais(contexto)
+
+    if chaves is None:
+        selecionadas = opcoes
+    else:
+        ausentes = [c for c in chaves if c not in opcoes]
+        if ausentes:
+            raise ErroVarredura(
+                f"Chaves sem lista de opções legais no contexto: {ausentes}"
+            )
+        selecionadas = {c: opcoes[c] for c in chaves}
+
+    for chave, valores in selecionadas.items():
+        if not valores:
+            raise ErroVarredura(f"Opção legal '{chave}' possui lista vazia.")
+
+    return selecionadas
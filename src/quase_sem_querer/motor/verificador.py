@@ -11,6 +11,7 @@
 # Nenhum valor é avaliado.
 # ================================================================
 
+from collections import deque
 from typing import Dict, List, Set
 
 TIPOS_VALIDOS = {
@@ -36,9 +37,16 @@ class VerificadorEstatico:
     def __init__(self, modelo: Dict):
         self.modelo = modelo
         self.erros: List[str] = []
+        self.avisos: List[str] = []
         self.nos = self._indexar_nos()
         self.grafo = self._construir_grafo_dependencias()
 
+        # produtos da análise do grafo (disponíveis após verificar())
+        self.ordem_topologica: List[str] = []
+        self.profundidade: Dict[str, int] = {}
+        self.ciclos: List[List[str]] = []
+        self.alcancaveis: Set[str] = set()
+
         # -----------------------------
         # Indexação e estrutura básica
         # -----------------------------
@@ -81,7 +89,7 @@ class VerificadorEstatico:
         self._verificar_tipos()
         self._verificar_referencias_existentes()
         self._verificar_aridade_operacoes()
-        self._verificar_ciclos()
+        self._analisar_grafo()
         self._verificar_alcancabilidade()
 
         if self.erros:
@@ -130,56 +138,167 @@ class VerificadorEstatico:
                     f"Nó '{no_id}' do tipo '{tipo}' não deve possuir dependências."
                 )
 
-    def _verificar_ciclos(self):
-        visitados: Set[str] = set()
-        pilha: Set[str] = set()
-
-        def dfs(no_id: str):
-            if no_id in pilha:
+    def _analisar_grafo(self):
+        """
+        Passagem iterativa única (algoritmo de Kahn) sobre o grafo de
+        dependências: produz ordem topológica e profundidade de cada nó
+        e isola os nós envolvidos em ciclos. Linear no tamanho do grafo.
+        """
+        pendentes: Dict[str, int] = {}
+        dependentes: Dict[str, List[str]] = {no_id: [] for no_id in self.nos}
+
+        for no_id, deps in self.grafo.items():
+            unicas = {dep for dep in deps if dep in self.nos}
+            pendentes[no_id] = len(unicas)
+            for dep in unicas:
+                dependentes[dep].append(no_id)
+
+        fila = deque(no_id for no_id, n in pendentes.items() if n == 0)
+
+        while fila:
+            no_id = fila.popleft()
+            self.ordem_topologica.append(no_id)
+            self.profundidade[no_id] = 1 + max(
+                (self.profundidade[dep] for dep in self.grafo[no_id] if dep in self.nos),
+                default=-1,
+            )
+            for dependente in dependentes[no_id]:
+                pendentes[dependente] -= 1
+                if pendentes[dependente] == 0:
+                    fila.append(dependente)
+
+        if len(self.ordem_topologica) < len(self.nos):
+            restantes = {no_id for no_id, n in pendentes.items() if n > 0}
+            for ciclo in self._extrair_ciclos(restantes):
+                self.ciclos.append(ciclo)
                 self.erros.append(
-                    f"Ciclo detectado envolvendo o nó '{no_id}'."
+                    f"Ciclo detectado: {' -> '.join(ciclo)}"
                 )
-                return
-            if no_id in visitados:
-                return
 
-            pilha.add(no_id)
-            for dep in self.grafo.get(no_id, []):
-                dfs(dep)
-            pilha.remove(no_id)
-            visitados.add(no_id)
+    def _extrair_ciclos(self, restantes: Set[str]) -> List[List[str]]:
+        """
+        Um caminho de ciclo por componente fortemente conexa cíclica
+        (Tarjan iterativo, restrito aos nós que sobraram do Kahn).
+        """
+        indice: Dict[str, int] = {}
+        menor: Dict[str, int] = {}
+        na_pilha: Set[str] = set()
+        pilha: List[str] = []
+        componentes: List[List[str]] = []
+        contador = 0
+
+        def sucessores(no_id: str) -> List[str]:
+            return [dep for dep in self.grafo[no_id] if dep in restantes]
+
+        for inicio in self.nos:
+            if inicio not in restantes or inicio in indice:
+                continue
 
-        for no_id in self.nos:
-            dfs(no_id)
+            trabalho = [(inicio, iter(sucessores(inicio)))]
+            indice[inicio] = menor[inicio] = contador
+            contador += 1
+            pilha.append(inicio)
+            na_pilha.add(inicio)
+
+            while trabalho:
+                no_id, filhos = trabalho[-1]
+                avancou = False
+                for filho in filhos:
+                    if filho not in indice:
+                        indice[filho] = menor[filho] = contador
+                        contador += 1
+                        pilha.append(filho)
+                        na_pilha.add(filho)
+                        trabalho.append((filho, iter(sucessores(filho))))
+                        avancou = True
+                        break
+                    if filho in na_pilha:
+                        menor[no_id] = min(menor[no_id], indice[filho])
+                if avancou:
+                    continue
+
+                trabalho.pop()
+                if trabalho:
+                    pai = trabalho[-1][0]
+                    menor[pai] = min(menor[pai], menor[no_id])
+
+                if menor[no_id] == indice[no_id]:
+                    componente = []
+                    while True:
+                        membro = pilha.pop()
+                        na_pilha.discard(membro)
+                        componente.append(membro)
+                        if membro == no_id:
+                            break
+                    componentes.append(componente)
+
+        ciclos = []
+        for componente in componentes:
+            membros = set(componente)
+            if len(componente) == 1 and componente[0] not in self.grafo[componente[0]]:
+                continue
 
-    def _verificar_alcancabilidade(self):
-        referenciados = set()
-        for deps in self.grafo.values():
-            referenciados.update(deps)
+            # todo membro possui dependência dentro da componente: caminhar até repetir
+            caminho: List[str] = []
+            posicao: Dict[str, int] = {}
+            atual = min(componente, key=lambda n: indice[n])
+            while atual not in posicao:
+                posicao[atual] = len(caminho)
+                caminho.append(atual)
+                atual = next(dep for dep in self.grafo[atual] if dep in membros)
+            ciclos.append(caminho[posicao[atual]:] + [atual])
 
-        nos_raiz = set(self.nos.keys()) - referenciados
-        if not nos_raiz:
-            self.erros.append(
-                "Nenhum nó raiz identificado (ausência de ponto de consolidação)."
-            )
-            return
+        return ciclos
 
-        alcançados = set()
+    def _verificar_alcancabilidade(self):
+        raiz = self.modelo.get("raiz")
 
-        def marcar(no_id: str):
-            if no_id in alcançados:
+        if raiz:
+            if raiz not in self.nos:
+                self.erros.append(
+                    f"Nó raiz declarado '{raiz}' não existe no modelo."
+                )
+                return
+            nos_raiz = [raiz]
+        else:
+            # modelos sem raiz declarada: todo nó não referenciado é raiz
+            referenciados = set()
+            for deps in self.grafo.values():
+                referenciados.update(deps)
+            nos_raiz = [no_id for no_id in self.nos if no_id not in referenciados]
+
+            if not nos_raiz:
+                self.erros.append(
+                    "Nenhum nó raiz identificado (ausência de ponto de consolidação)."
+                )
                 return
-            alcançados.add(no_id)
+
+        alcançados = set(nos_raiz)
+        pendentes = list(nos_raiz)
+        while pendentes:
+            no_id = pendentes.pop()
             for dep in self.grafo.get(no_id, []):
-                marcar(dep)
+                if dep in self.nos and dep not in alcançados:
+                    alcançados.add(dep)
+                    pendentes.append(dep)
 
-        for raiz in nos_raiz:
-            marcar(raiz)
+        self.alcancaveis = alcançados
 
         nos_orfaos = set(self.nos.keys()) - alcançados
-        if nos_orfaos:
+        folhas_orfas = {
+            no_id for no_id in nos_orfaos
+            if self.nos[no_id].get("tipo") in ("constante", "referencia")
+        }
+        operacoes_orfas = nos_orfaos - folhas_orfas
+
+        if operacoes_orfas:
             self.erros.append(
-                f"Nós inalcançáveis (órfãos): {sorted(nos_orfaos)}"
+                f"Nós inalcançáveis (órfãos): {sorted(operacoes_orfas)}"
+            )
+        if folhas_orfas:
+            # folhas não utilizadas não alteram o cálculo: apenas aviso
+            self.avisos.append(
+                f"Folhas não utilizadas a partir da raiz: {sorted(folhas_orfas)}"
             )
 
     # -----------------------------
@@ -191,3 +310,13 @@ class VerificadorEstatico:
         verificador = VerificadorEstatico(modelo)
         verificador.verificar()
         return True
+
+    @staticmethod
+    def analisar_modelo(modelo: Dict) -> "VerificadorEstatico":
+        """
+        Valida o modelo e devolve o verificador com a análise do grafo
+        (ordem_topologica, profundidade, alcancaveis, avisos).
+        """
+        verificador = VerificadorEstatico(modelo)
+        verificador.verificar()
+        return verificador
@@ -0,0 +1,343 @@
+# ================================================================
+# Exportação colunar do histórico de execuções
+# Projeto: Quase Sem Querer
+#
+# Converte as execuções persistidas em tabelas para análise
+# (pandas, Parquet ou CSV):
+#
+# - execucoes: uma linha por execução — id, data, nó raiz, hashes,
+#              aritmética, valor final, tempo total e uma coluna
+#              "no.<id>" com o valor_calculado de cada nó da trilha
+# - nos:       uma linha por (execução, nó) — formato longo
+#
+# Cada exportação acrescenta partes (parte_000001.parquet, ...) com as
+# execuções gravadas depois da última exportada; o ponto de retomada
+# (posição de gravação no SQLite, não a data da execução, que pode
+# ser gravada fora de ordem) fica em estado_exportacao.json no
+# diretório de destino. As execuções são lidas e gravadas em blocos:
+# a memória usada não cresce com o histórico.
+#
+# Não calcula, não altera o armazenamento.
+# ================================================================
+
+from __future__ import annotations
+
+import importlib.util
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+import pandas as pd
+
+from quase_sem_querer.motor.armazenamento_execucoes import (
+    ArmazemArquivosJSON,
+    ArmazemExecucoes,
+    ArmazemSQLite,
+)
+
+
+TABELA_EXECUCOES = "execucoes"
+TABELA_NOS = "nos"
+TABELAS = (TABELA_EXECUCOES, TABELA_NOS)
+
+FORMATOS_EXPORTACAO = ("parquet", "csv")
+
+TAMANHO_BLOCO_PADRAO = 1000
+
+ARQUIVO_ESTADO = "estado_exportacao.json"
+
+# colunas de nós na tabela larga: evita colisão com as de metadados
+PREFIXO_NO = "no."
+
+COLUNAS_EXECUCAO = (
+    "id_execucao",
+    "data_execucao_utc",
+    "no_raiz",
+    "hash_modelo_normativo",
+    "hash_contexto",
+    "aritmetica",
+    "valor_final",
+    "tempo_total_ms",
+)
+
+COLUNAS_NO = (
+    "id_execucao",
+    "data_execucao_utc",
+    "no_raiz",
+    "hash_modelo_normativo",
+    "no_id",
+    "tipo",
+    "valor_calculado",
+)
+
+
+class ErroExportacao(Exception):
+    """Erro ao exportar o histórico de execuções."""
+    pass
+
+
+# ----------------------------------------------------------------
+# API pública
+# ----------------------------------------------------------------
+
+def exportar_historico(
+    destino: Path | str,
+    *,
+    armazem: ArmazemExecucoes | None = None,
+    formato: str = "parquet",
+    tamanho_bloco: int = TAMANHO_BLOCO_PADRAO,
+) -> Dict[str, int]:
+    """
+    Exporta para `destino` as execuções ainda não exportadas.
+
+    - armazem: ArmazemSQLite ou ArmazemArquivosJSON (padrão: banco
+               SQLite padrão do projeto)
+    - formato: "parquet" (requer pyarrow ou fastparquet) ou "csv";
+               deve ser o mesmo das exportações anteriores no destino
+
+    Retorna {"execucoes": ..., "nos": ..., "partes": ...} desta chamada.
+    """
+    if formato not in FORMATOS_EXPORTACAO:
+        raise ValueError(
+            f"Formato de exportação inválido: '{formato}'. "
+            f"Use um entre {FORMATOS_EXPORTACAO}."
+        )
+    if tamanho_bloco < 1:
+        raise ValueError("'tamanho_bloco' deve ser positivo.")
+    if formato == "parquet" and not _motor_parquet_disponivel():
+        raise ErroExportacao(
+            "Exportação em Parquet requer 'pyarrow' ou 'fastparquet'. "
+            "Instale um deles ou use formato='csv'."
+        )
+
+    destino = Path(destino)
+    estado = _ler_estado(destino)
+    if estado["formato"] is None:
+        estado["formato"] = formato
+    elif estado["formato"] != formato:
+        raise ErroExportacao(
+            f"O destino {destino} já contém exportação em '{estado['formato']}'."
+        )
+
+    fechar = armazem is None
+    armazem = armazem if armazem is not None else ArmazemSQLite()
+    if not isinstance(armazem, (ArmazemSQLite, ArmazemArquivosJSON)):
+        raise ValueError(
+            "Exportação requer um ArmazemSQLite ou ArmazemArquivosJSON."
+        )
+
+    totais = {"execucoes": 0, "nos": 0, "partes": 0}
+    try:
+        for bloco in _em_blocos(_pendentes(armazem, estado), tamanho_bloco):
+            execucoes, nos = _tabelas([payload for _, payload in bloco])
+            parte = estado["partes"] + 1
+
+            _gravar_parte(execucoes, destino / TABELA_EXECUCOES, parte, formato)
+            _gravar_parte(nos, destino / TABELA_NOS, parte, formato)
+
+            # o estado só avança depois das duas partes gravadas: uma
+            # exportação interrompida regrava a mesma parte na próxima vez
+            posicao, ultimo = bloco[-1]
+            estado["partes"] = parte
+            estado["ultima_posicao"] = posicao
+            estado["ultimo_id"] = ultimo["meta_execucao"]["id_execucao"]
+            estado["execucoes"] += len(execucoes)
+            _gravar_estado(destino, estado)
+
+            totais["execucoes"] += len(execucoes)
+            totais["nos"] += len(nos)
+            totais["partes"] += 1
+    finally:
+        if fechar:
+            armazem.fechar()
+
+    return totais
+
+
+def ler_historico(destino: Path | str, tabela: str = TABELA_EXECUCOES) -> pd.DataFrame:
+    """
+    Tabela exportada (todas as partes). Partes com conjuntos de nós
+    diferentes (outros modelos ou raízes) são unidas; colunas ausentes
+    ficam vazias.
+    """
+    if tabela not in TABELAS:
+        raise ValueError(f"Tabela inválida: '{tabela}'. Use uma entre {TABELAS}.")
+
+    destino = Path(destino)
+    formato = _ler_estado(destino)["formato"]
+    if formato is None:
+        raise ErroExportacao(f"Nenhuma exportação encontrada em {destino}.")
+
+    partes = sorted((destino / tabela).glob(f"parte_*.{formato}"))
+    if not partes:
+        return pd.DataFrame(columns=COLUNAS_EXECUCAO if tabela == TABELA_EXECUCOES else COLUNAS_NO)
+
+    if formato == "parquet":
+        quadros = [pd.read_parquet(caminho) for caminho in partes]
+    else:
+        quadros = [
+            pd.read_csv(caminho, parse_dates=["data_execucao_utc"])
+            for caminho in partes
+        ]
+    return pd.concat(quadros, ignore_index=True)
+
+
+def _pendentes(
+    armazem: ArmazemSQLite | ArmazemArquivosJSON,
+    estado: Dict[str, Any],
+) -> Iterator[Tuple[int | None, Dict[str, Any]]]:
+    """(posição de gravação, payload) das execuções ainda não exportadas."""
+    if isinstance(armazem, ArmazemArquivosJSON):
+        # um arquivo por execução, sem ordem de gravação: retoma pelo id
+        for payload in armazem.iterar_payloads(apos_id=estado["ultimo_id"]):
+            yield None, payload
+        return
+
+    posicao = estado.get("ultima_posicao")
+    if posicao is None:
+        # estado de exportações anteriores à posição: retomar pelo último id
+        ultimo_id = estado.get("ultimo_id")
+        posicao = (armazem.posicao(ultimo_id) if ultimo_id else None) or 0
+    yield from armazem.iterar_gravadas(apos_posicao=posicao)
+
+
+# ----------------------------------------------------------------
+# Montagem das tabelas
+# ----------------------------------------------------------------
+
+def _tabelas(payloads: List[Dict[str, Any]]) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    linhas_execucoes: List[Dict[str, Any]] = []
+    linhas_nos: List[Dict[str, Any]] = []
+    for payload in payloads:
+        execucao, nos = _linhas_execucao(payload)
+        linhas_execucoes.append(execucao)
+        linhas_nos.extend(nos)
+
+    execucoes = pd.DataFrame(linhas_execucoes)
+    nos = pd.DataFrame(linhas_nos, columns=list(COLUNAS_NO))
+
+    for quadro in (execucoes, nos):
+        quadro["data_execucao_utc"] = pd.to_datetime(quadro["data_execucao_utc"], utc=True)
+
+    colunas_valores = [c for c in execucoes.columns if c.startswith(PREFIXO_NO)]
+    colunas_valores += ["valor_final", "tempo_total_ms"]
+    execucoes[colunas_valores] = execucoes[colunas_valores].astype("float64")
+    nos["valor_calculado"] = nos["valor_calculado"].astype("float64")
+
+    return execucoes, nos
+
+
+def _linhas_execucao(payload: Dict[str, Any]) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """(linha da tabela larga, linhas da tabela longa) de um payload."""
+    meta = payload.get("meta_execucao") or {}
+    resultado = payload.get("resultado") or {}
+    tempos = (meta.get("instrumentacao") or {}).get("tempos_ms") or {}
+
+    execucao: Dict[str, Any] = {
+        "id_execucao": meta.get("id_execucao"),
+        "data_execucao_utc": meta.get("data_execucao_utc"),
+        "no_raiz": meta.get("no_raiz") or resultado.get("no_raiz"),
+        "hash_modelo_normativo": meta.get("hash_modelo_normativo"),
+        "hash_contexto": meta.get("hash_contexto"),
+        # execuções anteriores ao registro da aritmética foram em float
+        "aritmetica": (meta.get("aritmetica") or {}).get("modo", "float"),
+        "valor_final": _numero(resultado.get("valor_final")),
+        "tempo_total_ms": tempos.get("total"),
+    }
+
+    nos = []
+    for no_id, entrada in _entradas_trilha(resultado):
+        valor = _numero(entrada.get("valor_calculado"))
+        execucao[PREFIXO_NO + no_id] = valor
+        nos.append({
+            "id_execucao": execucao["id_execucao"],
+            "data_execucao_utc": execucao["data_execucao_utc"],
+            "no_raiz": execucao["no_raiz"],
+            "hash_modelo_normativo": execucao["hash_modelo_normativo"],
+            "no_id": no_id,
+            "tipo": entrada.get("tipo"),
+            "valor_calculado": valor,
+        })
+
+    return execucao, nos
+
+
+def _entradas_trilha(resultado: Dict[str, Any]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    trilha = resultado.get("trilha_calculo") or {}
+    if isinstance(trilha, dict):
+        yield from trilha.items()
+        return
+    # trilha como lista de ids: dados em nos_avaliados
+    nos = resultado.get("nos_avaliados") or {}
+    for no_id in trilha:
+        entrada = nos.get(no_id)
+        if isinstance(entrada, dict):
+            yield no_id, entrada
+
+
+def _numero(valor: Any) -> float | None:
+    if isinstance(valor, (int, float)):
+        return float(valor)
+    return None
+
+
+# ----------------------------------------------------------------
+# Gravação e estado
+# ----------------------------------------------------------------
+
+def _gravar_parte(quadro: pd.DataFrame, diretorio: Path, parte: int, formato: str) -> None:
+    diretorio.mkdir(parents=True, exist_ok=True)
+    caminho = diretorio / f"parte_{parte:06d}.{formato}"
+
+    descritor, temporario = tempfile.mkstemp(dir=diretorio, prefix=f".{caminho.name}.", suffix=".tmp")
+    os.close(descritor)
+    try:
+        if formato == "parquet":
+            quadro.to_parquet(temporario, index=False)
+        else:
+            quadro.to_csv(temporario, index=False, date_format="%Y-%m-%dT%H:%M:%S.%fZ")
+        os.replace(temporario, caminho)
+    except BaseException:
+        Path(temporario).unlink(missing_ok=True)
+        raise
+
+
+def _ler_estado(destino: Path) -> Dict[str, Any]:
+    caminho = destino / ARQUIVO_ESTADO
+    if not caminho.exists():
+        return {
+            "formato": None,
+            "partes": 0,
+            "execucoes": 0,
+            "ultima_posicao": None,
+            "ultimo_id": None,
+        }
+    with caminho.open("r", encoding="utf-8") as f:
+        estado = json.load(f)
+    # retomada por data (versões anteriores): substituída pela posição
+    estado.pop("ultima_data_utc", None)
+    return estado
+
+
+def _gravar_estado(destino: Path, estado: Dict[str, Any]) -> None:
+    caminho = destino / ARQUIVO_ESTADO
+    temporario = caminho.with_name(f".{ARQUIVO_ESTADO}.tmp")
+    temporario.write_text(json.dumps(estado, indent=2, ensure_ascii=False), encoding="utf-8")
+    os.replace(temporario, caminho)
+
+
+def _motor_parquet_disponivel() -> bool:
+    return any(importlib.util.find_spec(nome) is not None for nome in ("pyarrow", "fastparquet"))
+
+
+def _em_blocos(itens: Iterable[Any], tamanho: int) -> Iterator[List[Any]]:
+    bloco = []
+    for item in itens:
+        bloco.append(item)
+        if len(bloco) == tamanho:
+            yield bloco
+            bloco = []
+    if bloco:
+        yield bloco
@@ -10,12 +10,25 @@
 # - Nenhuma leitura de modelo ou contexto
 # - Fonte única da verdade: resultado canônico
 # - Ordem inferida automaticamente pela árvore (topológica)
+#
+# A geração é incremental: as linhas são escritas em fluxos de texto
+# (ou produzidas em blocos) à medida que a trilha é percorrida, e um
+# único percurso atende a vários formatos. Memórias de execuções
+# persistidas ficam em cache pelo id da execução.
 # ================================================================
 
 from __future__ import annotations
 
+import io
+import threading
+from collections import OrderedDict
 from datetime import datetime
-from typing import Dict, Any, List
+from typing import Dict, Any, Iterable, Iterator, List, TextIO, Tuple
+
+
+FORMATOS = ("md", "txt")
+
+CAPACIDADE_CACHE = 32
 
 
 def _titulo(formato: str, texto: str) -> str:
@@ -44,32 +57,159 @@ def _fmt_valor_contextual(no_id: str, v: float) -> str:
     return _fmt_valor(v)
 
 
+# ----------------------------------------------------------------
+# API pública
+# ----------------------------------------------------------------
+
 def render_memoria_calculo(
     resultado: Dict[str, Any],
     *,
     formato: str = "md",
     numeracao_hierarquica: bool = False,
+    sensibilidade: List[Dict[str, Any]] | None = None,
 ) -> str:
-    if formato not in {"md", "txt"}:
+    return render_memorias_calculo(
+        resultado,
+        formatos=(formato,),
+        numeracao_hierarquica=numeracao_hierarquica,
+        sensibilidade=sensibilidade,
+    )[formato]
+
+
+def render_memorias_calculo(
+    resultado: Dict[str, Any],
+    *,
+    formatos: Iterable[str] = FORMATOS,
+    numeracao_hierarquica: bool = False,
+    sensibilidade: List[Dict[str, Any]] | None = None,
+) -> Dict[str, str]:
+    """
+    Memória de cálculo em vários formatos, com um único percurso da
+    trilha. Resultados com `meta_execucao.id_execucao` (execuções
+    persistidas) são servidos do cache na próxima solicitação.
+
+    `sensibilidade` (tabela de analisar_sensibilidade) acrescenta a
+    seção "Sensibilidade do resultado".
+    """
+    formatos = tuple(formatos)
+    id_execucao = (resultado.get("meta_execucao") or {}).get("id_execucao")
+
+    chave = None
+    if id_execucao is not None:
+        chave = (id_execucao, formatos, numeracao_hierarquica, _assinatura_sensibilidade(sensibilidade))
+        em_cache = _CACHE.obter(chave)
+        if em_cache is not None:
+            return em_cache
+
+    destinos = {formato: io.StringIO() for formato in formatos}
+    escrever_memoria_calculo(
+        resultado,
+        destinos,
+        numeracao_hierarquica=numeracao_hierarquica,
+        sensibilidade=sensibilidade,
+    )
+    memorias = {formato: destino.getvalue() for formato, destino in destinos.items()}
+
+    if chave is not None:
+        _CACHE.guardar(chave, memorias)
+    return memorias
+
+
+def escrever_memoria_calculo(
+    resultado: Dict[str, Any],
+    destinos: Dict[str, TextIO],
+    *,
+    numeracao_hierarquica: bool = False,
+    sensibilidade: List[Dict[str, Any]] | None = None,
+) -> None:
+    """
+    Escreve a memória de cálculo em cada fluxo de `destinos`
+    ({formato: fluxo}), em um único percurso da trilha. A memória
+    usada não cresce com o texto gerado.
+    """
+    for formato in destinos:
+        if formato not in FORMATOS:
+            raise ValueError("Formato inválido. Use 'md' ou 'txt'.")
+
+    formatos = tuple(destinos)
+    primeira = True
+    for linhas in _linhas(resultado, formatos, numeracao_hierarquica, sensibilidade):
+        # mesmo texto de "\n".join(...): separador antes de cada linha, exceto a primeira
+        for formato, linha in zip(formatos, linhas):
+            destino = destinos[formato]
+            if not primeira:
+                destino.write("\n")
+            destino.write(linha)
+        primeira = False
+
+
+def gerar_memoria_calculo(
+    resultado: Dict[str, Any],
+    *,
+    formato: str = "md",
+    numeracao_hierarquica: bool = False,
+    sensibilidade: List[Dict[str, Any]] | None = None,
+    tamanho_bloco: int = 64 * 1024,
+) -> Iterator[str]:
+    """Memória de cálculo em blocos de texto de ~`tamanho_bloco` caracteres."""
+    if formato not in FORMATOS:
         raise ValueError("Formato inválido. Use 'md' ou 'txt'.")
 
-    linhas: List[str] = []
+    bloco: List[str] = []
+    tamanho = 0
+    primeira = True
+    for (linha,) in _linhas(resultado, (formato,), numeracao_hierarquica, sensibilidade):
+        if not primeira:
+            bloco.append("\n")
+        bloco.append(linha)
+        tamanho += len(linha) + 1
+        primeira = False
+        if tamanho >= tamanho_bloco:
+            yield "".join(bloco)
+            bloco = []
+            tamanho = 0
+    if bloco:
+        yield "".join(bloco)
+
+
+# ----------------------------------------------------------------
+# Percurso único
+# ----------------------------------------------------------------
+
+def _linhas(
+    resultado: Dict[str, Any],
+    formatos: Tuple[str, ...],
+    numeracao_hierarquica: bool,
+    sensibilidade: List[Dict[str, Any]] | None = None,
+) -> Iterator[Tuple[str, ...]]:
+    """Cada linha da memória, já em todos os `formatos` (uma tupla por linha)."""
+
+    def comum(linha: str) -> Tuple[str, ...]:
+        return (linha,) * len(formatos)
 
     # ------------------------------------------------------------
     # Cabeçalho
     # ------------------------------------------------------------
 
     titulo = "MEMÓRIA DE CÁLCULO — IN nº 05/2017"
-    linhas.append(_titulo(formato, titulo))
+    yield tuple(_titulo(formato, titulo) for formato in formatos)
 
     meta = resultado.get("meta_execucao", {})
     data_exec = meta.get("data_execucao") or datetime.now().strftime(
         "%d/%m/%Y %H:%M"
     )
 
-    linhas.append(f"Data da execução: {data_exec}")
-    linhas.append(f"Nó raiz avaliado: {resultado.get('no_raiz', '—')}")
-    linhas.append("")
+    yield comum(f"Data da execução: {data_exec}")
+    yield comum(f"Nó raiz avaliado: {resultado.get('no_raiz', '—')}")
+    aritmetica = meta.get("aritmetica") or {}
+    if aritmetica.get("modo", "float") != "float":
+        pontos = ", ".join(aritmetica.get("arredondar") or []) or "—"
+        yield comum(
+            f"Aritmética: {aritmetica['modo']}, {aritmetica.get('precisao')} dígitos; "
+            f"arredondamento {aritmetica.get('arredondamento')} a {aritmetica.get('casas')} "
+            f"casas em: {pontos} (e nos nós com 'casas_decimais')"
+        )
+    yield comum("")
 
     # ------------------------------------------------------------
     # Trilha de cálculo
@@ -77,20 +217,19 @@ def render_memoria_calculo(
 
     trilha = resultado.get("trilha_calculo", [])
     decisoes = resultado.get("decisoes_humanas", {})
+    nos = resultado.get("nos_avaliados", {})
 
-    linhas.append(_subtitulo(formato, "Detalhamento do cálculo"))
+    yield tuple(_subtitulo(formato, "Detalhamento do cálculo") for formato in formatos)
 
+    pais = _indice_pais(trilha, nos) if numeracao_hierarquica else {}
     indice_por_no: Dict[str, str] = {}
     filhos_por_pai: Dict[str, int] = {}
 
-    nos = resultado.get("nos_avaliados", {})
-
     for idx, no_id in enumerate(trilha, start=1):
         no = nos.get(no_id)
         if not isinstance(no, dict):
             continue
 
-        tipo = no.get("tipo")
         valor = no.get("valor_calculado")
         deps = no.get("dependencias", [])
         meta_jur = no.get("metadados_juridicos", {})
@@ -100,27 +239,23 @@ def render_memoria_calculo(
             or no_id.replace("_", " ").title()
         )
 
-
-
         # -----------------------------
         # Numeração
         # -----------------------------
-        if numeracao_hierarquica and deps:
-            pai = next((d for d in deps if d in indice_por_no), None)
-            if pai:
-                filhos_por_pai[pai] = filhos_por_pai.get(pai, 0) + 1
-                indice = f"{indice_por_no[pai]}.{filhos_por_pai[pai]}"
-            else:
-                indice = str(idx)
+        pai = pais.get(no_id) if deps else None
+        if pai:
+            filhos_por_pai[pai] = filhos_por_pai.get(pai, 0) + 1
+            indice = f"{indice_por_no[pai]}.{filhos_por_pai[pai]}"
         else:
             indice = str(idx)
 
-        indice_por_no[no_id] = indice
+        if numeracao_hierarquica:
+            indice_por_no[no_id] = indice
 
-        if formato == "md":
-            linhas.append(f"### {indice}. {descricao}")
-        else:
-            linhas.append(f"\n{indice}. {descricao.upper()}")
+        yield tuple(
+            f"### {indice}. {descricao}" if formato == "md" else f"\n{indice}. {descricao.upper()}"
+            for formato in formatos
+        )
 
         if deps:
             deps_fmt = []
@@ -130,31 +265,29 @@ def render_memoria_calculo(
                     deps_fmt.append(f"{d} ({_fmt_valor_contextual(d, v)})")
                 else:
                     deps_fmt.append(d)
-            linhas.append(f"- Dependências consideradas: {', '.join(deps_fmt)}")
-
+            yield comum(f"- Dependências consideradas: {', '.join(deps_fmt)}")
 
         if no_id in decisoes:
             dec = decisoes[no_id]
-            linhas.append(f"- Origem: {dec.get('origem', '—')}")
+            yield comum(f"- Origem: {dec.get('origem', '—')}")
             if dec.get("referencia_documental"):
-                linhas.append(
+                yield comum(
                     f"- Referência documental: {dec['referencia_documental']}"
                 )
 
         if isinstance(valor, (int, float)):
             rotulo = "Valor calculado" if deps else "Valor adotado"
-            linhas.append(
+            yield comum(
                 f"- {rotulo}: {_fmt_valor_contextual(no_id, valor)}"
             )
 
-
         if meta_jur.get("fundamento_legal"):
-            linhas.append(f"- Fundamento legal: {meta_jur['fundamento_legal']}")
+            yield comum(f"- Fundamento legal: {meta_jur['fundamento_legal']}")
 
         if meta_jur.get("observacoes"):
-            linhas.append(f"- Observações: {meta_jur['observacoes']}")
+            yield comum(f"- Observações: {meta_jur['observacoes']}")
 
-        linhas.append("")
+        yield comum("")
 
     # ------------------------------------------------------------
     # Resultado final
@@ -162,7 +295,99 @@ def render_memoria_calculo(
 
     valor_final = resultado.get("valor_final")
     if valor_final is not None:
-        linhas.append(_subtitulo(formato, "Resultado final"))
-        linhas.append(f"Valor total apurado: {_fmt_valor(valor_final)}")
+        yield tuple(_subtitulo(formato, "Resultado final") for formato in formatos)
+        yield comum(f"Valor total apurado: {_fmt_valor(valor_final)}")
+
+    # ------------------------------------------------------------
+    # Sensibilidade (opcional)
+    # ------------------------------------------------------------
+
+    if sensibilidade is not None:
+        yield comum("")
+        yield tuple(_subtitulo(formato, "Sensibilidade do resultado") for formato in formatos)
+        yield comum(
+            "Efeito, no valor total, de variações unitárias em cada valor "
+            "do contexto (derivadas parciais), em ordem de contribuição:"
+        )
+        yield comum("")
+        for linha in sensibilidade:
+            yield comum(_linha_sensibilidade(linha))
+
+
+def _assinatura_sensibilidade(
+    sensibilidade: List[Dict[str, Any]] | None,
+) -> Tuple[Tuple[Any, ...], ...] | None:
+    # o que a seção mostra: tabelas diferentes (ex.: só as N maiores) não
+    # compartilham a entrada do cache
+    if sensibilidade is None:
+        return None
+    return tuple(
+        (linha["no_id"], linha.get("valor"), linha.get("derivada"), linha.get("contribuicao"))
+        for linha in sensibilidade
+    )
+
+
+def _linha_sensibilidade(linha: Dict[str, Any]) -> str:
+    no_id = linha["no_id"]
+    valor = linha.get("valor")
+    derivada = linha.get("derivada")
+    valor_fmt = _fmt_valor_contextual(no_id, valor) if isinstance(valor, (int, float)) else "—"
+
+    if derivada is None:
+        return f"- {no_id} ({valor_fmt}): não diferenciável neste ponto"
+
+    if no_id.startswith("percentual_"):
+        efeito = f"+1 p.p. → {_fmt_valor(derivada * 0.01)}"
+    else:
+        efeito = f"+R$ 1,00 → {_fmt_valor(derivada)}"
+    return (
+        f"- {no_id} ({valor_fmt}): {efeito}; "
+        f"contribuição: {_fmt_valor(linha['contribuicao'])}"
+    )
+
 
-    return "\n".join(linhas)
+def _indice_pais(trilha: Iterable[str], nos: Dict[str, Any]) -> Dict[str, str]:
+    """
+    Pai de cada nó na numeração hierárquica: a primeira dependência
+    numerada antes dele (presente em `nos_avaliados` e anterior na trilha).
+    """
+    posicao: Dict[str, int] = {}
+    for idx, no_id in enumerate(trilha):
+        if isinstance(nos.get(no_id), dict):
+            posicao.setdefault(no_id, idx)
+
+    pais: Dict[str, str] = {}
+    for no_id, idx in posicao.items():
+        for dep in nos[no_id].get("dependencias", []):
+            if posicao.get(dep, idx) < idx:
+                pais[no_id] = dep
+                break
+    return pais
+
+
+# ----------------------------------------------------------------
+# Cache por execução
+# ----------------------------------------------------------------
+
+class _CacheMemorias:
+    def __init__(self, capacidade: int):
+        self.capacidade = capacidade
+        self._entradas: "OrderedDict[tuple, Dict[str, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def obter(self, chave: tuple) -> Dict[str, str] | None:
+        with self._lock:
+            memorias = self._entradas.get(chave)
+            if memorias is not None:
+                self._entradas.move_to_end(chave)
+            return memorias
+
+    def guardar(self, chave: tuple, memorias: Dict[str, str]) -> None:
+        with self._lock:
+            self._entradas[chave] = memorias
+            self._entradas.move_to_end(chave)
+            while len(self._entradas) > self.capacidade:
+                self._entradas.popitem(last=False)
+
+
+_CACHE = _CacheMemorias(CAPACIDADE_CACHE)